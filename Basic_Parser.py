@@ -1,77 +1,117 @@
 import os
-import spacy
 import re
 import json
+import pdfminer
 from pdfminer.high_level import extract_text
-from docx import Document
 from datetime import datetime
 import logging
-import traceback
+import time
+import functools
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import argparse
+from similarity_index import build_index
+from dedup import LSHIndex, minhash_signature
+from doc_classifier import RESUME, RoutingReport, classify_file, classify_text
+from redaction import redact
+from pdf_probe import IMAGE_ONLY, OcrQueue, is_image_only, probe_pdf
+import docx_stream
+import ner_tiers
+import decision_trace
+from docx_stream import extract_text as extract_docx_text
+from text_cache import ResultCache, TextCache, summary_lines as cache_summary_lines
+from worker_pool import RESULT, ERROR, run_isolated
+from run_journal import OK, FAILED, QUARANTINED, RunJournal
+from work_queue import WorkQueue
+from worker_memory import MemoryReport, peak_rss_mb, rss_mb
+from scheduler import CostModel, ScheduleReport, WorkStealingQueue, longest_first, plan
+from contact_lexer import EMAIL, PHONE, LINKEDIN, lex_contacts, primary_contacts, surface_forms, unique_values
+from run_metrics import MetricsReporter, RunMetrics
+from structured_log import event, log_settings, setup_logging
 
-#using logger as suggested, setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('resume_parser.log'),
-        logging.StreamHandler()
-    ]
-)
+#using logger as suggested, setup. asynchronous: JSON lines to resume_parser.log, text to the console,
+#main() sets the level. per-file messages use %-args so dropped records are never formatted
+setup_logging()
 logger = logging.getLogger(__name__)
 
-try:
-    nlp = spacy.load("en_core_web_md")
-    logger.info("loaded spaCy model")
-except OSError:
-    logger.error("spaCy model not found")
-    raise
+#cache keys, bump EXTRACTOR_VERSION when extract_text_from_* change their output and
+#RESULT_VERSION when parse_text changes its fields
+#sharded runs: files claimed per worker process per round, and how often an idle host checks whether
+#the leases still held by other hosts have finished or expired
+CLAIM_PER_WORKER = 25
+QUEUE_POLL = 5.0
+
+EXTRACTOR_VERSION = f"1-pdfminer{pdfminer.__version__}-docx{docx_stream.VERSION}"
+RESULT_VERSION = 2
+
+#capitalized first word, initials, capitalized last word. was (?:\s+[A-Z]\.?\s*)*, where \s* and the next
+#\s+ could split the same whitespace in every way and a long line of initials backtracked exponentially
+NAME_LINE = re.compile(r'^([A-Z][a-z]+(?:(?:\s+[A-Z]\.?)+\s*)?[A-Z][a-z]+)(?:\s|$)')
+
+def result_version():
+    #the NER names differ between tiers, a cached result is only reused by the tier that made it
+    tier = ner_tiers.selected_tier()
+    return RESULT_VERSION if tier == ner_tiers.DEFAULT_TIER else f"{RESULT_VERSION}-{tier}"
+
+#read_*_text raise when a file can't be read (locked, half copied, out of memory) and return None when it
+#has no text. the text cache is given these, so only a file that really has no text is cached as empty
+def read_pdf_text(pdf_path):
+    text = extract_text(pdf_path)
+    if not text or len(text.strip()) < 10:
+        logger.warning("PDF not found: %s", pdf_path, extra=event(pdf_path, "extract", error="NoText"))
+        return None
+    return text
+
+def read_docx_text(docx_path):
+    #streams document.xml plus header/footer parts, tables and text boxes included
+    text = extract_docx_text(docx_path)
+    if not text or len(text.strip()) < 10:
+        logger.warning("Document Error: %s", docx_path, extra=event(docx_path, "extract", error="NoText"))
+        return None
+    return text
 
 def extract_text_from_pdf(pdf_path):
     try:
-        text = extract_text(pdf_path)
-        if not text or len(text.strip()) < 10:
-            logger.warning(f"PDF not found: {pdf_path}")
-            return None
-        return text
+        return read_pdf_text(pdf_path)
     except Exception as e:
-        logger.error(f"Extraction error {pdf_path}: {str(e)}")
+        logger.error("Extraction error %s: %s", pdf_path, e, extra=event(pdf_path, "extract", error=e))
         return None
 
 def extract_text_from_docx(docx_path):
     try:
-        doc = Document(docx_path)
-        text = "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
-        if not text or len(text.strip()) < 10:
-            logger.warning(f"Document Error: {docx_path}")
-            return None
-        return text
+        return read_docx_text(docx_path)
     except Exception as e:
-        logger.error(f"Extraction error {docx_path}: {str(e)}")
+        logger.error("Extraction error %s: %s", docx_path, e, extra=event(docx_path, "extract", error=e))
         return None
 
-def extract_name(text):
+def extract_name(text, use_ner=True):
     lines = text.strip().split('\n')[:20]
+    trace = decision_trace.current()
     
-    #spacy first
+    #spacy first, skipped in degraded mode
     try:
-        doc = nlp(' '.join(lines))
-        for ent in doc.ents:
+        doc = ner_tiers.load()(' '.join(lines)) if use_ner else None
+        if trace:
+            trace.add("ner_people", tier=ner_tiers.selected_tier() if use_ner else None,
+                      people=[ent.text for ent in doc.ents if ent.label_ == "PERSON"] if doc else [])
+        for ent in doc.ents if doc else []:
             if ent.label_ == "PERSON" and 2 <= len(ent.text.split()) <= 4:
                 name_parts = ent.text.strip().split()
                 if len(name_parts) >= 2:
                     first_name = name_parts[0]
                     last_name = name_parts[-1]
+                    if trace:
+                        trace.add("name_chosen", name=ent.text, reason="first PERSON of 2-4 words in the first 20 lines")
                     return first_name, last_name
     except Exception as e:
-        logger.debug(f"SpaCy NER failed: {str(e)}")
+        logger.debug("SpaCy NER failed: %s", e, extra=event(stage="ner", error=e))
+        if trace:
+            trace.add("ner_failed", error=repr(e))
     
     #regex for capitalized names
-    for line in lines:
+    for i, line in enumerate(lines):
         line = line.strip()
-        match = re.match(r'^([A-Z][a-z]+(?:\s+[A-Z]\.?\s*)*[A-Z][a-z]+)(?:\s|$)', line)
+        match = NAME_LINE.match(line)
         if match and not re.search(r'\d|@|\.com|phone|email|address', match.group(1).lower()):
             name_parts = match.group(1).split()
             if len(name_parts) >= 2:
@@ -79,168 +119,190 @@ def extract_name(text):
                 if len(filtered_parts) >= 2:
                     first_name = filtered_parts[0]
                     last_name = filtered_parts[-1]
+                    if trace:
+                        trace.add("name_chosen", line=i, name=match.group(1), reason="first capitalized name line")
                     return first_name, last_name
     
+    if trace:
+        trace.add("name_chosen", name=None, reason="no PERSON and no capitalized name line")
     return None, None
 
 def extract_email(text):
-    pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(pattern, text, re.IGNORECASE)
-    #check validity
-    valid_emails = []
-    for email in set(emails):
-        if not re.search(r'(example|test|sample|dummy)\.com', email.lower()):
-            valid_emails.append(email.lower())
-    return valid_emails
+    return [token.value for token in unique_values(lex_contacts(text), EMAIL)]
 
 def extract_phone_number(text):
-    patterns = [
-        r'\+?1?[-\.\s]?\(?[0-9]{3}\)?[-\.\s]?[0-9]{3}[-\.\s]?[0-9]{4}',  # US format
-        r'\+?[0-9]{1,3}[-\.\s]?[0-9]{3,4}[-\.\s]?[0-9]{3,4}[-\.\s]?[0-9]{3,4}',  # International
-        r'\([0-9]{3}\)\s?[0-9]{3}-[0-9]{4}',  # (123) 456-7890
-        r'[0-9]{3}[-\.\s][0-9]{3}[-\.\s][0-9]{4}'  # 123-456-7890
-    ]
-    
-    phones = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text)
-        phones.extend(matches)
+    #one surface form per number, "(704) 900-3323" and "+1 704 900 3323" collapse to +17049003323
+    return [phone_text(token) for token in unique_values(lex_contacts(text), PHONE)]
 
-    cleaned = []
-    for phone in phones:
-        #remove non digits
-        digits = re.sub(r'\D', '', phone)
-        #check validity
-        if 10 <= len(digits) <= 15:
-            #keep original format
-            cleaned_phone = re.sub(r'\s+', ' ', phone.strip())
-            if cleaned_phone not in cleaned:
-                cleaned.append(cleaned_phone)
-    
-    return cleaned
+def phone_text(token):
+    #surface form with whitespace normalized, the raw form stays exact for redaction
+    return ' '.join(token.raw.split())
 
 def extract_linkedin(text):
-    patterns = [
-        r'linkedin\.com/in/[\w\-]+/?',
-        r'www\.linkedin\.com/in/[\w\-]+/?',
-        r'https?://(?:www\.)?linkedin\.com/in/[\w\-]+/?'
-    ]
-    
-    linkedin_urls = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if not match.startswith('http'):
-                match = 'https://' + match
-            linkedin_urls.append(match)
-    
-    return list(set(linkedin_urls))
+    return [token.value for token in unique_values(lex_contacts(text), LINKEDIN)]
 
 def clean_content(text, name_parts=None, emails=None, phones=None, linkedin_urls=None):
-    if not text:
-        return ""
-    
-    #remove extracted text
-    content = text
-    
-    #remove names
-    if name_parts:
-        first_name, last_name = name_parts
-        if first_name and last_name:
-            name_patterns = [
-                rf'\b{re.escape(first_name)}\s+{re.escape(last_name)}\b',
-                rf'\b{re.escape(last_name)},\s+{re.escape(first_name)}\b',
-                rf'\b{re.escape(first_name)}\b',
-                rf'\b{re.escape(last_name)}\b'
-            ]
-            for pattern in name_patterns:
-                content = re.sub(pattern, '', content, flags=re.IGNORECASE)
-    
-    #remove emails
-    if emails:
-        for email in emails:
-            content = content.replace(email, '')
-    
-    #remove phones
-    if phones:
-        for phone in phones:
-            content = content.replace(phone, '')
-    
-    #remove linkedin urls
-    if linkedin_urls:
-        for url in linkedin_urls:
-            content = content.replace(url, '')
-    
-    #remove common contact headers
-    contact_headers = [
-        r'contact\s*information?', r'personal\s*information?', r'contact\s*details?',
-        r'phone:', r'email:', r'linkedin:', r'address:', r'location:'
-    ]
-    for header in contact_headers:
-        content = re.sub(header, '', content, flags=re.IGNORECASE)
-    
-    content = re.sub(r'[•▪▫◦‣⁃]\s*', '', content)  #remove bullet points
-    content = re.sub(r'[-*+]\s+', '', content)  #remove more bullet point types
-    content = re.sub(r'\s*[,;]\s*', ', ', content)  #normalize commas
-    content = re.sub(r'\n\s*\n', '\n', content)  #clean linebreaks
-    content = re.sub(r'\s+', ' ', content)  #clean whitespace
-    content = re.sub(r'[^\w\s,.\-()&/]', ' ', content)  #remove special charecters
-    
-    #remove short lines
-    lines = content.split('\n')
-    cleaned_lines = [line.strip() for line in lines if len(line.strip()) > 3]
-    
-    return '\n'.join(cleaned_lines).strip()
+    #single compiled pass over the document, see redaction.py
+    return redact(text, name_parts, emails, phones, linkedin_urls)
 
-def parse_resume(file_path):
+def parse_resume(file_path, dedup_index=None, skip_duplicates=False, routing_report=None, ocr_queue=None,
+                 text_cache=None, result_cache=None, use_ner=True, metrics=None, timing=None):
+    #timing: a dict, timing["full"] is set True only when the file was extracted and parsed with NER from
+    #scratch, cache hits, routed, queued, degraded and skipped duplicates would teach the cost model ~0s
+    if timing is not None:
+        timing["full"] = False
     try:
-        logger.info(f"processing: {file_path}")
+        logger.info("processing: %s", file_path, extra=event(file_path, "start"))
+        started = time.perf_counter()
         
         ext = Path(file_path).suffix.lower()
+        
+        #scanned PDFs have no text operators at all, caught in milliseconds instead of after layout analysis
+        if ext == '.pdf':
+            probe = probe_pdf(file_path)
+            if metrics is not None:
+                metrics.record_stage("probe", time.perf_counter() - started)
+            if is_image_only(probe):
+                if routing_report is not None:
+                    routing_report.record(IMAGE_ONLY, ext, time.perf_counter() - started, 0.0)
+                if ocr_queue is None:
+                    logger.warning("Image-only PDF, no text layer: %s", file_path,
+                                   extra=event(file_path, "probe", time.perf_counter() - started, "ImageOnly"))
+                    return None
+                ocr_queue.add(file_path, probe.pages)
+                logger.info("queued for OCR: %s", file_path, extra=event(file_path, "probe", time.perf_counter() - started))
+                return {"document_type": IMAGE_ONLY, "pages": probe.pages, "ocr": "queued"}
+        
+        #cheap first-page classification, non-resumes never reach full extraction or NLP
+        classify_seconds = 0.0
+        if routing_report is not None and ext in ['.pdf', '.docx', '.doc']:
+            doc_type, confidence = classify_file(file_path)
+            classify_seconds = time.perf_counter() - started
+            if metrics is not None:
+                metrics.record_stage("classify", classify_seconds)
+            if doc_type != RESUME:
+                routing_report.record(doc_type, ext, classify_seconds, classify_seconds)
+                logger.info("routed as %s: %s", doc_type, file_path, extra=event(file_path, "classify", classify_seconds))
+                return {"document_type": doc_type, "confidence": round(confidence, 2)}
+        
         if ext == '.pdf':
-            text = extract_text_from_pdf(file_path)
+            extractor = read_pdf_text
         elif ext in ['.docx', '.doc']:
-            text = extract_text_from_docx(file_path)
+            extractor = read_docx_text
         else:
-            logger.warning(f"Filetype not supported: {file_path}")
+            logger.warning("Filetype not supported: %s", file_path, extra=event(file_path, "extract", error="Unsupported"))
             return None
+        stage_started = time.perf_counter()
+        extracted = []
         
-        if not text:
-            logger.warning(f"No data taken from: {file_path}")
-            return None
+        #same module and name as the extractor so the text cache key doesn't change
+        @functools.wraps(extractor)
+        def extract(path):
+            extracted.append(path)
+            return extractor(path)
         
-        #extract main info
-        first_name, last_name = extract_name(text)
-        emails = extract_email(text)
-        phone_numbers = extract_phone_number(text)
-        linkedin_urls = extract_linkedin(text)
+        try:
+            text = text_cache.extract(file_path, extract, EXTRACTOR_VERSION) if text_cache else extract(file_path)
+        except Exception as e:
+            #nothing cached, the next run reads the file again
+            logger.error("Extraction error %s: %s", file_path, e, extra=event(file_path, "extract", error=e))
+            text = None
+        if metrics is not None:
+            metrics.record_stage("extract", time.perf_counter() - stage_started)
         
-        #remaining content
-        cleaned_content = clean_content(
-            text, 
-            (first_name, last_name), 
-            emails, 
-            phone_numbers, 
-            linkedin_urls
-        )
+        if not text:
+            logger.warning("No data taken from: %s", file_path,
+                           extra=event(file_path, "extract", time.perf_counter() - started, "NoText"))
+            return None
         
-        result = {
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": emails[0] if emails else None,
-            "phone_number": phone_numbers[0] if phone_numbers else None,
-            "linkedin": linkedin_urls[0] if linkedin_urls else None,
-            "cleaned_content": cleaned_content
-        }
+        #dedup verdicts depend on what else is in the index, so parsed results are only cached without one,
+        #and a degraded parse is never cached. a traced file is always parsed so its trace is complete
+        stage_started = time.perf_counter()
+        result = None
+        use_results = result_cache is not None and dedup_index is None and use_ner and not decision_trace.wanted(file_path)
+        if use_results:
+            result = result_cache.get(text)
+        parsed = result is None
+        if parsed:
+            result = parse_text(text, file_path, dedup_index, skip_duplicates, use_ner)
+            if use_results:
+                result_cache.put(text, result)
+        if timing is not None:
+            timing["full"] = bool(extracted) and parsed and use_ner and "cleaned_content" in result
+        if metrics is not None:
+            metrics.record_stage("parse", time.perf_counter() - stage_started)
+        if routing_report is not None and "cleaned_content" in result:
+            routing_report.record(RESUME, ext, time.perf_counter() - started, classify_seconds)
         
-        logger.info(f"processed: {file_path}")
+        logger.info("processed: %s", file_path, extra=event(file_path, "parse", time.perf_counter() - started))
         return result
         
     except Exception as e:
-        logger.error(f"Error processing {file_path}: {str(e)}")
-        logger.error(traceback.format_exc())
+        #the traceback goes into the JSON event, formatted by the listener
+        logger.error("Error processing %s: %s", file_path, e, exc_info=True, extra=event(file_path, "parse", error=e))
         return None
 
+def parse_text(text, file_path, dedup_index=None, skip_duplicates=False, use_ner=True):
+    #everything after extraction, shared by files and OCR output. files selected with --trace record
+    #their extractor decisions while this runs
+    with decision_trace.tracing(file_path) as trace:
+        if trace:
+            trace.add("text", characters=len(text), lines=text.count('\n') + 1, use_ner=use_ner)
+        return extract_fields(text, file_path, dedup_index, skip_duplicates, use_ner)
+
+def extract_fields(text, file_path, dedup_index=None, skip_duplicates=False, use_ner=True):
+    #near-duplicate check runs before NLP, signature uses clean_content without entities. both the skipped
+    #and the full result list every match, best first: duplicate_of the names, similarity their scores
+    duplicates = []
+    if dedup_index is not None:
+        signature = minhash_signature(clean_content(text))
+        duplicates = dedup_index.query_and_add(Path(file_path).name, signature)
+        trace = decision_trace.current()
+        if trace:
+            trace.add("duplicates", matches=[(name, round(similarity, 3)) for name, similarity in duplicates],
+                      skipped=bool(duplicates) and skip_duplicates)
+        if duplicates:
+            logger.info("near-duplicate of %s: %s", duplicates[0][0], file_path, extra=event(file_path, "dedup"))
+            if skip_duplicates:
+                contacts = primary_contacts(text, (EMAIL, PHONE))
+                return {
+                    "duplicate_of": [name for name, _ in duplicates],
+                    "similarity": [round(similarity, 3) for _, similarity in duplicates],
+                    "email": contacts[EMAIL].value if EMAIL in contacts else None,
+                    "phone_number": phone_text(contacts[PHONE]) if PHONE in contacts else None
+                }
+    
+    #extract main info
+    first_name, last_name = extract_name(text, use_ner)
+    contacts = lex_contacts(text)
+    emails = [token.value for token in unique_values(contacts, EMAIL)]
+    phone_numbers = [phone_text(token) for token in unique_values(contacts, PHONE)]
+    linkedin_urls = [token.value for token in unique_values(contacts, LINKEDIN)]
+    
+    #remaining content, every surface form is removed not just the first per value
+    cleaned_content = clean_content(
+        text, 
+        (first_name, last_name), 
+        surface_forms(contacts, EMAIL), 
+        surface_forms(contacts, PHONE), 
+        surface_forms(contacts, LINKEDIN)
+    )
+    
+    result = {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": emails[0] if emails else None,
+        "phone_number": phone_numbers[0] if phone_numbers else None,
+        "linkedin": linkedin_urls[0] if linkedin_urls else None,
+        "cleaned_content": cleaned_content
+    }
+    if dedup_index is not None:
+        result["duplicate_of"] = [name for name, _ in duplicates]
+        result["similarity"] = [round(similarity, 3) for _, similarity in duplicates]
+    if not use_ner:
+        result["degraded"] = True
+    return result
+
 def get_resume_files(folder_path):
     supported_extensions = ['.pdf', '.docx', '.doc']
     resume_files = []
@@ -256,7 +318,7 @@ def get_resume_files(folder_path):
     
     return resume_files
 
-def save_to_json(data, filename="extracted_resume_data.json"):
+def save_to_json(data, filename="extracted_resume_data.json", quarantined=None):
     try:
         #output extra details - metadata
         output_data = {
@@ -267,6 +329,8 @@ def save_to_json(data, filename="extracted_resume_data.json"):
             },
             "resumes": data
         }
+        if quarantined:
+            output_data["metadata"]["quarantined"] = quarantined
         
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(output_data, f, indent=2, ensure_ascii=False)
@@ -277,15 +341,117 @@ def save_to_json(data, filename="extracted_resume_data.json"):
         logger.error(f"Error saving to JSON: {e}")
         return False
 
-def process_resumes_parallel(file_paths, max_workers=4):
-    #resumes processed in parallel
+def isolated_setup(cache_dir, skip_duplicates, log_config):
+    #once per worker process, caches share the directory but keep their own counters and the
+    #process gets its own log queue and listener thread
+    setup_logging(*log_config)
+    text_cache = TextCache(cache_dir) if cache_dir else None
+    result_cache = ResultCache(cache_dir, result_version()) if cache_dir else None
+    return text_cache, result_cache, skip_duplicates, RunMetrics()
+
+def isolated_parse(file_path, attempt, services, context):
+    text_cache, result_cache, skip_duplicates, stage_metrics = context
+    started = time.perf_counter()
+    #a retry means the first attempt hung or killed its worker, NER is the heaviest step so it goes
+    timing = {}
+    result = parse_resume(file_path, services.get("dedup"), skip_duplicates, services.get("routing"),
+                          services.get("ocr"), text_cache, result_cache, use_ner=attempt == 0,
+                          metrics=stage_metrics, timing=timing)
+    seconds = time.perf_counter() - started
+    stats = [cache.store.take_stats() if cache else None for cache in (text_cache, result_cache)]
+    return result, stats, seconds, stage_metrics.take_stages(), timing["full"]
+
+def process_resumes_isolated(file_paths, max_workers=4, dedup_index=None, skip_duplicates=False,
+                             routing_report=None, ocr_queue=None, text_cache=None, result_cache=None,
+                             timeout=120, retries=1, quarantine=None, costs=None, schedule_report=None,
+                             max_tasks=None, max_rss_mb=None, memory_report=None, journal=None, metrics=None,
+                             on_result=None):
+    #one process per worker with a wall-clock budget per file, shared state stays in this process.
+    #on_result(file_path, result) is called for every parsed file as it finishes
+    services = {
+        name: service for name, service in
+        (("dedup", dedup_index), ("routing", routing_report), ("ocr", ocr_queue)) if service is not None
+    }
+    cache_dir = text_cache.cache_dir if text_cache else None
+    #with predicted costs every worker gets its own longest-first deque and steals when it runs dry
+    schedule = WorkStealingQueue(costs, max_workers) if costs else None
+    
+    def file_done(file_path, outcome, value):
+        if outcome == RESULT:
+            status, result, reason = OK if value[0] else FAILED, value[0], None
+        elif outcome == ERROR:
+            status, result, reason = FAILED, None, value.strip().splitlines()[-1]
+        else:
+            status, result, reason = QUARANTINED, None, value
+        if journal is not None:
+            journal.record(file_path, status, result, reason)
+        if on_result is not None and result:
+            on_result(file_path, result)
+        if metrics is not None:
+            if outcome == RESULT:
+                metrics.add_stages(value[3])
+            metrics.record(status, value[2] if outcome == RESULT else None)
+    
+    values, errors, quarantined = run_isolated(
+        file_paths, isolated_parse, workers=max_workers, timeout=timeout, retries=retries,
+        setup=isolated_setup, setup_args=(cache_dir, skip_duplicates, log_settings()), services=services, schedule=schedule,
+        max_tasks=max_tasks, max_rss_mb=max_rss_mb, memory_report=memory_report,
+        on_done=file_done
+    )
+    if schedule is not None and schedule_report is not None:
+        schedule_report.steals = schedule.steals
+    
+    results = {}
+    failed_files = []
+    for file_path in file_paths:
+        if file_path in values:
+            result, stats, seconds, _, full = values[file_path]
+            for cache, delta in zip((text_cache, result_cache), stats):
+                if cache and delta:
+                    cache.store.add_stats(delta)
+            if schedule_report is not None:
+                schedule_report.record(file_path, seconds, full)
+            if result:
+                results[Path(file_path).name] = result
+                continue
+        elif file_path in errors:
+            error = errors[file_path].strip().splitlines()[-1]
+            logger.error("parallel processing error for %s: %s", file_path, errors[file_path],
+                         extra=event(file_path, "parse", error=error.split(":")[0]))
+        failed_files.append(str(file_path))
+    
+    if quarantine is not None:
+        quarantine.extend({"file": str(file_path), "reason": reason} for file_path, reason in quarantined)
+    return results, failed_files
+
+def process_resumes_parallel(file_paths, max_workers=4, dedup_index=None, skip_duplicates=False,
+                             routing_report=None, ocr_queue=None, text_cache=None, result_cache=None,
+                             costs=None, schedule_report=None, memory_report=None, journal=None, metrics=None,
+                             on_result=None):
+    #resumes processed in parallel, threads share one process so memory is only reported, not recycled
     results = {}
     failed_files = []
     
+    def timed_parse(file_path):
+        started = time.perf_counter()
+        timing = {}
+        try:
+            return parse_resume(file_path, dedup_index, skip_duplicates, routing_report, ocr_queue,
+                                text_cache, result_cache, metrics=metrics, timing=timing)
+        finally:
+            seconds = time.perf_counter() - started
+            if schedule_report is not None:
+                schedule_report.record(file_path, seconds, timing.get("full", False))
+            if metrics is not None:
+                metrics.record_stage("file", seconds)
+            if memory_report is not None:
+                memory_report.record("threads", os.getpid(), rss_mb(), peak_rss_mb())
+    
+    #the executor's queue is shared by all threads, so submitting longest-first is already greedy LPT
+    ordered = longest_first({f: costs.get(f, 0.0) for f in file_paths}) if costs else file_paths
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         #submit all tasks
-        future_to_file = {executor.submit(parse_resume, file_path): file_path 
-                         for file_path in file_paths}
+        future_to_file = {executor.submit(timed_parse, file_path): file_path for file_path in ordered}
         
         #collect completed results
         for future in as_completed(future_to_file):
@@ -296,22 +462,112 @@ def process_resumes_parallel(file_paths, max_workers=4):
                     results[Path(file_path).name] = result
                 else:
                     failed_files.append(str(file_path))
+                if journal is not None:
+                    journal.record(file_path, OK if result else FAILED, result)
+                if on_result is not None and result:
+                    on_result(file_path, result)
+                if metrics is not None:
+                    metrics.record(OK if result else FAILED)
             except Exception as e:
-                logger.error(f"parallel processing error for {file_path}: {str(e)}")
+                logger.error("parallel processing error for %s: %s", file_path, e, extra=event(file_path, "parse", error=e))
                 failed_files.append(str(file_path))
+                if journal is not None:
+                    journal.record(file_path, FAILED, reason=repr(e))
+                if metrics is not None:
+                    metrics.record(FAILED)
     
     return results, failed_files
 
+def process_ocr_queue(ocr_queue, results, dedup_index=None, skip_duplicates=False, classify=False):
+    #one local OCR pass after the parse pool, recognized text goes through the normal resume parse
+    for file_path, text in ocr_queue.run():
+        name = Path(file_path).name
+        if not text or len(text.strip()) < 10:
+            logger.warning("OCR found no text: %s", file_path, extra=event(file_path, "ocr", error="NoText"))
+            continue
+        if classify:
+            doc_type, confidence = classify_text(text, name)
+            if doc_type != RESUME:
+                results[name] = {"document_type": doc_type, "confidence": round(confidence, 2), "ocr": True}
+                continue
+        result = parse_text(text, file_path, dedup_index, skip_duplicates)
+        result["ocr"] = True
+        results[name] = result
+        logger.info("processed with OCR: %s", file_path, extra=event(file_path, "ocr"))
+
 def main():
     #process all resu,es
     parser = argparse.ArgumentParser(description='Extract information from resume files')
     parser.add_argument('folder_path', nargs='?', default=None, help='Path to folder containing resume files')
     parser.add_argument('--output', '-o', default='extracted_resume_data.json', 
                        help='Output JSON file name (default: extracted_resume_data.json)')
+    parser.add_argument('--parquet', default=None,
+                       help='Also write candidates/jobs/education/skills Parquet tables to this folder')
     parser.add_argument('--workers', '-w', type=int, default=4,
                        help='Number of parallel workers (default: 4)')
+    parser.add_argument('--vector-index', default=None,
+                       help='Directory to write a similarity vector index to (optional)')
+    parser.add_argument('--dedup-index', default=None,
+                       help='MinHash index file used to flag near-duplicate resumes (optional)')
+    parser.add_argument('--skip-duplicates', action='store_true',
+                       help='Skip the full parse for near-duplicates of already indexed resumes')
+    parser.add_argument('--classify', action='store_true',
+                       help='Route non-resume documents (IDs, visa notices, JDs...) away from the full parse')
+    parser.add_argument('--ocr-queue', default=None,
+                       help='JSON file to list image-only PDFs in, they are queued instead of failing')
+    parser.add_argument('--cache', default=None,
+                       help='Cache directory for extracted text and parsed results (optional)')
+    parser.add_argument('--timeout', type=float, default=120,
+                       help='Per-file budget in seconds, files run in isolated worker processes (0: threads, no budget)')
+    parser.add_argument('--retries', type=int, default=1,
+                       help='Retries for a file that times out or crashes its worker, NER is skipped on retries (default: 1)')
+    parser.add_argument('--recycle-tasks', type=int, default=500,
+                       help='Replace a worker process after this many files, 0 to keep it (default: 500)')
+    parser.add_argument('--recycle-mb', type=float, default=2048,
+                       help='Replace a worker process once its RSS stays above this many MB, 0 for no limit (default: 2048)')
+    parser.add_argument('--journal', default=None,
+                       help='Run journal, one durable line per finished file (default: <output>.journal)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted run from its journal, finished files are not parsed again')
+    parser.add_argument('--queue', default=None,
+                       help='Shared SQLite work queue, several hosts run the same command against it and one writes the merged output')
+    parser.add_argument('--lease', type=float, default=300,
+                       help='Seconds a claimed file stays leased without a heartbeat before another host takes it over (default: 300)')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                       help='Lowest level written to the log, per-file events are INFO (default: INFO)')
+    parser.add_argument('--log-file', default='resume_parser.log',
+                       help='JSON lines log, one event per line (default: resume_parser.log)')
+    parser.add_argument('--progress', type=float, default=10,
+                       help='Seconds between progress lines with rate and ETA, 0 for none (default: 10)')
+    parser.add_argument('--metrics-file', default=None,
+                       help='Prometheus text file rewritten with the live metrics (e.g. for a node_exporter textfile collector)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve the live metrics in Prometheus format on this local port')
+    parser.add_argument('--timings', default=None,
+                       help='Per-file timing history used to predict costs and schedule longest-first, updated after the run (default: built-in priors, nothing written)')
+    parser.add_argument('--ocr', action='store_true',
+                       help='OCR the queued image-only PDFs locally after the run (needs pytesseract and pdf2image)')
+    parser.add_argument('--trace', nargs='+', default=None, metavar='GLOB',
+                       help='Record the extractor decisions for files matching these names or globs (e.g. "Cloud*.docx")')
+    parser.add_argument('--trace-dir', default='traces',
+                       help='Where each traced file gets its <name>.trace.json (default: traces)')
+    parser.add_argument('--ner-tier', default=None, choices=list(ner_tiers.TIERS),
+                       help=f'NER model: sm, md or trf, or rules for the rule-only fast path (default: ${ner_tiers.TIER_ENV} or {ner_tiers.DEFAULT_TIER})')
     
     args = parser.parse_args()
+    setup_logging(args.log_level, args.log_file)
+    #the tier comes from RESUME_NER_TIER, set before any worker starts so spawned workers load the same
+    #one. loaded here rather than on import so a run on the rules tier needs no model installed
+    if args.ner_tier:
+        os.environ[ner_tiers.TIER_ENV] = args.ner_tier
+    if args.trace:
+        decision_trace.export_env(args.trace, args.trace_dir)
+    try:
+        ner_tiers.load()
+        logger.info(f"loaded spaCy model, NER tier {ner_tiers.selected_tier()}")
+    except OSError:
+        logger.error("spaCy model not found")
+        raise
     
     if args.folder_path is None:
         args.folder_path = "C:/Flexon_Resume_Parser/Parser_Build-Arnav/Mani"
@@ -325,8 +581,141 @@ def main():
     logger.info(f"Starting to process {len(resume_files)} resume files...")
     
     #processing
+    dedup_index = LSHIndex.load(args.dedup_index) if args.dedup_index else None
+    routing_report = RoutingReport() if args.classify else None
+    ocr_queue = OcrQueue() if args.ocr_queue or args.ocr else None
+    text_cache = TextCache(args.cache) if args.cache else None
+    result_cache = ResultCache(args.cache, result_version()) if args.cache else None
+    
+    #a sharded run keeps its progress in the queue, which already resumes by itself
+    queue = WorkQueue(args.queue, lease_seconds=args.lease).open() if args.queue else None
+    journal = None if queue else RunJournal(args.journal or f"{args.output}.journal").open(resume=args.resume)
+    if queue is not None:
+        queue.enqueue(resume_files)
+        logger.info(f"Sharded run as {queue.worker_id} on {args.queue}")
+    done_files = [f for f in resume_files if journal is not None and journal.done(f)]
+    pending_files = [f for f in resume_files if journal is None or not journal.done(f)]
+    if done_files:
+        logger.info(f"Resuming: {len(done_files)} files done in the interrupted run, {len(pending_files)} left")
+    #image-only PDFs queued by the interrupted run go back on the OCR queue
+    for entry in (journal.entries[str(f)] for f in done_files):
+        result = entry["result"] or {}
+        if ocr_queue is not None and result.get("ocr") == "queued":
+            ocr_queue.add(entry["file"], result.get("pages", 0))
+    
+    cost_model = CostModel.load(args.timings)
+    features = {}
+    costs = {}
+    schedule_report = ScheduleReport(costs, args.workers)
+    memory_report = MemoryReport()
+    quarantine = []
+    
+    #results are written to Parquet as they finish, one row group in memory. a sharded run only knows
+    #every host's results once the queue drains, the merging host writes them then
+    parquet = None
+    deferred = set()
+    
+    def export_result(file_path, result):
+        name = Path(file_path).name
+        if args.ocr and result.get("ocr") == "queued":
+            #the local OCR pass replaces this placeholder, it is written after that
+            deferred.add(name)
+        else:
+            parquet.add(name, result)
+    
+    def run_batch(files):
+        batch_features, batch_costs = plan(files, cost_model)
+        features.update(batch_features)
+        costs.update(batch_costs)
+        common = dict(
+            costs=batch_costs,
+            schedule_report=schedule_report,
+            memory_report=memory_report,
+            journal=queue or journal,
+            max_workers=args.workers,
+            dedup_index=dedup_index,
+            skip_duplicates=args.skip_duplicates,
+            routing_report=routing_report,
+            ocr_queue=ocr_queue,
+            text_cache=text_cache,
+            result_cache=result_cache,
+            metrics=metrics,
+            on_result=export_result if parquet is not None else None
+        )
+        if args.timeout:
+            return process_resumes_isolated(
+                files, timeout=args.timeout, retries=args.retries, quarantine=quarantine,
+                max_tasks=args.recycle_tasks, max_rss_mb=args.recycle_mb, **common
+            )
+        return process_resumes_parallel(files, **common)
+    
+    metrics = RunMetrics(0 if queue is not None else len(pending_files))
+    if ocr_queue is not None:
+        metrics.gauge("ocr", ocr_queue.__len__)
+    if queue is not None:
+        metrics.gauge("shared_unfinished", queue.unfinished)
+    reporter = MetricsReporter(metrics, args.progress, args.metrics_file, args.metrics_port)
+    
     start_time = datetime.now()
-    results, failed_files = process_resumes_parallel(resume_files, max_workers=args.workers)
+    merging = True
+    if args.parquet and queue is None:
+        #imported here, pyarrow is only needed for the export
+        import parquet_export
+        parquet = parquet_export.ParquetExport(args.parquet)
+    #closed whatever happens, a Parquet file without its footer can't be read
+    try:
+        with reporter:
+            if queue is None:
+                results, failed_files = run_batch(pending_files)
+                journal.close()
+                #the interrupted run's outcomes, each file exactly once since pending_files excluded them
+                done_results, done_failed, done_quarantine = journal.outcomes(done_files)
+                if parquet is not None:
+                    for name, result in done_results.items():
+                        export_result(name, result)
+                results = {**done_results, **results}
+                failed_files = done_failed + failed_files
+                quarantine = done_quarantine + quarantine
+            else:
+                with queue.heartbeat():
+                    while True:
+                        batch = queue.claim(args.workers * CLAIM_PER_WORKER)
+                        if batch:
+                            metrics.expect(len(batch))
+                            run_batch(batch)
+                        elif queue.unfinished():
+                            #other hosts still hold leases, wait for them to finish or expire
+                            time.sleep(QUEUE_POLL)
+                        else:
+                            break
+                #every host's outcomes, each file once since the queue has one row per file
+                results, failed_files, quarantine = queue.outcomes()
+                merging = queue.claim_merge()
+        if queue is not None:
+            queue.close()
+            if merging and ocr_queue is not None:
+                #image-only PDFs queued on any host
+                ocr_queue = OcrQueue()
+                paths = {Path(f).name: f for f in resume_files}
+                for name, result in results.items():
+                    if result.get("ocr") == "queued" and name in paths:
+                        ocr_queue.add(paths[name], result.get("pages", 0))
+            if not merging:
+                logger.info("Queue drained, another worker writes the merged output")
+            elif args.parquet:
+                import parquet_export
+                parquet = parquet_export.ParquetExport(args.parquet)
+                for name, result in results.items():
+                    export_result(name, result)
+        if args.ocr and ocr_queue and merging:
+            process_ocr_queue(ocr_queue, results, dedup_index, args.skip_duplicates, args.classify)
+        if parquet is not None:
+            for name in sorted(deferred):
+                if name in results:
+                    parquet.add(name, results[name])
+    finally:
+        if parquet is not None:
+            parquet.close()
     end_time = datetime.now()
     
     #logged results
@@ -339,11 +728,56 @@ def main():
         for file_path in failed_files:
             logger.info(f"  - {file_path}")
     
+    if quarantine:
+        logger.warning(f"Quarantined: {len(quarantine)} files")
+        for entry in quarantine:
+            logger.warning(f"  - {entry['file']} ({entry['reason']})")
+    
+    if routing_report is not None:
+        for line in routing_report.summary_lines():
+            logger.info(line)
+    
+    for line in cache_summary_lines(text_cache, result_cache):
+        logger.info(line)
+    
+    for line in schedule_report.summary_lines((end_time - start_time).total_seconds()):
+        logger.info(line)
+    for line in memory_report.summary_lines():
+        logger.info(line)
+    if parquet is not None:
+        for line in parquet.summary_lines():
+            logger.info(line)
+    if args.timings:
+        #only full fresh parses, a cache hit or a routed file says nothing about what parsing costs
+        for file_path, seconds in schedule_report.learnable().items():
+            cost_model.record(*features[file_path], seconds)
+        cost_model.save(args.timings)
+    
+    if not merging:
+        return
+    
+    if ocr_queue is not None:
+        logger.info(f"Image-only PDFs queued for OCR: {len(ocr_queue)}")
+        if args.ocr_queue:
+            ocr_queue.save(args.ocr_queue)
+    
+    if dedup_index is not None:
+        clusters = dedup_index.clusters()
+        logger.info(f"Near-duplicate clusters: {len(clusters)}")
+        for cluster in clusters:
+            logger.info(f"  - {', '.join(cluster)}")
+        dedup_index.save(args.dedup_index)
+    
     if results:
-        if save_to_json(results, args.output):
+        if save_to_json(results, args.output, quarantine):
             logger.info(f"All data successfully saved to {args.output}")
+            #the output now holds everything the journal did
+            if journal is not None:
+                journal.close(remove=True)
         else:
             logger.error("Failed to save data to JSON")
+        if args.vector_index:
+            build_index(results, ner_tiers.vectors_pipeline(), args.vector_index)
     else:
         logger.error("No files processed successfully")
 
@@ -1,26 +1,43 @@
 import os
-import spacy
+import ner_tiers
 import re
 import json
+from bisect import bisect_left, bisect_right
 from pdfminer.high_level import extract_text
-from docx import Document
+import docx_stream
+from docx_stream import iter_paragraphs
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import dateparser
+import decision_trace
+import records
+import timeline
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_md")
+# Bump when extract_text_from_pdf/extract_text_from_docx change their output, cached text keys on it
+EXTRACTOR_VERSION = f"2-docx{docx_stream.VERSION}"
+
+# Load spaCy model, the tier is picked with RESUME_NER_TIER (see ner_tiers.py)
+nlp = ner_tiers.load()
+
+# read_*_text raise when a file can't be read, the text cache is given these so a locked or half
+# copied file isn't cached as one without text
+def read_pdf_text(pdf_path):
+    return extract_text(pdf_path)
+
+def read_docx_text(docx_path):
+    # Body paragraphs only: the section heuristics below split on lines, and table cells ("DL: Random
+    # Forest"), headers and text boxes end up in whichever section precedes them
+    return "\n".join(iter_paragraphs(docx_path, body_only=True))
 
 def extract_text_from_pdf(pdf_path):
     try:
-        return extract_text(pdf_path)
+        return read_pdf_text(pdf_path)
     except Exception:
         return None
 
 def extract_text_from_docx(docx_path):
     try:
-        doc = Document(docx_path)
-        return "\n".join([p.text for p in doc.paragraphs])
+        return read_docx_text(docx_path)
     except Exception:
         return None
 
@@ -43,9 +60,25 @@ def extract_name(text):
     
     return None
 
+EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+EMAIL_LOCAL = re.compile(r'[A-Za-z0-9._%+-]+')
+WORD_BOUNDARY = re.compile(r'\b')
+
 def extract_email(text):
-    pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(pattern, text)
+    # findall would try EMAIL from every position of a long run of local-part characters ("1-2-3-..."),
+    # scanning to its end each time. every start in a run shares the run's @ and domain, so EMAIL
+    # is only tried once per run that ends in an @, from its first word boundary
+    emails = []
+    pos = 0
+    for local in EMAIL_LOCAL.finditer(text):
+        start, at = max(local.start(), pos), local.end()
+        if start >= at or not text.startswith('@', at):
+            continue
+        boundary = WORD_BOUNDARY.search(text, start, at)
+        match = EMAIL.match(text, boundary.start()) if boundary and boundary.start() < at else None
+        if match:
+            emails.append(match.group())
+            pos = match.end()
     return list(set(emails))
 
 def extract_phone_number(text):
@@ -69,6 +102,143 @@ def extract_phone_number(text):
     
     return list(set(cleaned))
 
+# The degree and institution patterns of extract_education backtrack quadratically (cubically on
+# whitespace runs) when findall runs them over long unpunctuated pdfminer text, so their matches are
+# found by the scanners below instead, which give the same groups in linear time
+DEGREE_START = re.compile(r'(?i)(?=bachelor|master|phd|doctorate|mba|bs|ba|ms|ma|btech|mtech)')
+DEGREE_WORDS = [re.compile(word, re.IGNORECASE) for word in
+                ('bachelor', 'master', 'phd', 'doctorate', 'mba', 'bs', 'ba', 'ms', 'ma', 'btech', 'mtech')]
+SCHOOL_OF = re.compile(r'(?i)(university|college|institute|school)\s+of\s+([a-z\s]+)')
+INSTITUTION_SPACE = re.compile(r'(?i)(?<!\s)\s+(?=university|college|institute)')
+INSTITUTION_WORD = re.compile(r'(?i)university|college|institute')
+GPA = re.compile(r'(?i)(gpa|cgpa)\s*:?\s*([0-9.]+)')
+WORD_RUN = re.compile(r'(?i)[a-z\s]+')
+SPACE_RUN = re.compile(r'\s+')
+YEAR = re.compile(r'\d{4}')
+
+class TextRuns:
+    # Runs of [a-z\s] (what both lazy groups may capture), whitespace runs and newlines of a text,
+    # each found in one linear pass and then looked up by bisection
+    def __init__(self, text):
+        self.text = text
+        self.words = [m.span() for m in WORD_RUN.finditer(text)]
+        self.word_starts = [start for start, _ in self.words]
+        self.spaces = [m.span() for m in SPACE_RUN.finditer(text)]
+        self.space_ends = [end for _, end in self.spaces]
+        self.newlines = [m.start() for m in re.finditer('\n', text)]
+        self.tails = {}
+        self.skip = {}
+
+    def word_end(self, pos):
+        # first position from pos on that [a-z\s] doesn't match
+        i = bisect_right(self.word_starts, pos) - 1
+        if i >= 0 and self.words[i][1] > pos:
+            return self.words[i][1]
+        return pos
+
+    def line_end(self, pos):
+        i = bisect_left(self.newlines, pos)
+        return self.newlines[i] if i < len(self.newlines) else len(self.text)
+
+    def stop(self, pos):
+        # where ([a-z\s]+?)(?:\d{4}|\n|$) ends its group for characters from pos on: the first newline,
+        # four digits or end of text reached before a character outside [a-z\s]
+        end = self.word_end(pos)
+        newline = self.line_end(pos)
+        if newline < end:
+            return newline
+        if end == len(self.text) or YEAR.match(self.text, end):
+            return end
+        return None
+
+    def tail(self, i):
+        # (start, end) of the degree pattern's second group when \s+ starts the i-th whitespace run.
+        # \s+ is greedy, so the group is tried from the end of the run first, then one character
+        # back, then from before the last newline in the run, which ends it on that newline
+        if i not in self.tails:
+            start, end = self.spaces[i]
+            found = None
+            stop = self.stop(end)
+            if stop is not None and end < len(self.text) and self.word_end(end) > end:
+                found = (end, stop)
+            elif stop is not None and end - 1 > start:
+                found = (end - 1, stop)
+            else:
+                j = bisect_left(self.newlines, end) - 1
+                if j >= 0 and self.newlines[j] >= start + 2:
+                    found = (self.newlines[j] - 1, self.newlines[j])
+            self.tails[i] = found
+        return self.tails[i]
+
+    def degree_tail(self, pos):
+        # .*? can't leave the keyword's line and (?:in|of)? never changes the groups, so the match is
+        # decided by the first whitespace run starting on that line that has a tail. runs known to
+        # have none are skipped over, repeated keywords on one line don't rescan them
+        i = bisect_right(self.space_ends, pos)
+        path = []
+        while i < len(self.spaces) and self.tail(i) is None:
+            path.append(i)
+            i = self.skip.get(i, i + 1)
+        for j in path:
+            self.skip[j] = i
+        if i < len(self.spaces) and self.spaces[i][0] <= self.line_end(pos):
+            return self.tail(i)
+        return None
+
+def degree_matches(text):
+    # re.findall(r'(?i)(bachelor|master|phd|doctorate|mba|bs|ba|ms|ma|btech|mtech).*?(?:in|of)?\s+
+    # ([a-z\s]+?)(?:\d{4}|\n|$)', text) in linear time
+    runs = TextRuns(text)
+    matches = []
+    pos = 0
+    while True:
+        start = DEGREE_START.search(text, pos)
+        if not start:
+            return matches
+        found = None
+        for word in DEGREE_WORDS:
+            keyword = word.match(text, start.start())
+            found = runs.degree_tail(keyword.end()) if keyword else None
+            if found:
+                break
+        if not found:
+            pos = start.start() + 1
+            continue
+        group_start, group_end = found
+        matches.append((keyword.group(), text[group_start:group_end]))
+        if YEAR.match(text, group_end):
+            pos = group_end + 4
+        elif text.startswith('\n', group_end):
+            pos = group_end + 1
+        else:
+            pos = group_end
+
+def institution_matches(text):
+    # re.findall(r'(?i)([a-z\s]+?)\s+(university|college|institute)', text) in linear time. a match
+    # starts at the first [a-z\s] character whose run reaches whitespace followed by one of the
+    # words, and the lazy group ends at the first such whitespace character after its start
+    spaces = [m.span() for m in INSTITUTION_SPACE.finditer(text)]
+    space_starts = [start for start, _ in spaces]
+    matches = []
+    pos = 0
+    for run in WORD_RUN.finditer(text):
+        start = max(run.start(), pos)
+        while start < run.end():
+            i = bisect_right(space_starts, start + 1) - 1
+            if i >= 0 and spaces[i][1] > start + 1:
+                group_end = start + 1
+            elif i + 1 < len(spaces):
+                i += 1
+                group_end = spaces[i][0]
+            else:
+                return matches
+            if group_end >= run.end():
+                break
+            word = INSTITUTION_WORD.match(text, spaces[i][1])
+            matches.append((text[start:group_end], word.group()))
+            start = pos = word.end()
+    return matches
+
 def extract_education(text):
     education = []
     lines = text.split('\n')
@@ -90,16 +260,15 @@ def extract_education(text):
     # Extract from education section or full text if no section found
     search_text = '\n'.join(education_section) if education_section else text
     
-    # Patterns for degrees and institutions
-    degree_patterns = [
-        r'(?i)(bachelor|master|phd|doctorate|mba|bs|ba|ms|ma|btech|mtech).*?(?:in|of)?\s+([a-z\s]+?)(?:\d{4}|\n|$)',
-        r'(?i)(university|college|institute|school)\s+of\s+([a-z\s]+)',
-        r'(?i)([a-z\s]+?)\s+(university|college|institute)',
-        r'(?i)(gpa|cgpa)\s*:?\s*([0-9.]+)'
+    # Degrees, institutions and GPA, in this order
+    found = [
+        degree_matches(search_text),
+        SCHOOL_OF.findall(search_text),
+        institution_matches(search_text),
+        GPA.findall(search_text)
     ]
     
-    for pattern in degree_patterns:
-        matches = re.findall(pattern, search_text)
+    for matches in found:
         for match in matches:
             edu_text = ' '.join(match).strip()
             if len(edu_text) > 5 and edu_text not in education:
@@ -256,10 +425,10 @@ def extract_work_description(text, job_title, company, start_line_idx, lines):
     return ' '.join(description_lines) if description_lines else "No description available"
 
 def total_experience(jobs):
+    # Years covered by the jobs' from/to months, overlapping or concurrent jobs count once
     if not jobs:
         return 0
-    total_months = sum(job["duration_months"] for job in jobs)
-    return round(total_months / 12, 2)
+    return round(timeline.experience_months(jobs) / 12, 2)
 
 def calculate_work_duration(text): #name something else as it also extracts job title and company name
     if not text:
@@ -267,12 +436,13 @@ def calculate_work_duration(text): #name something else as it also extracts job
     
     date_patterns = [
         r'(?P<from>\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Sept|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{4})\s*(?:--|[-–—]|to)\s*(?P<to>(?:Present|Current|Now|Ongoing|\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Sept|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{4}))',
-        r'(?P<from>\b\d{4})\s*(?:--|[-–—]|to)\s*(?P<to>(?:Present|Current|Now|Ongoing|\b\d{4}))',
+        r'(?P<from>(?<!/)\b\d{4})\s*(?:--|[-–—]|to)\s*(?P<to>(?:Present|Current|Now|Ongoing|\b\d{4}))',
         r'(?P<from>\b\d{1,2}/\d{4})\s*(?:--|[-–—]|to)\s*(?P<to>(?:Present|Current|Now|Ongoing|\b\d{1,2}/\d{4}))',
     ]
 
     jobs = []
     lines = text.split('\n')
+    trace = decision_trace.current()
 
     for i, line in enumerate(lines):
         original_line = line
@@ -280,15 +450,21 @@ def calculate_work_duration(text): #name something else as it also extracts job
         if not line:
             continue
             
-        for pattern in date_patterns:
+        for pattern_idx, pattern in enumerate(date_patterns):
             match = re.search(pattern, line, re.IGNORECASE)
             if match:
                 from_str = match.group('from')
                 to_str = match.group('to')
+                if trace:
+                    trace.add("date_matched", line=i, text=line, pattern=pattern_idx, start=from_str, end=to_str)
 
                 try:
+                    # A bare year ("2016 - 2017") is January of that year and keeps a year-only label,
+                    # dateparser would fill in the month and day the parser happens to run on
+                    year_only = pattern_idx == 1
+                    label = '%Y' if year_only else '%b %Y'
                     from_str_normalized = from_str.replace('Sept', 'Sep')
-                    start = dateparser.parse(from_str_normalized)
+                    start = datetime(int(from_str), 1, 1) if year_only else dateparser.parse(from_str_normalized)
                     
                     present_keywords = ['present', 'current', 'now', 'ongoing']
                     if any(keyword in to_str.lower() for keyword in present_keywords):
@@ -299,9 +475,11 @@ def calculate_work_duration(text): #name something else as it also extracts job
                             end = datetime(today.year, today.month + 1, 1) - relativedelta(days=1)
                     else:
                         to_str_normalized = to_str.replace('Sept', 'Sep')
-                        end = dateparser.parse(to_str_normalized)
+                        end = datetime(int(to_str), 1, 1) if year_only else dateparser.parse(to_str_normalized)
                     
                     if not start or not end:
+                        if trace:
+                            trace.add("job_skipped", line=i, reason="dates did not parse", start=from_str, end=to_str)
                         continue
                         
                     duration = relativedelta(end, start)
@@ -315,6 +493,8 @@ def calculate_work_duration(text): #name something else as it also extracts job
                             months += month_fraction
                     
                     if months <= 0:
+                        if trace:
+                            trace.add("job_skipped", line=i, reason="no whole month between the dates", months=months)
                         continue
 
                     job_title = "Unknown Title"
@@ -332,6 +512,9 @@ def calculate_work_duration(text): #name something else as it also extracts job
                             not any(keyword.lower() in potential_company.lower() for keyword in ['engineer', 'scientist', 'analyst', 'manager', 'developer', 'specialist', 'consultant', 'architect', 'lead', 'director'])):
                             # This is likely a company, look for job title in previous lines
                             company = potential_company
+                            if trace:
+                                trace.add("company_chosen", line=i, company=company,
+                                          reason="before the date and its comma, no job keyword")
                             
                             # Look for job title in previous lines
                             for j in range(max(0, i-3), i):
@@ -342,6 +525,9 @@ def calculate_work_duration(text): #name something else as it also extracts job
                                         not re.search(r'\d{4}', candidate_line) and
                                         any(keyword.lower() in candidate_line.lower() for keyword in ['engineer', 'scientist', 'analyst', 'manager', 'developer', 'specialist', 'consultant', 'architect', 'lead', 'director'])):
                                         job_title = candidate_line.strip()
+                                        if trace:
+                                            trace.add("title_chosen", line=j, title=job_title,
+                                                      reason="job keyword in a line above a company date line")
                                         break
                     else:
                         # Standard format - job title before date
@@ -353,6 +539,8 @@ def calculate_work_duration(text): #name something else as it also extracts job
                             clean_title = re.sub(r'[\t\s]+$', '', clean_title)
                             if clean_title and not re.search(r'\d{4}', clean_title) and len(clean_title) > 2:
                                 job_title = clean_title
+                                if trace:
+                                    trace.add("title_chosen", line=i, title=job_title, reason="same line, before the date")
                     
                     # If not found, look in previous lines for job title
                     if job_title == "Unknown Title":
@@ -369,6 +557,8 @@ def calculate_work_duration(text): #name something else as it also extracts job
                                     title_candidate = candidate_line.replace('##', '').strip()
                                     if title_candidate and len(title_candidate) < 80:
                                         job_title = title_candidate
+                                        if trace:
+                                            trace.add("title_chosen", line=j, title=job_title, reason="markdown header above")
                                         break
                                 
                                 # Check for lines with job keywords or typical job titles
@@ -376,7 +566,11 @@ def calculate_work_duration(text): #name something else as it also extracts job
                                 if (any(keyword.lower() in candidate_line.lower() for keyword in job_keywords) and
                                     len(candidate_line) < 80 and len(candidate_line.split()) <= 6):
                                     job_title = candidate_line.strip()
+                                    if trace:
+                                        trace.add("title_chosen", line=j, title=job_title, reason="job keyword in a line above")
                                     break
+                        if trace and job_title == "Unknown Title":
+                            trace.add("title_chosen", line=i, title=job_title, reason="nothing before the date or above")
                     
                     # Look for company in the line immediately after the date line
                     for j in range(i+1, min(len(lines), i+3)):
@@ -404,6 +598,8 @@ def calculate_work_duration(text): #name something else as it also extracts job
                                 not re.search(r'\d{4}', company_candidate) and
                                 not company_candidate.lower() in ['remote', 'onsite', 'hybrid']):
                                 company = company_candidate
+                                if trace:
+                                    trace.add("company_chosen", line=j, company=company, reason="first plain line after the date")
                                 break
                     
                     # Fallback: Try NER for company extraction if not found
@@ -424,6 +620,10 @@ def calculate_work_duration(text): #name something else as it also extracts job
                                            org.lower() not in ['remote', 'present', 'current', 'environment']]
                             if filtered_orgs:
                                 company = filtered_orgs[0]
+                        if trace:
+                            trace.add("company_chosen", line=i, company=company,
+                                      reason="NER ORG around the date" if company != "Unknown Company" else "no ORG around the date",
+                                      orgs=orgs)
 
                     work_description = extract_work_description(text, job_title, company, i, lines)
 
@@ -431,16 +631,20 @@ def calculate_work_duration(text): #name something else as it also extracts job
                         "job_title": job_title,
                         "company": company,
                         "duration_months": round(months, 1),
-                        "from": start.strftime('%b %Y'),
-                        "to": end.strftime('%b %Y') if not any(keyword in to_str.lower() for keyword in present_keywords) else "Present",
+                        "from": start.strftime(label),
+                        "to": end.strftime(label) if not any(keyword in to_str.lower() for keyword in present_keywords) else "Present",
                         "is_current": any(keyword in to_str.lower() for keyword in present_keywords),
                         "work_description": work_description
                     }
                     
                     jobs.append(job_entry)
+                    if trace:
+                        trace.add("job_added", line=i, title=job_title, company=company, months=job_entry["duration_months"])
                     break
                     
-                except Exception:
+                except Exception as e:
+                    if trace:
+                        trace.add("job_skipped", line=i, reason="error", error=repr(e))
                     continue
                     
     return jobs
@@ -452,8 +656,10 @@ def extract_work_experience(text):
         r"(?i)employment[\s\*\[\]]*history",
         r"(?i)career[\s\*\[\]]*history",
         r"(?i)experience[\s\*\[\]]*:",
-        r"(?i)\*\*.*work.*experience.*\*\*",
-        r"(?i)\[work.*experience.*\]"
+        # "**...work...experience...**" and "[work...experience...]", anchored and taking the first
+        # occurrence of each part, the unanchored .* version backtracks quadratically on long lines
+        r"(?i)^(?:(?!\*\*).)*\*\*(?:(?!work).)*work(?:(?!experience).)*experience.*\*\*",
+        r"(?i)^(?:(?!\[work).)*\[work(?:(?!experience).)*experience.*\]"
     ]
     
     next_section_keywords = [
@@ -466,13 +672,14 @@ def extract_work_experience(text):
         r"(?i)objective",
         r"(?i)achievements?",
         r"(?i)awards?",
-        r"(?i)\*\*.*education.*\*\*"
+        r"(?i)^(?:(?!\*\*).)*\*\*(?:(?!education).)*education.*\*\*"
     ]
     
     lines = text.splitlines()
     experience_text = []
     recording = False
     section_found = False
+    trace = decision_trace.current()
     
     for i, line in enumerate(lines):
         original_line = line
@@ -483,6 +690,8 @@ def extract_work_experience(text):
                 if re.search(header_pattern, line_stripped):
                     recording = True
                     section_found = True
+                    if trace:
+                        trace.add("section_found", line=i, text=line_stripped, pattern=header_pattern)
                     break
         
         if recording:
@@ -491,6 +700,9 @@ def extract_work_experience(text):
                 if re.search(next_pattern, line_stripped):
                     recording = False
                     section_ended = True
+                    if trace:
+                        trace.add("section_ended", line=i, text=line_stripped, pattern=next_pattern,
+                                  kept=len(experience_text))
                     break
             
             if recording and not section_ended:
@@ -504,6 +716,8 @@ def extract_work_experience(text):
         date_pattern = r'\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Sept|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{4}\s*(?:--|[-–—]|to)\s*(?:Present|Current|Now|Ongoing|\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Sept|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{4})'
         date_matches = re.findall(date_pattern, text, re.IGNORECASE)
         
+        if trace:
+            trace.add("section_missing", date_ranges=len(date_matches), whole_text=len(date_matches) >= 2)
         # If we find multiple date ranges, assume work experience is embedded throughout
         if len(date_matches) >= 2:
             return text  # Return the full text for processing
@@ -511,39 +725,47 @@ def extract_work_experience(text):
     return '\n'.join(experience_text) if experience_text else None
 
 def save_to_json(data, filename="extracted_data.json"):
+    # Values may be result dicts or records.Candidate, both are written as the same JSON
     try:
         with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            json.dump(data, f, indent=2, ensure_ascii=False, default=records.json_default)
         print(f"Data saved to {filename}")
         return True
     except Exception as e:
         print(f"Error saving to JSON: {e}")
         return False
 
-def parse_resume(file_path):
-    # Extract text based on file type
+def parse_resume(file_path, text_cache=None):
+    # Extract text based on file type, a text_cache.TextCache skips pdfminer/docx for unchanged files
     ext = os.path.splitext(file_path)[1].lower()
     if ext == '.pdf':
-        text = extract_text_from_pdf(file_path)
+        extractor = read_pdf_text
     elif ext == '.docx':
-        text = extract_text_from_docx(file_path)
+        extractor = read_docx_text
     else:
         return None
+    try:
+        text = text_cache.extract(file_path, extractor, EXTRACTOR_VERSION) if text_cache else extractor(file_path)
+    except Exception:
+        return None
     
     if not text:
         return None
     
-    # Extract all information
-    return {
-        "name": extract_name(text),
-        "emails": extract_email(text),
-        "phone_numbers": extract_phone_number(text),
-        "education": extract_education(text),
-        "skills": extract_skills(text),
-        "work_experiences": calculate_work_duration(extract_work_experience(text) or ""),
-        "projects": extract_projects(text),
-        "certifications": extract_certifications(text)
-    }
+    # Extract all information, with a decision trace if decision_trace selected this file
+    with decision_trace.tracing(file_path) as trace:
+        if trace:
+            trace.add("text", characters=len(text), lines=text.count('\n') + 1)
+        return {
+            "name": extract_name(text),
+            "emails": extract_email(text),
+            "phone_numbers": extract_phone_number(text),
+            "education": extract_education(text),
+            "skills": extract_skills(text),
+            "work_experiences": calculate_work_duration(extract_work_experience(text) or ""),
+            "projects": extract_projects(text),
+            "certifications": extract_certifications(text)
+        }
 
 # Test the parser with sample files
 if __name__ == "__main__":
@@ -568,7 +790,8 @@ if __name__ == "__main__":
             #print(f"Processing: {os.path.basename(file_path)}")
             result = parse_resume(file_path)
             if result:
-                results[os.path.basename(file_path)] = result
+                # Held as a slotted record with shared skill/company strings until saved
+                results[os.path.basename(file_path)] = records.Candidate.from_dict(result)
             else:
                 #print(f"Failed to process: {file_path}")
                 continue
@@ -1,30 +1,245 @@
 import json
+import time
+import sqlite3
+import logging
+import argparse
+from pathlib import Path
 
-with open('extracted_data.json', 'r') as f:
-    data = json.load(f)
-
-print("=== RESUME PARSING RESULTS ANALYSIS ===\n")
-
-for resume_file, resume_data in data['docx'].items():
-    filename = resume_file.split('/')[-1]
-    print(f"=== {filename} ===")
-    print(f"Name: {resume_data['name']}")
-    print("Work Experiences:")
-    
-    if resume_data['work_experiences']:
-        for i, exp in enumerate(resume_data['work_experiences'], 1):
-            print(f"  {i}. Job Title: {exp['job_title']}")
-            print(f"     Company: {exp['company']}")
-            print(f"     Duration: {exp['from']} - {exp['to']} ({exp['duration_months']} months)")
-            print(f"     Current: {'Yes' if exp['is_current'] else 'No'}")
-            print()
-    else:
-        print("  No work experiences found")
-    
-    print(f"Total Experience: {resume_data['total_experience_years']} years")
-    print(f"Education: {len(resume_data['education'])} entries")
-    print(f"Skills: {len(resume_data['skills'])} entries")
-    print(f"Emails: {resume_data['emails']}")
-    print(f"Phone: {resume_data['phone_numbers']}")
-    print("-" * 80)
-    print()
+import numpy as np
+import pandas as pd
+
+import canonical
+import timeline
+from run_journal import OK
+from work_queue import PENDING, LEASED
+
+logger = logging.getLogger(__name__)
+
+#corpus analytics over parsed output. records are flattened once into three tables, candidates (one row
+#per file), skills and jobs (one row per item, with the candidate's row number), everything after that
+#is column arithmetic: value_counts, bincount, histogram, mean of boolean columns
+EXPERIENCE_BINS = [0, 1, 2, 3, 5, 7, 10, 15, 20, 30, np.inf]  #years
+TOP = 20
+
+def is_filled(value):
+    return value not in (None, "", [], {})
+
+def iter_json(path):
+    #Parser's {file: record} or Basic_Parser's {"metadata": ..., "resumes": {file: record}}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data.get("resumes"), dict):
+        data = data["resumes"]
+    return iter(data.items())
+
+def iter_jsonl(path):
+    #the run journal ({"file", "status", "result"} per line) or one record per line with a "file" key
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.warning(f"{path}: line {number + 1} is not JSON, skipped")
+                continue
+            if "status" in entry and "result" in entry:
+                yield Path(entry["file"]).name, entry["result"] if entry["status"] == OK else None
+            else:
+                yield Path(str(entry.pop("file", number))).name, entry
+
+def iter_store(path):
+    #the shared work queue's SQLite file, finished files only
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute("SELECT file, state, result FROM tasks WHERE state NOT IN (?, ?) ORDER BY file",
+                                  (PENDING, LEASED))
+        for file, state, result in rows:
+            yield Path(file).name, json.loads(result) if state == OK and result else None
+    finally:
+        connection.close()
+
+def iter_records(path):
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".journal"):
+        return iter_jsonl(path)
+    if suffix in (".db", ".sqlite", ".sqlite3"):
+        return iter_store(path)
+    return iter_json(path)
+
+class Corpus:
+    #candidates: file, parsed (bool) and one has_<field> column per top-level field seen.
+    #skills: candidate, skill. jobs: candidate, title, company, months, current, start, end (the from/to text)
+    def __init__(self, records):
+        files = []
+        filled = {}  #field: rows it was extracted for
+        skill_rows, skill_values = [], []
+        job_rows, titles, companies, months, current, starts, ends = [], [], [], [], [], [], []
+        for row, (file, record) in enumerate(records):
+            files.append(file)
+            record = record or {}
+            for key, value in record.items():
+                rows = filled.setdefault(key, [])
+                if is_filled(value):
+                    rows.append(row)
+            skills = record.get("skills") or ()
+            skill_rows += [row] * len(skills)
+            skill_values += skills
+            for job in record.get("work_experiences") or ():
+                job_rows.append(row)
+                titles.append(job.get("job_title"))
+                companies.append(job.get("company"))
+                months.append(job.get("duration_months"))
+                current.append(bool(job.get("is_current")))
+                starts.append(job.get("from"))
+                ends.append(job.get("to"))
+        self.candidates = pd.DataFrame({"file": files})
+        parsed = np.zeros(len(files), dtype=bool)
+        for key, rows in sorted(filled.items()):
+            column = np.zeros(len(files), dtype=bool)
+            column[rows] = True
+            self.candidates[f"has_{key}"] = column
+            parsed |= column
+        self.candidates["parsed"] = parsed
+        self.fields = sorted(filled)
+        self.canonicalizer = None
+        self.skills = pd.DataFrame({"candidate": np.array(skill_rows, dtype=np.int64), "skill": skill_values})
+        self.jobs = pd.DataFrame({
+            "candidate": np.array(job_rows, dtype=np.int64),
+            "title": titles,
+            "company": companies,
+            "months": pd.to_numeric(pd.Series(months, dtype=object), errors="coerce").to_numpy(dtype=float),
+            "current": np.array(current, dtype=bool),
+            "start": starts,
+            "end": ends,
+        })
+
+    @classmethod
+    def load(cls, path):
+        return cls(iter_records(path))
+
+    def canonicalize(self, canonicalizer=None):
+        #company_id and title_id columns, -1 where the string is a placeholder. each distinct raw string is
+        #looked up once. without a prebuilt index one is built from this corpus's own jobs
+        if canonicalizer is None:
+            canonicalizer = canonical.Canonicalizer()
+            canonicalizer.companies.build(self.jobs["company"].dropna())
+            canonicalizer.titles.build(self.jobs["title"].dropna())
+        for column, index in (("company", canonicalizer.companies), ("title", canonicalizer.titles)):
+            codes, uniques = pd.factorize(self.jobs[column])
+            ids = [index.canonicalize(value) for value in uniques]
+            #a missing value has code -1, which picks the trailing -1
+            ids = np.array([-1 if i is None else i for i in ids] + [-1], dtype=np.int64)
+            self.jobs[f"{column}_id"] = ids[codes]
+        self.canonicalizer = canonicalizer
+        return canonicalizer
+
+    def __len__(self):
+        return len(self.candidates)
+
+def skill_frequencies(corpus, top=TOP):
+    #candidates listing each skill, case folded, a skill repeated in one resume counts once
+    if corpus.skills.empty:
+        return pd.DataFrame(columns=["skill", "candidates", "share"])
+    keys = corpus.skills["skill"].astype(str).str.strip().str.lower()
+    pairs = pd.DataFrame({"candidate": corpus.skills["candidate"], "key": keys}).drop_duplicates()
+    counts = pairs["key"].value_counts()
+    #the spelling most candidates used for the label
+    spelling = (pd.DataFrame({"key": keys, "skill": corpus.skills["skill"]})
+                .value_counts().reset_index().drop_duplicates("key").set_index("key")["skill"])
+    table = pd.DataFrame({"skill": spelling.reindex(counts.index).to_numpy(), "candidates": counts.to_numpy()})
+    table["share"] = table["candidates"] / len(corpus)
+    return table.head(top)
+
+def experience_distribution(corpus, reference=None):
+    #merged job intervals per candidate, overlapping jobs count once. current jobs run to reference (a month
+    #number, default this month) in the merged and the summed figures alike
+    jobs_timeline = timeline.Timeline.from_corpus(corpus, reference)
+    with_jobs = np.bincount(corpus.jobs["candidate"].to_numpy(), minlength=len(corpus)) > 0
+    years = jobs_timeline.years()[with_jobs]
+    counts, _ = np.histogram(years, bins=EXPERIENCE_BINS)
+    labels = [f"{low:g}-{high:g}" if np.isfinite(high) else f"{low:g}+" for low, high in zip(EXPERIENCE_BINS, EXPERIENCE_BINS[1:])]
+    quantiles = np.quantile(years, [0.1, 0.25, 0.5, 0.75, 0.9]) if len(years) else np.full(5, np.nan)
+    return {
+        "candidates_with_jobs": int(with_jobs.sum()),
+        "mean_years": float(years.mean()) if len(years) else None,
+        "percentiles": dict(zip(["p10", "p25", "p50", "p75", "p90"], np.round(quantiles, 2).tolist())),
+        "histogram": dict(zip(labels, counts.tolist())),
+        "jobs_per_candidate": float(len(corpus.jobs) / with_jobs.sum()) if with_jobs.any() else None,
+        "summed_mean_years": float(jobs_timeline.summed[with_jobs].mean() / 12) if len(years) else None,
+        "overlapping_share": float((jobs_timeline.overlap[with_jobs] > 0).mean()) if len(years) else None,
+        "gap_share": float((jobs_timeline.gaps[with_jobs] > 0).mean()) if len(years) else None,
+    }
+
+def current_employers(corpus, top=TOP):
+    #candidates currently at each canonical company, "NerdWallet, Remote" and "Nerdwallet Inc." count as one
+    if "company_id" not in corpus.jobs:
+        corpus.canonicalize()
+    current = corpus.jobs.loc[corpus.jobs["current"] & (corpus.jobs["company_id"] >= 0), ["candidate", "company_id"]]
+    if current.empty:
+        return pd.DataFrame(columns=["company", "candidates"])
+    counts = current.drop_duplicates()["company_id"].value_counts()
+    names = corpus.canonicalizer.companies.names
+    return pd.DataFrame({"company": [names[i] for i in counts.index], "candidates": counts.to_numpy()}).head(top)
+
+def coverage(corpus):
+    #share of all candidates each field was extracted for, a failed file counts against every field
+    columns = [f"has_{field}" for field in corpus.fields]
+    rates = corpus.candidates[columns].mean() if columns else pd.Series(dtype=float)
+    result = {"parsed": float(corpus.candidates["parsed"].mean()) if len(corpus) else 0.0}
+    result.update({column[4:]: float(rate) for column, rate in rates.items()})
+    return result
+
+def report(corpus, top=TOP, reference=None):
+    return {
+        "candidates": len(corpus),
+        "coverage": coverage(corpus),
+        "experience": experience_distribution(corpus, reference),
+        "skills": skill_frequencies(corpus, top).to_dict("records"),
+        "current_employers": current_employers(corpus, top).to_dict("records"),
+    }
+
+def summary_lines(data):
+    lines = [f"=== {data['candidates']} candidates ===", "Coverage:"]
+    lines += [f"  {field:20s} {rate:6.1%}" for field, rate in data["coverage"].items()]
+    experience = data["experience"]
+    lines.append(f"Experience ({experience['candidates_with_jobs']} candidates with jobs):")
+    if experience["mean_years"] is not None:
+        lines.append(f"  mean {experience['mean_years']:.1f} years, "
+                     + ", ".join(f"{k} {v}" for k, v in experience["percentiles"].items())
+                     + f", {experience['jobs_per_candidate']:.1f} jobs each")
+        lines.append(f"  {experience['summed_mean_years']:.1f} years if durations are summed, "
+                     f"{experience['overlapping_share']:.1%} have overlapping jobs, {experience['gap_share']:.1%} have gaps")
+        lines += [f"  {label:>7s} years {count:8d}" for label, count in experience["histogram"].items()]
+    lines.append("Top skills:")
+    lines += [f"  {row['skill'][:30]:30s} {row['candidates']:8d} {row['share']:6.1%}" for row in data["skills"]]
+    lines.append("Current employers:")
+    lines += [f"  {row['company'][:40]:40s} {row['candidates']:8d}" for row in data["current_employers"]]
+    return lines
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Skill, experience, employer and coverage statistics of parsed resumes')
+    parser.add_argument('input', nargs='?', default='extracted_data.json',
+                       help='Parser or Basic_Parser JSON, a run journal or JSONL file, or a work queue .db (default: extracted_data.json)')
+    parser.add_argument('--top', type=int, default=TOP, help=f'Rows in the skill and employer tables (default: {TOP})')
+    parser.add_argument('--canonical', default=None,
+                       help='Canonical company/title index from canonical.py build (default: built from the input)')
+    parser.add_argument('--as-of', default=None, help='Month "Present" ends in, YYYY-MM (default: this month)')
+    parser.add_argument('--output', default=None, help='Also write the report as JSON')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    corpus = Corpus.load(args.input)
+    corpus.canonicalize(canonical.Canonicalizer.load(args.canonical) if args.canonical else None)
+    loaded = time.perf_counter()
+    data = report(corpus, args.top, timeline.as_of(args.as_of))
+    logger.info(f"Loaded {len(corpus)} candidates in {loaded - started:.2f}s, report in {time.perf_counter() - loaded:.2f}s")
+    for line in summary_lines(data):
+        print(line)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
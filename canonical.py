@@ -0,0 +1,300 @@
+import re
+import json
+import time
+import logging
+import argparse
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from collections import Counter, OrderedDict, defaultdict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+#canonical company and title ids for the raw strings calculate_work_duration emits ("NerdWallet, Remote",
+#"Client: NerdWallet Inc.", "Sr. Data Engineer"). a lookup goes
+#    raw string -> LRU of recent raw strings -> normalized key -> trigram match on the key
+#and stops at the first hit, so a batch pays the regex work once per distinct spelling and the fuzzy
+#match once per distinct key the index hasn't seen. the trigram index only shortlists, the keys sharing
+#the most trigrams are compared with difflib, trigram overlap alone is poor on short names
+COMPANY = "company"
+TITLE = "title"
+LRU_SIZE = 50000
+FUZZY_THRESHOLD = 0.88  #SequenceMatcher ratio of the keys
+SHORTLIST = 5
+MIN_FUZZY_KEY = 5      #shorter keys only match exactly, "ibm" is not "ibx"
+
+#placeholders and lines the extractor mistakes for a company or title, these get no id
+NOT_NAMES = {"unknown company", "unknown title", "responsibilities", "description", "roles and responsibilities",
+             "remote", "onsite", "hybrid", "present", "current"}
+LABELS = re.compile(r"^(?:client|company|employer|organization|organisation|role|title|position|designation)\s*[:\-]\s*", re.I)
+#where the name ends: "NerdWallet, Remote", "Value Labs | India", "BHHC (Berkshire)", "Acme - Dallas"
+TAIL = re.compile(r"\s*(?:[,|(\[;]|\s[-–—]\s).*$")
+LEGAL_SUFFIXES = {"inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation", "co", "company",
+                  "companies", "plc", "pvt", "private", "gmbh", "ag", "sa", "bv", "pte", "pty", "lp"}
+TITLE_WORDS = {"sr": "senior", "snr": "senior", "jr": "junior", "mgr": "manager", "engr": "engineer",
+               "eng": "engineer", "dev": "developer", "assoc": "associate", "asst": "assistant", "admin": "administrator",
+               "mngr": "manager", "dir": "director", "vp": "vice president", "svp": "senior vice president"}
+
+def fold(text):
+    #lower case, accents and punctuation gone, & spelled out
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower().replace("&", " and ")
+    return re.findall(r"[a-z0-9]+", text.replace("'", ""))
+
+def strip_surface(text):
+    text = LABELS.sub("", text.strip())
+    return TAIL.sub("", text).strip(" .:-")
+
+def company_key(text):
+    words = fold(strip_surface(text))
+    if " ".join(words) in NOT_NAMES:
+        return None
+    if words[:1] == ["the"] and len(words) > 1:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    key = " ".join(words)
+    return None if not key or key in NOT_NAMES else key
+
+def title_key(text):
+    words = []
+    for word in fold(strip_surface(text)):
+        words += TITLE_WORDS.get(word, word).split()
+    key = " ".join(words)
+    return None if not key or key in NOT_NAMES else key
+
+KEY_FUNCTIONS = {COMPANY: company_key, TITLE: title_key}
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class CanonicalIndex:
+    #ids are positions in names. keys maps every normalized key seen (canonical or alias) to an id,
+    #grams maps a trigram to the canonical keys containing it
+    def __init__(self, kind, threshold=FUZZY_THRESHOLD, lru_size=LRU_SIZE):
+        if kind not in KEY_FUNCTIONS:
+            raise ValueError(f"Unknown kind {kind!r}, expected one of {', '.join(KEY_FUNCTIONS)}")
+        self.kind = kind
+        self.key = KEY_FUNCTIONS[kind]
+        self.threshold = threshold
+        self.lru_size = lru_size
+        self.names = []
+        self.keys = {}
+        self.grams = defaultdict(set)
+        self.canonical_keys = []
+        self.lru = OrderedDict()
+        self.stats = Counter()
+        #Basic_Parser's worker threads share one index
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _add(self, name, key):
+        canonical_id = len(self.names)
+        self.names.append(name)
+        self.keys[key] = canonical_id
+        self.canonical_keys.append(key)
+        for gram in trigrams(key):
+            self.grams[gram].add(canonical_id)
+        return canonical_id
+
+    def _fuzzy(self, key):
+        #the closest canonical key among those sharing the most trigrams with key. titles only match keys
+        #with as many words, a typo keeps the word count, "Lead Data Scientist" is not "Data Scientist"
+        if len(key) < MIN_FUZZY_KEY:
+            return None
+        shared = Counter()
+        for gram in trigrams(key):
+            shared.update(self.grams.get(gram, ()))
+        words = key.count(" ")
+        best, best_score = None, self.threshold
+        for canonical_id, _ in shared.most_common(SHORTLIST):
+            other = self.canonical_keys[canonical_id]
+            if self.kind == TITLE and other.count(" ") != words:
+                continue
+            score = SequenceMatcher(None, key, other).ratio()
+            if score >= best_score:
+                best, best_score = canonical_id, score
+        return best
+
+    def _lookup(self, text, key, learn):
+        if key is None:
+            self.stats["not_a_name"] += 1
+            return None
+        canonical_id = self.keys.get(key)
+        if canonical_id is not None:
+            self.stats["exact"] += 1
+            return canonical_id
+        canonical_id = self._fuzzy(key)
+        if canonical_id is not None:
+            self.stats["fuzzy"] += 1
+            self.keys[key] = canonical_id  #the next spelling like this one is an exact hit
+            return canonical_id
+        if not learn:
+            self.stats["miss"] += 1
+            return None
+        self.stats["new"] += 1
+        return self._add(strip_surface(text), key)
+
+    def lookup(self, text, learn=False):
+        #canonical id of a raw string, None for placeholders and, unless learn, for unseen names
+        if not text:
+            return None
+        with self.lock:
+            if text in self.lru:
+                self.lru.move_to_end(text)
+                self.stats["lru"] += 1
+                return self.lru[text]
+            key = self.key(text)
+            canonical_id = self._lookup(text, key, learn)
+            #placeholders stay None, a miss doesn't: a later canonicalize() of it has to add the name
+            if canonical_id is not None or key is None:
+                self.lru[text] = canonical_id
+                if len(self.lru) > self.lru_size:
+                    self.lru.popitem(last=False)
+            return canonical_id
+
+    def canonicalize(self, text):
+        #lookup that adds names it hasn't seen
+        return self.lookup(text, learn=True)
+
+    def name(self, canonical_id):
+        return None if canonical_id is None else self.names[canonical_id]
+
+    def build(self, surfaces):
+        #surfaces: raw strings, repeats included. the most frequent spelling of each key becomes the canonical
+        #name and keys are added most frequent first, so a rare misspelling folds into the common form
+        spellings = defaultdict(Counter)
+        for text, count in Counter(surfaces).items():
+            key = self.key(text) if text else None
+            if key is not None:
+                spellings[key][strip_surface(text)] += count
+        order = sorted(spellings, key=lambda k: (-sum(spellings[k].values()), k))
+        with self.lock:
+            for key in order:
+                if key in self.keys:
+                    continue
+                canonical_id = self._fuzzy(key)
+                if canonical_id is None:
+                    self._add(spellings[key].most_common(1)[0][0], key)
+                else:
+                    self.keys[key] = canonical_id
+            self.lru.clear()
+        return self
+
+    def take_stats(self):
+        with self.lock:
+            stats, self.stats = self.stats, Counter()
+        return stats
+
+    def to_dict(self):
+        with self.lock:
+            aliases = defaultdict(list)
+            for key, canonical_id in self.keys.items():
+                aliases[canonical_id].append(key)
+            return {"kind": self.kind, "threshold": self.threshold,
+                    "entries": [{"id": i, "name": name, "keys": sorted(aliases[i])} for i, name in enumerate(self.names)]}
+
+    @classmethod
+    def from_dict(cls, data, lru_size=LRU_SIZE):
+        index = cls(data["kind"], data.get("threshold", FUZZY_THRESHOLD), lru_size)
+        for entry in data["entries"]:
+            keys = entry["keys"]
+            #the canonical key is the one the name normalizes to, the rest are aliases
+            main = index.key(entry["name"]) or keys[0]
+            index._add(entry["name"], main)
+            for key in keys:
+                index.keys[key] = entry["id"]
+        return index
+
+class Canonicalizer:
+    #a company index and a title index, saved together
+    def __init__(self, companies=None, titles=None):
+        self.companies = companies or CanonicalIndex(COMPANY)
+        self.titles = titles or CanonicalIndex(TITLE)
+
+    @classmethod
+    def build(cls, results):
+        companies, titles = [], []
+        for job in iter_jobs(results):
+            companies.append(job.get("company"))
+            titles.append(job.get("job_title"))
+        canonicalizer = cls()
+        canonicalizer.companies.build(companies)
+        canonicalizer.titles.build(titles)
+        return canonicalizer
+
+    def job_ids(self, job, learn=True):
+        #(company id, title id) of a work_experiences entry
+        lookup = "canonicalize" if learn else "lookup"
+        return (getattr(self.companies, lookup)(job.get("company")),
+                getattr(self.titles, lookup)(job.get("job_title")))
+
+    def save(self, filename):
+        data = {"companies": self.companies.to_dict(), "titles": self.titles.to_dict()}
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        logger.info(f"Canonical index with {len(self.companies)} companies and {len(self.titles)} titles saved to {filename}")
+
+    @classmethod
+    def load(cls, filename):
+        if not Path(filename).exists():
+            return cls()
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(CanonicalIndex.from_dict(data["companies"]), CanonicalIndex.from_dict(data["titles"]))
+
+    def summary_lines(self):
+        lines = []
+        for label, index in (("Companies", self.companies), ("Titles", self.titles)):
+            stats = index.take_stats()
+            total = sum(stats.values())
+            lines.append(f"{label}: {len(index)} canonical, {len(index.keys)} keys"
+                         + (f", lookups {total}: " + ", ".join(f"{k} {v}" for k, v in sorted(stats.items())) if total else ""))
+        return lines
+
+def iter_jobs(results):
+    for record in results.values():
+        for job in (record or {}).get("work_experiences") or ():
+            yield job
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["resumes"] if isinstance(data.get("resumes"), dict) else data
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Build or query the canonical company and title index')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='Build the index from parsed results')
+    build.add_argument('results', nargs='+', help='Parser or Basic_Parser JSON output')
+    build.add_argument('--output', '-o', default='canonical_index.json', help='Index file (default: canonical_index.json)')
+    lookup = sub.add_parser('lookup', help='Canonical ids of raw company or title strings')
+    lookup.add_argument('kind', choices=[COMPANY, TITLE])
+    lookup.add_argument('names', nargs='+')
+    lookup.add_argument('--index', default='canonical_index.json', help='Index file (default: canonical_index.json)')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        results = {}
+        for path in args.results:
+            results.update({f"{path}:{name}": record for name, record in load_results(path).items()})
+        started = time.perf_counter()
+        canonicalizer = Canonicalizer.build(results)
+        logger.info(f"Built from {len(results)} results in {time.perf_counter() - started:.2f}s")
+        canonicalizer.save(args.output)
+        for line in canonicalizer.summary_lines():
+            print(line)
+    else:
+        canonicalizer = Canonicalizer.load(args.index)
+        index = canonicalizer.companies if args.kind == COMPANY else canonicalizer.titles
+        for name in args.names:
+            canonical_id = index.lookup(name)
+            print(f"{name!r:40s} -> {canonical_id} {index.name(canonical_id)!r}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import re
+import heapq
+from collections import namedtuple
+
+from redaction import fold
+
+EMAIL = "email"
+PHONE = "phone"
+LINKEDIN = "linkedin"
+URL = "url"
+ALL_KINDS = (EMAIL, PHONE, LINKEDIN, URL)
+#when two tokens start at the same offset the more specific one wins
+PRIORITY = {LINKEDIN: 0, EMAIL: 1, URL: 2, PHONE: 3}
+
+ContactToken = namedtuple("ContactToken", ["kind", "value", "raw", "start", "end"])
+
+LINKEDIN_PATTERN = re.compile(r'(?:https?://)?(?:(?:www|[a-z]{2})\.)?linkedin\.com/in/[\w\-]+/?', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE)
+URL_PATTERN = re.compile(r'(?:https?://|www\.)[\w\-]+(?:\.[\w\-]+)+[^\s<>"\'()\[\]{}|]*', re.IGNORECASE)
+#separators are spaces, tabs, nbsp, dots and dashes but never a line break, "21060\n443-985-4761" is a zip code followed by a phone, not one number
+PHONE_PATTERN = re.compile(
+    r'\+?1?[-\. \t ]?\(?[0-9]{3}\)?[-\. \t ]?[0-9]{3}[-\. \t ]?[0-9]{4}'  # US format, also covers (123) 456-7890
+    r'|\+?[0-9]{1,3}[-\. \t ]?[0-9]{3,4}[-\. \t ]?[0-9]{3,4}[-\. \t ]?[0-9]{3,4}'  # International
+)
+#every phone match sits inside one of these runs, the run scan is a cheap charset search
+PHONE_RUN = re.compile(r'[+(0-9][-\. \t ()+0-9]{9,}')
+PLACEHOLDER_EMAIL = re.compile(r'(example|test|sample|dummy)\.com')
+
+#RFC 5321 caps the local part at 64 and the domain at 255, the window around an '@' never cuts an address
+LOCAL_PART_MAX = 64
+DOMAIN_MAX = 255
+LINKEDIN_WINDOW = 200
+
+def to_e164(raw, default_country="1"):
+    #(704) 900-3323, 704.900.3323 and +1 704 900 3323 all become +17049003323
+    digits = re.sub(r'\D', '', raw)
+    if raw.startswith('+'):
+        return '+' + digits
+    if len(digits) == 10:
+        return '+' + default_country + digits
+    return '+' + digits
+
+def make_token(kind, raw, start):
+    if kind == PHONE:
+        #a match after another number can start on its separator, keep it out of the surface form
+        stripped = raw.lstrip('-. \t\u00a0')
+        start += len(raw) - len(stripped)
+        raw = stripped
+        if not 10 <= sum(c.isdigit() for c in raw) <= 15:
+            return None
+        value = to_e164(raw)
+    elif kind == EMAIL:
+        value = raw.lower()
+        if PLACEHOLDER_EMAIL.search(value):
+            return None
+    elif kind == URL:
+        raw = raw.rstrip('.,;:!?')
+        value = raw
+    else:
+        value = raw if raw.lower().startswith('http') else 'https://' + raw
+    return ContactToken(kind, value, raw, start, start + len(raw))
+
+def find_all(haystack, needle):
+    i = haystack.find(needle)
+    while i != -1:
+        yield i
+        i = haystack.find(needle, i + 1)
+
+def match_around(pattern, text, anchor, lo, hi):
+    #the match that contains the anchor offset, searched only in a window around it
+    for match in pattern.finditer(text, lo, hi):
+        if match.start() > anchor:
+            break
+        if match.end() > anchor:
+            return match
+    return None
+
+def email_tokens(text):
+    last_end = 0
+    at = text.find('@')
+    while at != -1:
+        match = match_around(EMAIL_PATTERN, text, at, max(last_end, at - LOCAL_PART_MAX), at + DOMAIN_MAX + 1)
+        if match:
+            last_end = match.end()
+            token = make_token(EMAIL, match.group(), match.start())
+            if token:
+                yield token
+        at = text.find('@', max(at + 1, last_end))
+
+def linkedin_tokens(text, folded):
+    last_end = 0
+    hit = folded.find('linkedin')
+    while hit != -1:
+        #"https://www." is the longest prefix the pattern allows, "in." style country hosts are shorter
+        match = match_around(LINKEDIN_PATTERN, text, hit, max(last_end, hit - 12), hit + LINKEDIN_WINDOW)
+        if match:
+            last_end = match.end()
+            yield make_token(LINKEDIN, match.group(), match.start())
+        hit = folded.find('linkedin', max(hit + 1, last_end))
+
+def url_tokens(text, folded):
+    last_end = 0
+    starts = heapq.merge(find_all(folded, 'http'), find_all(folded, 'www.'))
+    for start in starts:
+        if start < last_end:
+            continue
+        match = URL_PATTERN.match(text, start)
+        if match:
+            last_end = match.end()
+            yield make_token(URL, match.group(), start)
+
+def phone_tokens(text):
+    for run in PHONE_RUN.finditer(text):
+        for match in PHONE_PATTERN.finditer(text, run.start(), run.end()):
+            token = make_token(PHONE, match.group(), match.start())
+            if token:
+                yield token
+
+def iter_contacts(text):
+    #one lexer, four cheap anchors: '@', "linkedin", "http"/"www." and digit runs. each scanner is lazy
+    #and in document order, so merging them gives every token once, left to right, and a caller that
+    #stops early never scans the rest of the document
+    if not text:
+        return
+    folded = fold(text)
+    scanners = [linkedin_tokens(text, folded), email_tokens(text), url_tokens(text, folded), phone_tokens(text)]
+    last_end = 0
+    for token in heapq.merge(*scanners, key=lambda t: (t.start, PRIORITY[t.kind])):
+        #digits inside an address or url never come out as a phone too
+        if token.start >= last_end:
+            last_end = token.end
+            yield token
+
+def dedupe_key(token):
+    if token.kind == LINKEDIN:
+        return re.sub(r'://(?:www|[a-z]{2})\.', '://', token.value.lower()).rstrip('/')
+    if token.kind == URL:
+        return token.value.lower().rstrip('/')
+    return token.value
+
+def lex_contacts(text):
+    #every contact token in document order, duplicates included so callers can redact each surface form
+    return list(iter_contacts(text))
+
+def unique_values(tokens, kind):
+    #first token per value, in document order
+    seen = set()
+    values = []
+    for token in tokens:
+        if token.kind != kind:
+            continue
+        key = dedupe_key(token)
+        if key not in seen:
+            seen.add(key)
+            values.append(token)
+    return values
+
+def primary_contacts(text, kinds=ALL_KINDS):
+    #first token of each kind, contact blocks sit in the header so the scan usually ends there
+    found = {}
+    for token in iter_contacts(text):
+        if token.kind in kinds and token.kind not in found:
+            found[token.kind] = token
+            if len(found) == len(kinds):
+                break
+    return found
+
+def surface_forms(tokens, kind):
+    #every distinct way a contact is written, longest first so "+1-848-459-0642" goes before "848-459-0642"
+    forms = {token.raw for token in tokens if token.kind == kind}
+    return sorted(forms, key=lambda raw: (-len(raw), raw))
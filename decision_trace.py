@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import fnmatch
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+#decision tracing for the extractors. a trace point is
+#    trace = decision_trace.current()
+#    ...
+#    if trace:
+#        trace.add("title_chosen", title=job_title, reason="same line, before the date")
+#current() is a global check while tracing is off, so the extractors pay one call and a falsy test
+#per trace point. files are picked by glob, worker processes read the selection from the environment
+TRACE_ENV = "RESUME_TRACE"
+TRACE_DIR_ENV = "RESUME_TRACE_DIR"
+TRACE_SIZE = 512  #events kept per file, the oldest are dropped first
+KEEP = 32         #finished traces kept in memory for dump_recent()
+
+lock = threading.Lock()
+patterns = []
+trace_dir = None
+active = contextvars.ContextVar("decision_trace", default=None)
+finished = deque(maxlen=KEEP)
+
+class Trace:
+    #a bounded ring of events for one file
+    def __init__(self, file, size=TRACE_SIZE):
+        self.file = str(file)
+        self.started = time.perf_counter()
+        self.events = deque(maxlen=size)
+        self.dropped = 0
+
+    def add(self, event, **fields):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append({"event": event, "t": round(time.perf_counter() - self.started, 6), **fields})
+
+    def to_dict(self):
+        return {"file": self.file, "dropped": self.dropped, "events": list(self.events)}
+
+def select(globs=None, directory=None):
+    #globs: a comma separated string or a list matched against the file name and the path, None or
+    #empty turns tracing off. directory: every finished trace is also written there as JSON
+    global patterns, trace_dir
+    if isinstance(globs, str):
+        globs = [g.strip() for g in globs.split(",") if g.strip()]
+    with lock:
+        patterns = list(globs or [])
+        trace_dir = directory
+
+def export_env(globs, directory=None):
+    #for worker processes that start after this, they call select() from the environment on import
+    os.environ[TRACE_ENV] = ",".join(globs) if not isinstance(globs, str) else globs
+    if directory:
+        os.environ[TRACE_DIR_ENV] = str(directory)
+    select(globs, directory)
+
+def enabled():
+    return bool(patterns)
+
+def wanted(file):
+    path = str(file)
+    name = os.path.basename(path)
+    return any(fnmatch.fnmatch(name, g) or fnmatch.fnmatch(path, g) for g in patterns)
+
+def current():
+    if not patterns:
+        return None
+    return active.get()
+
+@contextmanager
+def tracing(file):
+    #traces the extractors run inside the block if the file is selected, yields the Trace or None.
+    #nested blocks for the same file keep the outer trace
+    if not patterns or active.get() is not None or not wanted(file):
+        yield None
+        return
+    trace = Trace(file)
+    token = active.set(trace)
+    try:
+        yield trace
+    finally:
+        active.reset(token)
+        finished.append(trace)
+        if trace_dir:
+            try:
+                dump([trace], Path(trace_dir) / f"{Path(file).name}.trace.json")
+            except OSError as e:
+                logger.warning(f"Trace for {file} not written: {str(e)}")
+
+def dump(traces, filename):
+    path = Path(filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = [trace.to_dict() for trace in traces]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data[0] if len(data) == 1 else data, f, indent=2, ensure_ascii=False, default=str)
+    return path
+
+def recent(file=None):
+    #finished traces still in memory, optionally only those of one file (name or path)
+    return [t for t in list(finished) if file is None or t.file == str(file) or Path(t.file).name == str(file)]
+
+def dump_recent(filename, file=None):
+    return dump(recent(file), filename)
+
+def format_event(event):
+    fields = ", ".join(f"{key}={value!r}" for key, value in event.items() if key not in ("event", "t"))
+    return f"{event['t'] * 1000:9.3f}ms {event['event']:16s} {fields}"
+
+select(os.environ.get(TRACE_ENV), os.environ.get(TRACE_DIR_ENV))
@@ -0,0 +1,135 @@
+import json
+import re
+import zlib
+import logging
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 16  #16 bands x 8 rows puts the LSH s-curve at ~0.7 similarity
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+#universal hashing (a*x + b) mod p, a and b stay below 2^32 so a*x + b fits in uint64
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(20250901)
+_A = _rng.integers(1, 2**32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, NUM_PERM, dtype=np.uint64)
+
+def shingles(text, size=SHINGLE_SIZE):
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def minhash_signature(text):
+    #text should be clean_content output so formatting noise doesn't change the signature
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode('utf-8')) for s in shingles(text or "")),
+        dtype=np.uint64
+    )
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1)
+
+def estimate_similarity(sig_a, sig_b):
+    return float(np.mean(sig_a == sig_b))
+
+class LSHIndex:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, bands=BANDS):
+        if NUM_PERM % bands:
+            raise ValueError(f"bands must divide {NUM_PERM}")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.signatures = {}
+        self.buckets = defaultdict(set)
+        #process_resumes_parallel shares one index between worker threads
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _query(self, signature):
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+
+        matches = []
+        for candidate in candidates:
+            similarity = estimate_similarity(signature, self.signatures[candidate])
+            if similarity >= self.threshold:
+                matches.append((candidate, similarity))
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+    def _add(self, record_id, signature):
+        self.signatures[record_id] = signature
+        for key in self._band_keys(signature):
+            self.buckets[key].add(record_id)
+
+    def query(self, signature):
+        with self.lock:
+            return self._query(signature)
+
+    def add(self, record_id, signature):
+        with self.lock:
+            self._add(record_id, signature)
+
+    def query_and_add(self, record_id, signature):
+        #atomic so two copies finishing together still see each other
+        with self.lock:
+            matches = [m for m in self._query(signature) if m[0] != record_id]
+            self._add(record_id, signature)
+            return matches
+
+    def clusters(self):
+        #groups of record ids that are near-duplicates of each other (size >= 2)
+        parent = {record_id: record_id for record_id in self.signatures}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        with self.lock:
+            for record_id, signature in self.signatures.items():
+                for other, _ in self._query(signature):
+                    parent[find(other)] = find(record_id)
+
+        groups = defaultdict(list)
+        for record_id in self.signatures:
+            groups[find(record_id)].append(record_id)
+        return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+    def save(self, filename):
+        with self.lock:
+            data = {
+                "threshold": self.threshold,
+                "bands": self.bands,
+                "signatures": {k: v.tolist() for k, v in self.signatures.items()}
+            }
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        logger.info(f"Dedup index with {len(data['signatures'])} signatures saved to {filename}")
+
+    @classmethod
+    def load(cls, filename, threshold=None):
+        if not Path(filename).exists():
+            return cls(threshold or DEFAULT_THRESHOLD)
+        with open(filename, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(threshold or data.get("threshold", DEFAULT_THRESHOLD), data.get("bands", BANDS))
+        for record_id, signature in data.get("signatures", {}).items():
+            index._add(record_id, np.array(signature, dtype=np.uint64))
+        return index
@@ -0,0 +1,243 @@
+import re
+import json
+import zlib
+import time
+import logging
+import argparse
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from pdfminer.high_level import extract_text
+
+from docx_stream import iter_paragraphs
+
+logger = logging.getLogger(__name__)
+
+RESUME = "resume"
+DOC_TYPES = [RESUME, "visa_notice", "id_document", "lab_report", "email", "job_description"]
+N_FEATURES = 2 ** 18
+FIRST_PAGE_CHARS = 4000
+MARGIN = 1.5  #a non-resume type has to beat resume by this much, a missed resume costs more than a wasted parse
+
+#seed weights, every phrase is hashed into the same feature space the text uses
+SEED_TERMS = {
+    RESUME: [
+        "work experience", "professional experience", "experience", "education", "skills",
+        "technical skills", "professional summary", "summary", "certifications", "projects",
+        "responsibilities", "employment history", "objective", "linkedin", "fn:resume", "fn:cv"
+    ],
+    "visa_notice": [
+        "i 797", "i 129", "notice of action", "approval notice", "uscis", "receipt number",
+        "petitioner", "beneficiary", "immigration services", "notice date", "homeland security",
+        "fn:i 797", "fn:i 129", "fn:approval", "fn:notice", "fn:visa"
+    ],
+    "id_document": [
+        "driver license", "drivers license", "identification card", "date of birth", "dob",
+        "expires", "endorsements", "restrictions", "hgt", "eyes", "passport", "fn:dl", "fn:id",
+        "fn:state id", "fn:license", "fn:passport", "fn:ead"
+    ],
+    "lab_report": [
+        "specimen", "reference range", "patient", "patient name", "collected", "laboratory",
+        "test name", "lab no", "report date", "reg date", "sample", "physician", "units",
+        "fn:lab", "fn:lab report", "fn:report"
+    ],
+    "email": [
+        "__email_header__", "forwarded message", "original message", "wrote", "regards",
+        "fn:email", "fn:fw", "fn:re"
+    ],
+    "job_description": [
+        "job description", "we are looking", "looking for", "the ideal candidate",
+        "about the role", "must have", "nice to have", "requirements", "job title",
+        "responsibilities include", "fn:jd", "fn:job description"
+    ],
+}
+
+EMAIL_HEADER = re.compile(r'^\s*(from|to|sent|subject|cc|date)\s*:', re.IGNORECASE | re.MULTILINE)
+
+def tokenize(text):
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+def ngrams(tokens, prefix=""):
+    for i, token in enumerate(tokens):
+        yield prefix + token
+        if i + 1 < len(tokens):
+            yield f"{prefix}{token} {tokens[i + 1]}"
+
+def feature_id(feature):
+    return zlib.crc32(feature.encode('utf-8')) % N_FEATURES
+
+def filename_tokens(filename):
+    #LabReport -> lab report, H-1B_APPROVAL -> h 1b approval
+    return tokenize(re.sub(r'([a-z])([A-Z])', r'\1 \2', Path(filename).stem))
+
+def extract_features(text, filename=""):
+    #hashed unigram/bigram presence from the text plus filename tokens under their own prefix
+    features = set(feature_id(f) for f in ngrams(tokenize(text)))
+    features.update(feature_id(f) for f in ngrams(filename_tokens(filename), "fn:"))
+    if len(EMAIL_HEADER.findall(text)) >= 2:
+        features.add(feature_id("__email_header__"))
+    return features
+
+def seed_feature(term):
+    if term.startswith("__"):
+        return term
+    if term.startswith("fn:"):
+        return "fn:" + " ".join(tokenize(term[3:]))
+    return " ".join(tokenize(term))
+
+def seed_weights():
+    weights = {doc_type: defaultdict(float) for doc_type in DOC_TYPES}
+    for doc_type, terms in SEED_TERMS.items():
+        for term in terms:
+            #filename signals are strong, people name their uploads honestly
+            weights[doc_type][feature_id(seed_feature(term))] += 2.0 if term.startswith("fn:") else 1.0
+    return weights
+
+_weights = seed_weights()
+
+def load_weights(filename):
+    global _weights
+    with open(filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    _weights = {
+        doc_type: defaultdict(float, {int(k): v for k, v in data.get(doc_type, {}).items()})
+        for doc_type in DOC_TYPES
+    }
+
+def save_weights(filename, weights=None):
+    weights = weights or _weights
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump({t: {str(k): v for k, v in w.items() if v} for t, w in weights.items()}, f)
+
+def score(features, weights=None):
+    weights = weights or _weights
+    return {doc_type: sum(weights[doc_type].get(f, 0.0) for f in features) for doc_type in DOC_TYPES}
+
+def classify_text(text, filename="", weights=None):
+    #with no text and no filename signal every score is 0 and the file goes to the full pipeline
+    scores = score(extract_features((text or "")[:FIRST_PAGE_CHARS], filename), weights)
+    best = max((t for t in DOC_TYPES if t != RESUME), key=lambda t: scores[t])
+    if scores[best] >= scores[RESUME] + MARGIN:
+        return best, scores[best] - scores[RESUME]
+    return RESUME, scores[RESUME] - scores[best]
+
+def first_page_text(file_path, max_chars=FIRST_PAGE_CHARS):
+    ext = Path(file_path).suffix.lower()
+    try:
+        if ext == '.pdf':
+            return extract_text(str(file_path), maxpages=1)[:max_chars]
+        if ext in ['.docx', '.doc']:
+            #the stream stops reading the zip once the first page's worth of text is in
+            parts = []
+            size = 0
+            for text in iter_paragraphs(file_path):
+                if text.strip():
+                    parts.append(text)
+                    size += len(text)
+                    if size >= max_chars:
+                        break
+            return "\n".join(parts)[:max_chars]
+    except Exception as e:
+        logger.debug(f"First page read failed {file_path}: {str(e)}")
+    return ""
+
+def classify_file(file_path, weights=None):
+    return classify_text(first_page_text(file_path), Path(file_path).name, weights)
+
+def train(samples, epochs=5, weights=None):
+    #perceptron over (text, filename, doc_type) samples, starts from the seed weights
+    weights = weights or seed_weights()
+    prepared = [(extract_features((text or "")[:FIRST_PAGE_CHARS], filename), label) for text, filename, label in samples]
+    for _ in range(epochs):
+        mistakes = 0
+        for features, label in prepared:
+            scores = score(features, weights)
+            predicted = max(DOC_TYPES, key=lambda t: scores[t])
+            if predicted != label:
+                mistakes += 1
+                for f in features:
+                    weights[label][f] += 1.0
+                    weights[predicted][f] -= 1.0
+        if mistakes == 0:
+            break
+    return weights
+
+class RoutingReport:
+    #collects per-file timings so the run summary can show what pre-classification saved
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+
+    def record(self, doc_type, ext, seconds, classify_seconds):
+        with self.lock:
+            self.entries.append((doc_type, ext, seconds, classify_seconds))
+
+    def summary_lines(self):
+        with self.lock:
+            entries = list(self.entries)
+        if not entries:
+            return []
+
+        resume_times = defaultdict(list)
+        counts = defaultdict(int)
+        for doc_type, ext, seconds, _ in entries:
+            counts[doc_type] += 1
+            if doc_type == RESUME:
+                resume_times[ext].append(seconds)
+
+        all_resume = [s for times in resume_times.values() for s in times]
+        overall = sum(all_resume) / len(all_resume) if all_resume else 0.0
+
+        estimated_full = 0.0
+        routed_cost = 0.0
+        overhead = 0.0
+        for doc_type, ext, seconds, classify_seconds in entries:
+            if doc_type == RESUME:
+                overhead += classify_seconds
+            else:
+                times = resume_times.get(ext)
+                estimated_full += sum(times) / len(times) if times else overall
+                routed_cost += seconds
+        saved = estimated_full - routed_cost - overhead
+
+        #callers can record their own routes (image-only PDFs) next to the classifier's types
+        doc_types = DOC_TYPES + sorted(t for t in counts if t not in DOC_TYPES)
+        lines = ["Document types: " + ", ".join(f"{t}={counts[t]}" for t in doc_types if counts[t])]
+        lines.append(f"Classifier overhead on resumes: {overhead:.2f}s")
+        lines.append(
+            f"Estimated full-parse time for routed files: {estimated_full:.2f}s, "
+            f"spent instead: {routed_cost:.2f}s, net saved: {saved:.2f}s"
+        )
+        return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify documents before resume parsing')
+    parser.add_argument('folder_path', help='Folder of documents to classify')
+    parser.add_argument('--weights', default=None, help='Trained weights JSON (default: seed weights)')
+    parser.add_argument('--train', default=None,
+                       help='JSON mapping file name to document type, trains and writes --weights')
+    args = parser.parse_args()
+
+    files = sorted(p for p in Path(args.folder_path).iterdir() if p.suffix.lower() in ['.pdf', '.docx', '.doc'])
+
+    if args.train:
+        if not args.weights:
+            parser.error("--train needs --weights to write to")
+        with open(args.train, "r", encoding="utf-8") as f:
+            labels = json.load(f)
+        samples = [(first_page_text(p), p.name, labels[p.name]) for p in files if p.name in labels]
+        save_weights(args.weights, train(samples))
+        print(f"Trained on {len(samples)} labelled files, weights saved to {args.weights}")
+        return
+
+    if args.weights:
+        load_weights(args.weights)
+
+    for path in files:
+        started = time.perf_counter()
+        doc_type, confidence = classify_file(path)
+        print(f"{doc_type:16s} {confidence:6.2f} {(time.perf_counter() - started) * 1000:8.1f}ms  {path.name}")
+
+if __name__ == "__main__":
+    main()
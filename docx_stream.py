@@ -0,0 +1,158 @@
+import re
+import time
+import zipfile
+import argparse
+from pathlib import Path
+
+from lxml import etree
+
+#bump when the text this module returns changes, cached extractions key on it
+VERSION = 2
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+P = W + 'p'
+R = W + 'r'
+T = W + 't'
+TBL = W + 'tbl'
+TAB = W + 'tab'
+PTAB = W + 'ptab'
+NO_BREAK_HYPHEN = W + 'noBreakHyphen'
+BR = W + 'br'
+CR = W + 'cr'
+BR_TYPE = W + 'type'
+
+DOCUMENT_PART = 'word/document.xml'
+HEADER_PART = re.compile(r'word/header\d*\.xml$')
+FOOTER_PART = re.compile(r'word/footer\d*\.xml$')
+
+def part_names(names):
+    #headers first since that's where contact blocks live, then the body, then footers
+    headers = sorted((n for n in names if HEADER_PART.match(n)), key=part_number)
+    footers = sorted((n for n in names if FOOTER_PART.match(n)), key=part_number)
+    body = [DOCUMENT_PART] if DOCUMENT_PART in names else []
+    return headers + body + footers
+
+def part_number(name):
+    digits = re.sub(r'\D', '', name)
+    return int(digits) if digits else 0
+
+def iter_part_paragraphs(stream, nested=True):
+    #one stack entry per open w:p, a text box paragraph nests inside a run of its anchor paragraph
+    #and is yielded on its own right after the anchor instead of being glued into its text.
+    #nested=False leaves out table cells and text boxes
+    stack = []
+    fallback_depth = 0
+    table_depth = 0
+    for event, elem in etree.iterparse(stream, events=('start', 'end'), huge_tree=True):
+        tag = elem.tag
+        if event == 'start':
+            if tag == P:
+                stack.append(([], []))
+            elif tag == TBL:
+                table_depth += 1
+            elif tag == MC_FALLBACK:
+                #word stores text boxes twice, DrawingML in mc:Choice and VML in mc:Fallback
+                fallback_depth += 1
+            continue
+
+        if tag == MC_FALLBACK:
+            fallback_depth -= 1
+        elif stack and not fallback_depth:
+            #same run text python-docx gives for Paragraph.text
+            if tag == T:
+                stack[-1][0].append(elem.text or '')
+            elif tag == PTAB or (tag == TAB and elem.getparent().tag == R):
+                stack[-1][0].append('\t')
+            elif tag == NO_BREAK_HYPHEN:
+                stack[-1][0].append('-')
+            elif tag == CR or (tag == BR and elem.get(BR_TYPE, 'textWrapping') == 'textWrapping'):
+                #page and column breaks carry no text
+                stack[-1][0].append('\n')
+
+        if tag == P:
+            parts, boxes = stack.pop()
+            if fallback_depth or (table_depth and not nested):
+                continue
+            if stack:
+                if nested:
+                    stack[-1][1].append(''.join(parts))
+                    stack[-1][1].extend(boxes)
+            else:
+                yield ''.join(parts)
+                yield from boxes
+                release(elem)
+        elif tag == TBL:
+            table_depth -= 1
+            if not stack:
+                release(elem)
+
+def release(elem):
+    #drop the finished subtree and the siblings before it so the tree never holds more than one block
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+def iter_paragraphs(docx_path, body_only=False):
+    #paragraph text in reading order: headers, body (tables and text boxes included), footers.
+    #header and footer parts repeat per section, a line already seen in one is skipped in the next.
+    #body_only gives the top-level body paragraphs alone, what python-docx's Document.paragraphs has
+    seen = set()  #shared by every header and footer part
+    with zipfile.ZipFile(docx_path) as archive:
+        names = part_names(set(archive.namelist()))
+        for name in [n for n in names if n == DOCUMENT_PART] if body_only else names:
+            with archive.open(name) as stream:
+                for text in iter_part_paragraphs(stream, nested=not body_only):
+                    if name != DOCUMENT_PART:
+                        if text in seen:
+                            continue
+                        seen.add(text)
+                    yield text
+
+def extract_text(docx_path):
+    return "\n".join(text for text in iter_paragraphs(docx_path) if text.strip())
+
+def main():
+    #times the streaming extractor against python-docx on a folder and reports the extra text found
+    parser = argparse.ArgumentParser(description='Compare the streaming DOCX extractor with python-docx')
+    parser.add_argument('folder_path', help='Folder of .docx files')
+    args = parser.parse_args()
+
+    import tracemalloc
+    from docx import Document
+
+    files = sorted(p for p in Path(args.folder_path).iterdir() if p.suffix.lower() == '.docx')
+    totals = {"docx": [0.0, 0, 0], "stream": [0.0, 0, 0]}
+    failed = 0
+    for path in files:
+        try:
+            tracemalloc.start()
+            started = time.perf_counter()
+            doc = Document(path)
+            old = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+            totals["docx"][0] += time.perf_counter() - started
+            totals["docx"][1] = max(totals["docx"][1], tracemalloc.get_traced_memory()[1])
+            totals["docx"][2] += len(old)
+            del doc
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            new = extract_text(path)
+            totals["stream"][0] += time.perf_counter() - started
+            totals["stream"][1] = max(totals["stream"][1], tracemalloc.get_traced_memory()[1])
+            totals["stream"][2] += len(new)
+            tracemalloc.stop()
+        except Exception as e:
+            tracemalloc.stop()
+            failed += 1
+            print(f"  skipped {path.name}: {e}")
+
+    print(f"Files: {len(files)}, skipped: {failed}")
+    for label, (seconds, peak, chars) in totals.items():
+        print(f"{label:7s} {seconds:7.2f}s  peak {peak / 1e6:7.1f} MB  {chars} chars")
+
+if __name__ == "__main__":
+    main()
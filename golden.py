@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+#golden outputs of Parser.parse_resume, one file per version: golden/sample_resumes.v<N>.json holding the
+#expected records and the accuracy and speed last approved against them. names and companies come from
+#the NER model, a fixture pins the tier its records were made with and checks run on that tier
+GOLDEN_DIR = "golden"
+FIXTURE = "sample_resumes"
+SOURCE = "extracted_data.json"
+FOLDER = "Test Resumes/Sample Resumes"
+FIELDS = ("name", "emails", "phones", "jobs", "durations", "skills")
+TOLERANCE = 0.0  #a field may lose this much precision or recall before it counts as a regression
+
+def text_key(value):
+    return " ".join(str(value).lower().split()) if value else ""
+
+def field_items(record):
+    #each field as a set of comparable items. durations are the dates alone, which company they belong
+    #to is what jobs measures. current jobs grow with the date the parser runs, so only their from/to count
+    jobs = record.get("work_experiences") or []
+    durations = set()
+    for job in jobs:
+        months = None if job.get("is_current") else round(float(job.get("duration_months") or 0), 1)
+        durations.add((text_key(job.get("from")), text_key(job.get("to")), months))
+    return {
+        "name": {text_key(record.get("name"))} - {""},
+        "emails": {text_key(email) for email in record.get("emails") or []},
+        "phones": {re.sub(r"\D", "", phone) for phone in record.get("phone_numbers") or []} - {""},
+        "jobs": {(text_key(job.get("job_title")), text_key(job.get("company"))) for job in jobs},
+        "durations": durations,
+        "skills": {text_key(skill) for skill in record.get("skills") or []},
+    }
+
+def score(expected, found):
+    #micro-averaged precision and recall per field over all golden files, a file the parser
+    #returned nothing for counts as every expected item missed
+    counts = {field: [0, 0, 0] for field in FIELDS}  #matched, found, expected
+    for name, record in expected.items():
+        want = field_items(record)
+        got = field_items(found.get(name) or {})
+        for field in FIELDS:
+            counts[field][0] += len(want[field] & got[field])
+            counts[field][1] += len(got[field])
+            counts[field][2] += len(want[field])
+    metrics = {}
+    for field, (matched, found_count, expected_count) in counts.items():
+        metrics[field] = {
+            "precision": matched / found_count if found_count else 1.0,
+            "recall": matched / expected_count if expected_count else 1.0,
+        }
+    return metrics
+
+def fixture_paths(directory=GOLDEN_DIR):
+    def version(path):
+        return int(path.stem.rsplit(".v", 1)[1])
+    return sorted(Path(directory).glob(f"{FIXTURE}.v*.json"), key=version)
+
+def load_fixture(directory=GOLDEN_DIR):
+    paths = fixture_paths(directory)
+    if not paths:
+        raise FileNotFoundError(f"No golden fixture in {directory}, create one with: python golden.py freeze")
+    with open(paths[-1], encoding="utf-8") as f:
+        return paths[-1], json.load(f)
+
+def write_fixture(path, fixture):
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, indent=2, ensure_ascii=False)
+    tmp.replace(path)
+
+def freeze(source=SOURCE, directory=GOLDEN_DIR, note=None, ner_tier=None):
+    #a new version from a saved Parser output, the old versions stay for the history
+    with open(source, encoding="utf-8") as f:
+        records = json.load(f)
+    paths = fixture_paths(directory)
+    version = int(paths[-1].stem.rsplit(".v", 1)[1]) + 1 if paths else 1
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    path = Path(directory) / f"{FIXTURE}.v{version}.json"
+    fixture = {
+        "version": version,
+        "source": str(source),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "note": note,
+        "ner_tier": ner_tier,
+        "records": records,
+        "approved": None,
+        "history": [],
+    }
+    write_fixture(path, fixture)
+    logger.info(f"Golden fixture v{version} with {len(records)} files written to {path}")
+    return path
+
+def benchmark(folder, names, repeat=1):
+    #Parser.parse_resume on each golden file, best of repeat. imported here, it loads a spaCy model
+    import Parser
+    found = {}
+    seconds = 0.0
+    for name in names:
+        path = Path(folder) / name
+        if not path.exists():
+            logger.warning(f"Golden file missing: {path}")
+            continue
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = Parser.parse_resume(str(path))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        found[name] = result
+        seconds += best
+    return found, seconds
+
+def baseline(approved):
+    #metrics a check is held to. until something is approved it is the frozen records themselves, they
+    #are the expected output, so every field is 1.0 and any drop from them fails
+    if approved:
+        return approved["metrics"]
+    return {field: {"precision": 1.0, "recall": 1.0} for field in FIELDS}
+
+def regressions(metrics, approved, tolerance=TOLERANCE):
+    #(field, measure, baseline value, value) for every drop beyond the tolerance
+    expected = baseline(approved)
+    dropped = []
+    for field in FIELDS:
+        for measure in ("precision", "recall"):
+            before = expected.get(field, {}).get(measure)
+            now = metrics[field][measure]
+            if before is not None and now < before - tolerance:
+                dropped.append((field, measure, before, now))
+    return dropped
+
+def check(folder=FOLDER, directory=GOLDEN_DIR, repeat=1, tolerance=TOLERANCE):
+    path, fixture = load_fixture(directory)
+    ner_tier = fixture.get("ner_tier")
+    if ner_tier:
+        #read when Parser is first imported, which benchmark does. imported here, it pulls in spaCy
+        import ner_tiers
+        if "Parser" in sys.modules and os.environ.get(ner_tiers.TIER_ENV) != ner_tier:
+            logger.warning(f"Parser already loaded its NER tier, golden v{fixture['version']} expects {ner_tier}")
+        os.environ[ner_tiers.TIER_ENV] = ner_tier
+    found, seconds = benchmark(folder, list(fixture["records"]), repeat)
+    metrics = score(fixture["records"], found)
+    report = {
+        "fixture": str(path),
+        "version": fixture["version"],
+        "ner_tier": ner_tier,
+        "files": len(found),
+        "seconds": seconds,
+        "docs_per_second": len(found) / seconds if seconds else 0.0,
+        "metrics": metrics,
+        "approved": fixture["approved"],
+        "regressions": regressions(metrics, fixture["approved"], tolerance),
+    }
+    return report, fixture
+
+def approve(report, fixture, note=None):
+    #the measured accuracy and speed become the baseline later checks are held to
+    approved = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "note": note,
+        "metrics": report["metrics"],
+        "docs_per_second": report["docs_per_second"],
+    }
+    if fixture["approved"]:
+        fixture["history"].append(fixture["approved"])
+    fixture["approved"] = approved
+    write_fixture(report["fixture"], fixture)
+    logger.info(f"Approved the current accuracy for golden v{fixture['version']}")
+
+def summary_lines(report):
+    approved = report["approved"]
+    lines = [f"Golden v{report['version']}"
+             + (f" (NER tier {report['ner_tier']})" if report.get("ner_tier") else "")
+             + f": {report['files']} files in {report['seconds']:.2f}s, "
+             f"{report['docs_per_second']:.2f} docs/s"
+             + (f" ({report['docs_per_second'] / approved['docs_per_second'] - 1:+.0%} against approved)"
+                if approved and approved.get("docs_per_second") else "")]
+    lines.append(f"{'field':10s} {'precision':>9s} {'recall':>8s} {'delta P':>8s} {'delta R':>8s}")
+    for field in FIELDS:
+        row = report["metrics"][field]
+        line = f"{field:10s} {row['precision']:9.3f} {row['recall']:8.3f}"
+        before = baseline(approved)[field]
+        line += f" {row['precision'] - before['precision']:+8.3f} {row['recall'] - before['recall']:+8.3f}"
+        lines.append(line)
+    if not approved:
+        lines.append("Nothing approved yet, held to the golden records (1.0 everywhere), run with --approve "
+                     "to make this the baseline")
+    for field, measure, before, now in report["regressions"]:
+        lines.append(f"REGRESSION {field} {measure} {before:.3f} -> {now:.3f}")
+    return lines
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Benchmark Parser on the golden resumes and fail on unapproved accuracy regressions')
+    parser.add_argument('command', nargs='?', default='check', choices=['check', 'freeze'],
+                       help='check: benchmark and compare (default), freeze: new golden version from a saved output')
+    parser.add_argument('--source', default=SOURCE, help=f'Parser output to freeze (default: {SOURCE})')
+    parser.add_argument('--folder', default=FOLDER, help=f'Folder the golden resumes are in (default: {FOLDER})')
+    parser.add_argument('--golden-dir', default=GOLDEN_DIR, help=f'Where the fixtures are kept (default: {GOLDEN_DIR})')
+    parser.add_argument('--repeat', type=int, default=1, help='Times each file is parsed, the fastest counts (default: 1)')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                       help='Precision or recall a field may lose before the check fails (default: 0)')
+    parser.add_argument('--approve', action='store_true', help='Accept the measured accuracy as the new baseline')
+    parser.add_argument('--note', default=None, help='Why, stored with a freeze or an approval')
+    parser.add_argument('--ner-tier', default=None,
+                       help='NER tier the frozen output was made with, checks of the fixture run on it (default: not pinned)')
+    parser.add_argument('--output', default=None, help='Also write the report as JSON')
+    args = parser.parse_args()
+
+    if args.command == 'freeze':
+        freeze(args.source, args.golden_dir, args.note, args.ner_tier)
+        return
+
+    report, fixture = check(args.folder, args.golden_dir, args.repeat, args.tolerance)
+    for line in summary_lines(report):
+        print(line)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.approve:
+        approve(report, fixture, args.note)
+        return
+    sys.exit(1 if report["regressions"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import os
+import re
+import json
+import time
+import logging
+import argparse
+import threading
+from pathlib import Path
+
+import spacy
+from spacy.tokens import Span
+
+logger = logging.getLogger(__name__)
+
+#NER model per tier. "rules" is a blank pipeline with an entity ruler, no model to install and it
+#loads in milliseconds. the tier is read from the environment so spawned worker processes load the same
+TIERS = {"sm": "en_core_web_sm", "md": "en_core_web_md", "trf": "en_core_web_trf", "rules": None}
+DEFAULT_TIER = "md"
+TIER_ENV = "RESUME_NER_TIER"
+
+#pipes whose output nothing reads, skipped on load. parser stays: it sets the sentence starts and ner
+#never lets an entity cross one, so without it PERSON/ORG spans come out differently
+UNUSED_PIPES = ["tagger", "attribute_ruler", "lemmatizer"]
+
+#capitalized words that start resume lines but are not part of a name
+NOT_NAME = [
+    "resume", "curriculum", "vitae", "profile", "summary", "objective", "professional", "experience", "work",
+    "education", "skills", "technical", "projects", "project", "certifications", "contact", "references",
+    "employment", "history", "career", "achievements", "awards", "languages", "interests", "activities",
+    "engineer", "engineering", "developer", "scientist", "analyst", "manager", "consultant", "specialist",
+    "generalist", "assistant", "intern", "lead", "senior", "junior", "director", "architect", "administrator",
+    "supervisor", "teacher", "human", "resources", "data", "science", "software", "machine", "learning",
+    "cloud", "computer", "business", "information", "systems", "management", "development", "research",
+    "python", "java", "sql", "aws", "azure", "google", "microsoft", "linkedin", "github", "email", "phone",
+    "address", "street", "avenue", "road", "suite", "city", "state", "university", "college", "institute",
+    "school", "bachelor", "master", "present", "current", "remote", "january", "february", "march", "april",
+    "may", "june", "july", "august", "september", "october", "november", "december", "jan", "feb", "mar",
+    "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "the", "and", "of", "in", "at", "for",
+    "full", "name", "personal", "first", "last", "processing", "analysis", "analytics", "credit", "risk",
+]
+
+#last words of company and institution names
+ORG_SUFFIXES = [
+    "inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "companies", "group", "holdings",
+    "technologies", "technology", "systems", "solutions", "labs", "bank", "healthcare", "health", "services",
+    "consulting", "airlines", "motor", "motors", "pvt", "private", "partners", "associates", "center",
+    "centre", "club", "university", "college", "institute", "analytics", "enterprise", "enterprises",
+    "software", "networks", "pharmaceuticals", "insurance", "foundation", "hospital",
+]
+
+#a location after the company on its own line, "Aetna | Dallas, TX" or "AlphaSense, San Francisco, CA"
+STATES = [
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA",
+    "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "OH", "OK",
+    "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY", "DC", "USA", "US", "UK",
+    "IND",
+]
+SEPARATORS = [",", "|", "-", "–", "—"]
+
+TITLE_WORD = r"^[A-Z][a-z]+$"
+CAPS_WORD = r"^[A-Z]{2,}$"
+CAPITALIZED = r"^[A-Z][A-Za-z&'.]*$"
+
+lock = threading.Lock()
+loaded = {}
+
+def name_token(shape):
+    return {"TEXT": {"REGEX": shape}, "LOWER": {"NOT_IN": NOT_NAME}}
+
+def ruler_patterns():
+    initial = {"TEXT": {"REGEX": r"^[A-Z]\.?$"}, "OP": "?"}
+    capitalized = {"TEXT": {"REGEX": CAPITALIZED}, "OP": "+"}
+    person = [
+        [name_token(TITLE_WORD), initial, name_token(TITLE_WORD)],
+        [name_token(CAPS_WORD), initial, name_token(CAPS_WORD)],
+    ]
+    org = [
+        [capitalized, {"LOWER": {"IN": ORG_SUFFIXES}, "TEXT": {"REGEX": r"^[A-Z]"}}, {"ORTH": ".", "OP": "?"}],
+        [{"LOWER": {"IN": ["university", "college", "institute"]}}, {"LOWER": "of"}, capitalized,
+         {"LOWER": "and", "OP": "?"}, {"TEXT": {"REGEX": CAPITALIZED}, "OP": "*"}],
+    ]
+    #the ids mark matches that still carry the location, trim_location cuts them at the separator
+    located = [
+        [capitalized, {"ORTH": {"IN": SEPARATORS}}, capitalized, {"ORTH": ",", "OP": "?"}, {"ORTH": {"IN": STATES}}],
+        [capitalized, {"ORTH": {"IN": SEPARATORS}}, {"LOWER": {"IN": ["remote", "india"]}}],
+    ]
+    return ([{"label": "PERSON", "pattern": p} for p in person] + [{"label": "ORG", "pattern": p} for p in org]
+            + [{"label": "ORG", "pattern": p, "id": "located"} for p in located])
+
+@spacy.Language.component("trim_location")
+def trim_location(doc):
+    ents = []
+    for ent in doc.ents:
+        if ent.ent_id_ == "located":
+            end = next(token.i for token in ent if token.text in SEPARATORS)
+            if end == ent.start:
+                continue
+            ent = Span(doc, ent.start, end, label="ORG")
+        ents.append(ent)
+    doc.ents = ents
+    return doc
+
+def rules_pipeline():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(ruler_patterns())
+    nlp.add_pipe("trim_location")
+    return nlp
+
+def selected_tier():
+    tier = os.environ.get(TIER_ENV) or DEFAULT_TIER
+    if tier not in TIERS:
+        raise ValueError(f"Unknown NER tier {tier!r}, expected one of {', '.join(TIERS)}")
+    return tier
+
+def build(tier):
+    #uncached, raises OSError if the tier's model is not installed
+    if TIERS[tier] is None:
+        return rules_pipeline()
+    nlp = spacy.load(TIERS[tier])
+    nlp.select_pipes(disable=[name for name in UNUSED_PIPES if name in nlp.pipe_names])
+    return nlp
+
+def load(tier=None):
+    #one pipeline per tier per process
+    tier = tier or selected_tier()
+    with lock:
+        if tier not in loaded:
+            started = time.perf_counter()
+            loaded[tier] = build(tier)
+            logger.info(f"Loaded NER tier {tier} in {time.perf_counter() - started:.2f}s")
+        return loaded[tier]
+
+def vectors_pipeline():
+    #the similarity index needs word vectors, which neither the rules tier nor trf has
+    nlp = load()
+    if nlp.vocab.vectors_length:
+        return nlp
+    return load("md")
+
+#report: accuracy and speed of each tier against hand-labelled resumes
+
+def extract_text(path):
+    #the text the parsers see, without importing them (both load a model on import)
+    if path.suffix.lower() == ".pdf":
+        from pdfminer.high_level import extract_text as extract_pdf_text
+        return extract_pdf_text(str(path))
+    from docx_stream import extract_text as extract_docx_text
+    return extract_docx_text(str(path))
+
+def ner_name(nlp, text):
+    #Basic_Parser.extract_name without its regex fallback, the first 2-4 word PERSON in the first 20 lines
+    doc = nlp(' '.join(text.strip().split('\n')[:20]))
+    for ent in doc.ents:
+        if ent.label_ == "PERSON" and 2 <= len(ent.text.split()) <= 4:
+            parts = ent.text.split()
+            return parts[0], parts[-1]
+    return None
+
+def company_key(name):
+    words = re.findall(r"[a-z0-9]+", name.lower())
+    while len(words) > 1 and words[-1] in ORG_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+def same_company(found, expected):
+    found, expected = company_key(found), company_key(expected)
+    return bool(found) and (found == expected or found in expected or expected in found)
+
+def name_correct(found, expected):
+    if not expected:
+        return found is None
+    words = expected.lower().split()
+    #a single labelled word is a first name only
+    return found is not None and found[0].lower() == words[0] and (len(words) == 1 or found[-1].lower() == words[-1])
+
+def evaluate(nlp, documents):
+    #documents: [(text, truth)], returns name accuracy, company precision/recall and docs per second
+    names = found_total = found_right = expected_total = expected_right = 0
+    started = time.perf_counter()
+    for text, truth in documents:
+        if name_correct(ner_name(nlp, text), truth.get("name")):
+            names += 1
+        orgs = {ent.text.strip() for ent in nlp(text).ents if ent.label_ == "ORG"}
+        expected = truth.get("companies", [])
+        found_total += len(orgs)
+        found_right += sum(any(same_company(org, e) for e in expected) for org in orgs)
+        expected_total += len(expected)
+        expected_right += sum(any(same_company(org, e) for org in orgs) for e in expected)
+    elapsed = time.perf_counter() - started
+    precision = found_right / found_total if found_total else 0.0
+    recall = expected_right / expected_total if expected_total else 0.0
+    return {
+        "name_accuracy": names / len(documents) if documents else 0.0,
+        "company_precision": precision,
+        "company_recall": recall,
+        "company_f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "docs_per_second": len(documents) / elapsed if elapsed else 0.0,
+    }
+
+def compare(folder, truth_file, tiers):
+    with open(truth_file, encoding="utf-8") as f:
+        truth = json.load(f)
+    documents = []
+    for relative, expected in sorted(truth.items()):
+        path = Path(folder) / relative
+        try:
+            text = extract_text(path)
+        except Exception as e:
+            logger.warning(f"Skipping {relative}: {str(e)}")
+            continue
+        if text:
+            documents.append((text, expected))
+    report = {"documents": len(documents), "tiers": {}}
+    for tier in tiers:
+        started = time.perf_counter()
+        try:
+            nlp = build(tier)
+        except OSError as e:
+            logger.warning(f"Tier {tier} not installed: {str(e)}")
+            report["tiers"][tier] = {"installed": False}
+            continue
+        load_seconds = time.perf_counter() - started
+        report["tiers"][tier] = {"installed": True, "load_seconds": load_seconds, **evaluate(nlp, documents)}
+    return report
+
+def summary_lines(report):
+    lines = [f"NER tiers on {report['documents']} documents",
+             f"{'tier':6s} {'load':>8s} {'docs/s':>8s} {'name':>6s} {'org P':>6s} {'org R':>6s} {'org F1':>6s}"]
+    for tier, row in report["tiers"].items():
+        if not row["installed"]:
+            lines.append(f"{tier:6s} not installed")
+            continue
+        lines.append(f"{tier:6s} {row['load_seconds']:7.2f}s {row['docs_per_second']:8.1f} {row['name_accuracy']:6.2f} "
+                     f"{row['company_precision']:6.2f} {row['company_recall']:6.2f} {row['company_f1']:6.2f}")
+    return lines
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Compare NER tiers for accuracy and speed on labelled resumes')
+    parser.add_argument('folder', nargs='?', default='Test Resumes', help='Folder the labelled resumes are in')
+    parser.add_argument('--truth', default=None,
+                       help='JSON of {path: {"name", "companies"}} relative to the folder (default: folder/ner_truth.json)')
+    parser.add_argument('--tiers', nargs='+', choices=list(TIERS), default=list(TIERS), help='Tiers to compare')
+    parser.add_argument('--output', default='ner_tier_report.json', help='Where to write the report')
+    args = parser.parse_args()
+
+    report = compare(args.folder, args.truth or str(Path(args.folder) / "ner_truth.json"), args.tiers)
+    for line in summary_lines(report):
+        print(line)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
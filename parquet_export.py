@@ -0,0 +1,223 @@
+import json
+import time
+import logging
+import argparse
+import threading
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import records
+
+logger = logging.getLogger(__name__)
+
+#parsed results as four Parquet tables linked by candidate_id:
+#    candidates  one row per file, Parser's and Basic_Parser's top-level fields
+#    jobs        one row per work_experiences entry
+#    education   one row per education entry
+#    skills      one row per skill
+#rows are buffered per table and written as a row group every ROW_GROUP candidates, so a run of any
+#size holds one row group in memory. repeated strings (skills, companies, titles, dates, degrees) are
+#dictionary encoded. keys the tables have no column for are kept as JSON text in the extra columns of
+#candidates and jobs
+ROW_GROUP = 10000
+COMPRESSION = "zstd"
+TABLES = ("candidates", "jobs", "education", "skills")
+
+STRINGS = pa.list_(pa.string())
+SCHEMAS = {
+    "candidates": pa.schema([
+        ("candidate_id", pa.int64()), ("file", pa.string()), ("parsed", pa.bool_()),
+        #Parser
+        ("name", pa.string()), ("emails", STRINGS), ("phone_numbers", STRINGS),
+        #Basic_Parser
+        ("first_name", pa.string()), ("last_name", pa.string()), ("email", pa.string()),
+        ("phone_number", pa.string()), ("linkedin", pa.string()), ("document_type", pa.string()),
+        ("confidence", pa.float64()), ("duplicate_of", STRINGS), ("similarity", pa.list_(pa.float64())),
+        ("degraded", pa.bool_()), ("ocr", pa.string()), ("cleaned_content", pa.string()),
+        ("extra", pa.string()),
+    ]),
+    "jobs": pa.schema([
+        ("candidate_id", pa.int64()), ("position", pa.int32()), ("job_title", pa.string()), ("company", pa.string()),
+        ("duration_months", pa.float64()), ("from", pa.string()), ("to", pa.string()), ("is_current", pa.bool_()),
+        ("work_description", pa.string()), ("extra", pa.string()),
+    ]),
+    "education": pa.schema([("candidate_id", pa.int64()), ("position", pa.int32()), ("education", pa.string())]),
+    "skills": pa.schema([("candidate_id", pa.int64()), ("skill", pa.string())]),
+}
+DICTIONARY = {
+    "candidates": ["document_type", "ocr"],
+    "jobs": ["job_title", "company", "from", "to"],
+    "education": ["education"],
+    "skills": ["skill"],
+}
+#candidate fields written to their own tables
+NESTED = {"work_experiences", "education", "skills"}
+COLUMNS = set(SCHEMAS["candidates"].names) - {"candidate_id", "file", "parsed", "extra"}
+JOB_COLUMNS = set(SCHEMAS["jobs"].names) - {"candidate_id", "position", "extra"}
+
+def as_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def as_list(value, convert):
+    #results written before duplicate_of/similarity became lists hold the single best match
+    if value is None:
+        return None
+    return [convert(v) for v in (value if isinstance(value, list) else [value])]
+
+def as_text(value):
+    return None if value is None else value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+class ParquetExport:
+    #add() results as they finish, from any thread, close() writes the last row group
+    def __init__(self, directory, row_group=ROW_GROUP, compression=COMPRESSION):
+        self.directory = Path(directory)
+        self.row_group = row_group
+        self.compression = compression
+        self.rows = {table: {column: [] for column in SCHEMAS[table].names} for table in TABLES}
+        self.writers = {}
+        self.candidates = 0
+        self.pending = 0
+        self.row_groups = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, file, record):
+        if isinstance(record, records.Record):
+            record = record.to_dict()
+        with self.lock:
+            candidate_id = self.candidates
+            self.candidates += 1
+            self._add_candidate(candidate_id, file, record or {}, record is not None)
+            self.pending += 1
+            if self.pending >= self.row_group:
+                self._flush()
+        return candidate_id
+
+    def _add_candidate(self, candidate_id, file, record, parsed):
+        row = self.rows["candidates"]
+        row["candidate_id"].append(candidate_id)
+        row["file"].append(file)
+        row["parsed"].append(parsed)
+        for column in COLUMNS:
+            value = record.get(column)
+            if column == "confidence":
+                value = as_float(value)
+            elif column == "degraded":
+                value = bool(value) if value is not None else None
+            elif column in ("emails", "phone_numbers"):
+                value = [as_text(v) for v in value] if isinstance(value, list) else None
+            elif column == "duplicate_of":
+                value = as_list(value, as_text)
+            elif column == "similarity":
+                value = as_list(value, as_float)
+            else:
+                value = as_text(value)
+            row[column].append(value)
+        extra = {key: value for key, value in record.items() if key not in COLUMNS and key not in NESTED}
+        if isinstance(record.get("education"), list) and not all(isinstance(e, str) for e in record["education"]):
+            extra["education"] = record["education"]
+        row["extra"].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+
+        jobs = self.rows["jobs"]
+        for position, job in enumerate(record.get("work_experiences") or ()):
+            jobs["candidate_id"].append(candidate_id)
+            jobs["position"].append(position)
+            jobs["job_title"].append(as_text(job.get("job_title")))
+            jobs["company"].append(as_text(job.get("company")))
+            jobs["duration_months"].append(as_float(job.get("duration_months")))
+            jobs["from"].append(as_text(job.get("from")))
+            jobs["to"].append(as_text(job.get("to")))
+            jobs["is_current"].append(bool(job.get("is_current")))
+            jobs["work_description"].append(as_text(job.get("work_description")))
+            extra = {key: value for key, value in job.items() if key not in JOB_COLUMNS}
+            jobs["extra"].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+
+        education = self.rows["education"]
+        for position, entry in enumerate(record.get("education") or ()):
+            if isinstance(entry, str):
+                education["candidate_id"].append(candidate_id)
+                education["position"].append(position)
+                education["education"].append(entry)
+
+        skills = self.rows["skills"]
+        for skill in record.get("skills") or ():
+            skills["candidate_id"].append(candidate_id)
+            skills["skill"].append(as_text(skill))
+
+    def _flush(self):
+        if not self.pending:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for table in TABLES:
+            columns = self.rows[table]
+            batch = pa.table(columns, schema=SCHEMAS[table])
+            writer = self.writers.get(table)
+            if writer is None:
+                writer = pq.ParquetWriter(self.directory / f"{table}.parquet", SCHEMAS[table],
+                                          compression=self.compression, use_dictionary=DICTIONARY[table])
+                self.writers[table] = writer
+            writer.write_table(batch, row_group_size=max(len(batch), 1))
+            for values in columns.values():
+                values.clear()
+        self.pending = 0
+        self.row_groups += 1
+
+    def close(self):
+        with self.lock:
+            #an empty export still gets its four files
+            if not self.writers and not self.pending:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                for table in TABLES:
+                    pq.write_table(SCHEMAS[table].empty_table(), self.directory / f"{table}.parquet")
+            self._flush()
+            for writer in self.writers.values():
+                writer.close()
+            self.writers = {}
+
+    def summary_lines(self):
+        sizes = {table: (self.directory / f"{table}.parquet").stat().st_size for table in TABLES
+                 if (self.directory / f"{table}.parquet").exists()}
+        return [f"Parquet export: {self.candidates} candidates in {self.row_groups} row groups to {self.directory}",
+                "  " + ", ".join(f"{table} {size / 1024:.0f} KB" for table, size in sizes.items())]
+
+def export(results, directory, row_group=ROW_GROUP, compression=COMPRESSION):
+    #results: {file: record} or an iterable of (file, record), failed files (None) get a row with parsed false
+    items = results.items() if isinstance(results, dict) else results
+    with ParquetExport(directory, row_group, compression) as writer:
+        for file, record in items:
+            writer.add(file, record)
+    return writer
+
+def read(directory, table):
+    #dictionary-encoded columns come back as pandas categoricals
+    return pq.read_table(Path(directory) / f"{table}.parquet", read_dictionary=DICTIONARY[table]).to_pandas()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Write parsed results as candidates/jobs/education/skills Parquet tables')
+    parser.add_argument('input', help='Parser or Basic_Parser JSON, a run journal or JSONL file, or a work queue .db')
+    parser.add_argument('--output', '-o', default='parquet', help='Folder for the tables (default: parquet)')
+    parser.add_argument('--row-group', type=int, default=ROW_GROUP, help=f'Candidates per row group (default: {ROW_GROUP})')
+    parser.add_argument('--compression', default=COMPRESSION, help=f'Parquet codec (default: {COMPRESSION})')
+    args = parser.parse_args()
+
+    #imported here, it pulls in pandas
+    from analyze_results import iter_records
+    started = time.perf_counter()
+    writer = export(iter_records(args.input), args.output, args.row_group, args.compression)
+    logger.info(f"Exported in {time.perf_counter() - started:.2f}s")
+    for line in writer.summary_lines():
+        print(line)
+
+if __name__ == "__main__":
+    main()
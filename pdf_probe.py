@@ -0,0 +1,154 @@
+import re
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import LIT
+
+logger = logging.getLogger(__name__)
+
+IMAGE_ONLY = "image_only"
+FORM = LIT('Form')
+MAX_FORM_DEPTH = 3
+
+#text is only drawn inside BT ... ET with one of the show operators Tj, TJ, ' or "
+TEXT_BLOCK = re.compile(rb'(?:^|\s)BT(?:\s|$)')
+SHOW_TEXT = re.compile(rb'(?:T[jJ]|[\'"])(?:\s|$)')
+
+PdfProbe = namedtuple("PdfProbe", ["pages", "text_pages"])
+
+def stream_data(obj):
+    obj = resolve1(obj)
+    if isinstance(obj, PDFStream):
+        try:
+            return obj.get_data() or b''
+        except Exception as e:
+            logger.debug(f"Undecodable content stream: {str(e)}")
+    return b''
+
+def shows_text(data):
+    return bool(TEXT_BLOCK.search(data) and SHOW_TEXT.search(data))
+
+def resources_have_text(resources, depth=0):
+    #form xobjects are content streams of their own, letterheads and templates often keep text there
+    resources = resolve1(resources) or {}
+    if not isinstance(resources, dict) or depth > MAX_FORM_DEPTH:
+        return False
+    xobjects = resolve1(resources.get('XObject')) or {}
+    if not isinstance(xobjects, dict):
+        return False
+    for xobject in xobjects.values():
+        xobject = resolve1(xobject)
+        if not isinstance(xobject, PDFStream) or xobject.get('Subtype') is not FORM:
+            continue
+        if has_fonts(xobject.get('Resources')) and shows_text(stream_data(xobject)):
+            return True
+        if resources_have_text(xobject.get('Resources'), depth + 1):
+            return True
+    return False
+
+def has_fonts(resources):
+    resources = resolve1(resources) or {}
+    return isinstance(resources, dict) and bool(resolve1(resources.get('Font')))
+
+def page_has_text(page):
+    #a page draws text only if it has a font and a content stream with a text-showing operator
+    if has_fonts(page.resources):
+        contents = page.contents if isinstance(page.contents, list) else [page.contents]
+        if any(shows_text(stream_data(c)) for c in contents):
+            return True
+    return resources_have_text(page.resources)
+
+def probe_pdf(pdf_path, stop_at_text=True):
+    #reads the object tree and the raw content streams, no layout analysis. by default it stops at
+    #the first page with text, so only image-only files are read to the end. None if unreadable
+    pages = 0
+    text_pages = 0
+    try:
+        with open(pdf_path, 'rb') as f:
+            for page in PDFPage.get_pages(f):
+                pages += 1
+                if page_has_text(page):
+                    text_pages += 1
+                    if stop_at_text:
+                        break
+    except Exception as e:
+        logger.debug(f"PDF probe failed {pdf_path}: {str(e)}")
+        return None
+    #no page tree pdfminer can walk, leave the verdict to the full extractor
+    return PdfProbe(pages, text_pages) if pages else None
+
+def is_image_only(probe):
+    return probe is not None and probe.text_pages == 0
+
+class OcrQueue:
+    #image-only PDFs set aside during the run, they never take a parse slot. OCR is optional, local,
+    #and runs after the parse pool is done
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, file_path, pages):
+        with self.lock:
+            self.entries.append((str(file_path), pages))
+
+    def save(self, filename):
+        with self.lock:
+            data = [{"file": path, "pages": pages} for path, pages in self.entries]
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        logger.info(f"OCR queue with {len(data)} files saved to {filename}")
+
+    def run(self, lang="eng", dpi=300):
+        #yields (file path, text), needs pytesseract and pdf2image plus the tesseract and poppler binaries
+        try:
+            import pytesseract
+            from pdf2image import convert_from_path
+        except ImportError:
+            logger.warning("OCR skipped, pytesseract and pdf2image are not installed")
+            return
+        with self.lock:
+            entries = list(self.entries)
+        for path, _ in entries:
+            try:
+                images = convert_from_path(path, dpi=dpi)
+                yield path, "\n".join(pytesseract.image_to_string(image, lang=lang) for image in images)
+            except Exception as e:
+                logger.error(f"OCR error {path}: {str(e)}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Find image-only PDFs without running layout analysis')
+    parser.add_argument('folder_path', help='Folder of PDFs to probe')
+    parser.add_argument('--all-pages', action='store_true', help='Count text pages instead of stopping at the first')
+    args = parser.parse_args()
+
+    files = sorted(p for p in Path(args.folder_path).iterdir() if p.suffix.lower() == '.pdf')
+    image_only = 0
+    total = 0.0
+    for path in files:
+        started = time.perf_counter()
+        probe = probe_pdf(path, stop_at_text=not args.all_pages)
+        elapsed = time.perf_counter() - started
+        total += elapsed
+        if probe is None:
+            label = "unreadable"
+        elif is_image_only(probe):
+            label = IMAGE_ONLY
+            image_only += 1
+        else:
+            label = "text"
+        pages = f"{probe.text_pages}/{probe.pages}" if probe else "-"
+        print(f"{label:10s} {pages:>7s} {elapsed * 1000:8.1f}ms  {path.name}")
+    print(f"{len(files)} PDFs, {image_only} image-only, {total:.2f}s total")
+
+if __name__ == "__main__":
+    main()
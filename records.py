@@ -0,0 +1,229 @@
+import gc
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+#Parser results as slotted objects instead of nests of dicts. no per-object __dict__, and the values that
+#repeat across a batch (companies, titles, skills, dates, degrees, issuers) point at one shared object.
+#to_dict() gives back exactly the dict Parser produced: same keys in the same order, same value types,
+#absent keys stay absent and keys this schema doesn't know are carried in extra
+MISSING = object()
+
+class Interner:
+    #one shared object per distinct value. strings go through sys.intern, numbers through a pool keyed
+    #by type as well, 22 and 22.0 hash alike but serialize differently
+    def __init__(self):
+        self.pool = {}
+
+    def __call__(self, value):
+        if value.__class__ is str:
+            return sys.intern(value)
+        if value.__class__ in (int, float):
+            return self.pool.setdefault((value.__class__, value), value)
+        return value
+
+intern = Interner()
+
+class Record:
+    #FIELDS: (json key, slot, shared). shared values are interned, the rest are kept as they are
+    __slots__ = ("extra",)
+    FIELDS = ()
+
+    def __init__(self, **values):
+        for _, slot, _ in self.FIELDS:
+            setattr(self, slot, values.get(slot, MISSING))
+        self.extra = values.get("extra")
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls.__new__(cls)
+        for key, slot, shared in cls.FIELDS:
+            value = data.get(key, MISSING)
+            if value is not MISSING and value is not None:
+                if shared:
+                    value = sys.intern(value) if value.__class__ is str else intern(value)
+                elif value.__class__ is list:
+                    value = cls.convert(key, value)
+            setattr(record, slot, value)
+        if data.keys() <= cls.KEYS:
+            record.extra = None
+        else:
+            record.extra = {key: value for key, value in data.items() if key not in cls.KEYS}
+        return record
+
+    @classmethod
+    def convert(cls, key, value):
+        #lists of fields that aren't shared
+        return value
+
+    def to_dict(self):
+        data = {}
+        for key, slot, _ in self.FIELDS:
+            value = getattr(self, slot)
+            if value is not MISSING:
+                data[key] = self.export(key, value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def export(self, key, value):
+        return value
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class Job(Record):
+    __slots__ = ("job_title", "company", "duration_months", "start", "end", "is_current", "work_description")
+    FIELDS = (("job_title", "job_title", True), ("company", "company", True),
+              ("duration_months", "duration_months", True), ("from", "start", True), ("to", "end", True),
+              ("is_current", "is_current", False), ("work_description", "work_description", False))
+
+class Education(Record):
+    #Parser's education entries are plain strings, the record keeps one and gives the string back
+    __slots__ = ("text",)
+    FIELDS = (("text", "text", True),)
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, str):
+            record = cls.__new__(cls)
+            record.text = intern(data)
+            record.extra = None
+            return record
+        return super().from_dict(data)
+
+    def to_dict(self):
+        return self.text if self.extra is None else super().to_dict()
+
+class Certification(Record):
+    __slots__ = ("name", "issuer")
+    FIELDS = (("name", "name", True), ("issuer", "issuer", True))
+
+class Project(Record):
+    __slots__ = ("title", "description")
+    FIELDS = (("title", "title", True), ("description", "description", False))
+
+class Candidate(Record):
+    __slots__ = ("name", "emails", "phone_numbers", "education", "skills", "work_experiences", "projects",
+                 "certifications")
+    FIELDS = (("name", "name", False), ("emails", "emails", False), ("phone_numbers", "phone_numbers", False),
+              ("education", "education", False), ("skills", "skills", False),
+              ("work_experiences", "work_experiences", False), ("projects", "projects", False),
+              ("certifications", "certifications", False))
+    #list fields held as tuples of records or interned strings
+    ITEMS = {"education": Education, "work_experiences": Job, "projects": Project, "certifications": Certification}
+
+    @classmethod
+    def convert(cls, key, value):
+        item = cls.ITEMS.get(key)
+        if item is not None:
+            return tuple([item.from_dict(v) if isinstance(v, (dict, str)) else v for v in value])
+        if key == "skills":
+            return tuple([intern(v) for v in value])
+        return tuple(value)
+
+    def export(self, key, value):
+        if isinstance(value, tuple):
+            return [v.to_dict() if isinstance(v, Record) else v for v in value]
+        return value
+
+for record_type in (Job, Education, Certification, Project, Candidate):
+    record_type.KEYS = frozenset(key for key, _, _ in record_type.FIELDS)
+
+def json_default(value):
+    #json.dump(..., default=json_default) writes records as the dicts they came from
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def from_results(results):
+    #{file: Parser result} to {file: Candidate}, failed files (None) stay None
+    return {name: Candidate.from_dict(result) if result is not None else None for name, result in results.items()}
+
+def parser_record(truth):
+    #a synthetic truth record cut down to the keys Parser writes
+    record = {key: value for key, value in truth.items() if key in Candidate.KEYS}
+    record["work_experiences"] = [{key: value for key, value in job.items() if key in Job.KEYS}
+                                  for job in truth["work_experiences"]]
+    return record
+
+def measure(count, source=None, seed=0):
+    #bytes per record of count Parser results held as json.loads dicts, then as interned Candidates.
+    #the batch is synthetic_corpus resumes, or records cycled from a Parser output file. it is decoded
+    #from one JSON text, so no value is shared between records except what interning shares
+    if source:
+        with open(source, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data.get("resumes"), dict):
+            data = data["resumes"]
+        samples = [record for record in data.values() if record]
+        batch = {f"{i:07d}": samples[i % len(samples)] for i in range(count)}
+    else:
+        import synthetic_corpus
+        batch = {f"{i:07d}": parser_record(synthetic_corpus.make_resume(seed, i)[1]) for i in range(count)}
+    text = json.dumps(batch, ensure_ascii=False)
+    del batch
+
+    #timed untraced, tracemalloc slows every allocation down
+    dicts = json.loads(text)
+    started = time.perf_counter()
+    records = from_results(dicts)
+    convert_seconds = time.perf_counter() - started
+    del dicts, records
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    dicts = json.loads(text)
+    dict_bytes = tracemalloc.get_traced_memory()[0] - before
+    records = from_results(dicts)
+    lossless = all(records[name].to_dict() == result for name, result in dicts.items())
+    del dicts
+    gc.collect()
+    record_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    dumped = json.dumps(records, default=json_default, ensure_ascii=False)
+    dump_seconds = time.perf_counter() - started
+    return {
+        "records": count,
+        "dict_bytes_per_record": dict_bytes / count,
+        "record_bytes_per_record": record_bytes / count,
+        "saved": 1 - record_bytes / dict_bytes,
+        "convert_seconds": convert_seconds,
+        "dump_seconds": dump_seconds,
+        "lossless": lossless and json.loads(dumped) == json.loads(text),
+    }
+
+def summary_lines(report):
+    return [
+        f"{report['records']} records: dicts {report['dict_bytes_per_record']:.0f} B/record, "
+        f"slotted {report['record_bytes_per_record']:.0f} B/record ({report['saved']:.0%} less)",
+        f"Converted in {report['convert_seconds']:.2f}s, serialized in {report['dump_seconds']:.2f}s, "
+        f"round trip {'lossless' if report['lossless'] else 'LOSSY'}",
+    ]
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Measure parsed results as dicts against slotted records')
+    parser.add_argument('--source', default=None, help='Parser output to cycle records from instead of synthetic resumes')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic resumes (default: 0)')
+    parser.add_argument('--count', '-n', type=int, default=100000, help='Records in the batch (default: 100000)')
+    args = parser.parse_args()
+
+    report = measure(args.count, args.source, args.seed)
+    for line in summary_lines(report):
+        print(line)
+    sys.exit(0 if report["lossless"] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import re
+import sys
+import math
+import time
+import signal
+import logging
+import argparse
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SIZES = (2000, 8000)
+MAX_EXPONENT = 1.4     #time grows like size^k, a linear scan measures ~1, a quadratic backtrack ~2
+NOISE_SECONDS = 0.01   #the larger input finished faster than this passes whatever the ratio
+CALL_TIMEOUT = 30      #seconds, an exponential backtrack is reported instead of hanging the guard
+
+#pathological shapes for the extraction regexes, each about n characters long: pdfminer's long
+#unpunctuated lines, whitespace runs, keywords with nothing after them, near-miss emails and dates
+INPUTS = {
+    "words": lambda n: "lorem ipsum dolor " * (n // 18),
+    "lines": lambda n: ("data analysis and reporting for the team " * 2 + "\n") * (n // 83),
+    "spaces": lambda n: "a" + " " * n + "!",
+    "newline runs": lambda n: "ma" + " \n" * (n // 2) + "!",
+    "degrees": lambda n: "ma bs ba mba " * (n // 13) + "!",
+    "institutions": lambda n: "state university " * (n // 17) + "!",
+    "digits": lambda n: "1-" * (n // 2),
+    "emails": lambda n: "a.b@" * (n // 4),
+    "initials": lambda n: "Aa" + " B  " * (n // 4) + "!",
+    "headers": lambda n: "** work " * (n // 8),
+    "brackets": lambda n: "[work experience " * (n // 17),
+    "dates": lambda n: "Jan " + " " * n + "2020 -",
+    "years": lambda n: "2020 to " * (n // 8),
+}
+
+def extractors():
+    #imported here, both modules load a spaCy model
+    import Parser
+    import Basic_Parser
+    functions = {f"Parser.{name}": getattr(Parser, name) for name in (
+        "extract_name", "extract_email", "extract_phone_number", "extract_education", "extract_skills",
+        "extract_projects", "extract_certifications", "extract_work_experience", "calculate_work_duration"
+    )}
+    functions.update({
+        "Basic_Parser.extract_name": lambda text: Basic_Parser.extract_name(text, use_ner=False),
+        "Basic_Parser.extract_email": Basic_Parser.extract_email,
+        "Basic_Parser.extract_phone_number": Basic_Parser.extract_phone_number,
+        "Basic_Parser.extract_linkedin": Basic_Parser.extract_linkedin,
+        "Basic_Parser.clean_content": Basic_Parser.clean_content,
+    })
+    return functions
+
+def replacements():
+    #(name, the pattern as it was, its linear replacement), --corpus checks they still agree
+    import Parser
+    import Basic_Parser
+    degree = re.compile(r'(?i)(bachelor|master|phd|doctorate|mba|bs|ba|ms|ma|btech|mtech).*?(?:in|of)?\s+([a-z\s]+?)(?:\d{4}|\n|$)')
+    institution = re.compile(r'(?i)([a-z\s]+?)\s+(university|college|institute)')
+    email = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+    name = re.compile(r'^([A-Z][a-z]+(?:\s+[A-Z]\.?\s*)*[A-Z][a-z]+)(?:\s|$)')
+    headers = [
+        (r"(?i)\*\*.*work.*experience.*\*\*", r"(?i)^(?:(?!\*\*).)*\*\*(?:(?!work).)*work(?:(?!experience).)*experience.*\*\*"),
+        (r"(?i)\[work.*experience.*\]", r"(?i)^(?:(?!\[work).)*\[work(?:(?!experience).)*experience.*\]"),
+        (r"(?i)\*\*.*education.*\*\*", r"(?i)^(?:(?!\*\*).)*\*\*(?:(?!education).)*education.*\*\*"),
+    ]
+
+    def names(pattern):
+        return lambda text: [(m.group(1) if m else None) for m in map(pattern.match, (line.strip() for line in text.split('\n')))]
+
+    def header_lines(pattern):
+        return lambda text: [bool(re.search(pattern, line.strip())) for line in text.splitlines()]
+
+    pairs = [
+        ("degree", degree.findall, Parser.degree_matches),
+        ("institution", institution.findall, Parser.institution_matches),
+        ("email", lambda text: sorted(set(email.findall(text))), lambda text: sorted(Parser.extract_email(text))),
+        ("name", names(name), names(Basic_Parser.NAME_LINE)),
+    ]
+    pairs += [(f"header {old}", header_lines(old), header_lines(new)) for old, new in headers]
+    return pairs
+
+class Timeout(Exception):
+    pass
+
+@contextmanager
+def deadline(seconds):
+    #SIGALRM interrupts a runaway match between backtracking steps, there is no alarm on windows
+    if not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise Timeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.alarm(seconds)
+    try:
+        yield
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+
+def timed(function, text, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def check(functions, inputs=INPUTS, sizes=SIZES, max_exponent=MAX_EXPONENT, timeout=CALL_TIMEOUT):
+    #every function on every input at both sizes. exponent is how the time grew against the size,
+    #a row fails if it grew faster than max_exponent and took long enough to tell from noise
+    small, large = sizes
+    rows = []
+    for name, function in functions.items():
+        for shape, build in inputs.items():
+            try:
+                with deadline(timeout):
+                    seconds = (timed(function, build(small)), timed(function, build(large)))
+            except Timeout:
+                rows.append({"function": name, "input": shape, "seconds": None, "exponent": math.inf, "ok": False})
+                continue
+            exponent = math.log(max(seconds[1], 1e-9) / max(seconds[0], 1e-9)) / math.log(large / small)
+            ok = seconds[1] < NOISE_SECONDS or exponent <= max_exponent
+            rows.append({"function": name, "input": shape, "seconds": seconds, "exponent": exponent, "ok": ok})
+    return rows
+
+def check_corpus(folder):
+    #the replacements against the old patterns on real text, (files, mismatches)
+    import Parser
+    pairs = replacements()
+    mismatches = []
+    files = sorted(p for p in Path(folder).iterdir() if p.suffix.lower() in ['.pdf', '.docx'])
+    for path in files:
+        extract = Parser.extract_text_from_pdf if path.suffix.lower() == '.pdf' else Parser.extract_text_from_docx
+        text = extract(str(path))
+        if not text:
+            continue
+        for name, old, new in pairs:
+            if old(text) != new(text):
+                mismatches.append((path.name, name))
+                logger.warning(f"{path.name}: {name} differs from the old pattern")
+    return len(files), mismatches
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Fail if an extraction regex scales worse than linearly on adversarial input')
+    parser.add_argument('--only', default=None, help='Only check functions whose name contains this')
+    parser.add_argument('--sizes', type=int, nargs=2, default=SIZES, help='Small and large input size in characters')
+    parser.add_argument('--max-exponent', type=float, default=MAX_EXPONENT,
+                       help='Largest allowed growth exponent of time against input size')
+    parser.add_argument('--corpus', default=None,
+                       help='Folder of resumes to also check the rewritten patterns against the old ones on')
+    args = parser.parse_args()
+
+    functions = {name: f for name, f in extractors().items() if not args.only or args.only in name}
+    rows = check(functions, sizes=args.sizes, max_exponent=args.max_exponent)
+    failed = [row for row in rows if not row["ok"]]
+    for row in rows:
+        if row["seconds"] is None:
+            timing = f"timed out after {CALL_TIMEOUT}s"
+        else:
+            timing = f"{row['seconds'][0] * 1000:9.2f}ms {row['seconds'][1] * 1000:9.2f}ms  exponent {row['exponent']:5.2f}"
+        print(f"{'ok  ' if row['ok'] else 'FAIL'} {row['function']:36s} {row['input']:14s} {timing}")
+    print(f"{len(rows) - len(failed)}/{len(rows)} passed, sizes {args.sizes[0]} and {args.sizes[1]}, "
+          f"max exponent {args.max_exponent}")
+
+    if args.corpus:
+        count, mismatches = check_corpus(args.corpus)
+        print(f"Corpus: {count} files, {len(mismatches)} mismatches against the old patterns")
+        failed += mismatches
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+FAILED = "failed"
+QUARANTINED = "quarantined"
+
+class RunJournal:
+    #append-only JSONL, one line per finished file, flushed and fsynced before the next file counts
+    #as done. every complete line ends at the offset the next append starts from, so a crash can
+    #at worst leave one torn line at the end, which is cut off when the run is resumed
+    def __init__(self, filename):
+        self.filename = Path(filename)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.handle = None
+
+    def open(self, resume=False):
+        if resume and self.filename.exists():
+            self.load()
+        elif self.filename.exists():
+            logger.warning(f"Starting over, previous journal discarded: {self.filename}")
+            self.filename.unlink()
+        self.handle = open(self.filename, "ab")
+        return self
+
+    def load(self):
+        offset = 0
+        with open(self.filename, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                #a file journaled twice (a resumed run that redid it) keeps its latest record
+                self.entries[entry["file"]] = entry
+                offset += len(line)
+        if offset < self.filename.stat().st_size:
+            logger.warning(f"Torn journal tail cut at byte {offset}: {self.filename}")
+            with open(self.filename, "r+b") as f:
+                f.truncate(offset)
+        logger.info(f"Journal {self.filename}: {len(self.entries)} files already done")
+
+    def done(self, file_path):
+        return str(file_path) in self.entries
+
+    def record(self, file_path, status, result=None, reason=None):
+        entry = {"file": str(file_path), "status": status, "result": result}
+        if reason:
+            entry["reason"] = reason
+        data = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self.lock:
+            self.handle.write(data)
+            self.handle.flush()
+            os.fsync(self.handle.fileno())
+            self.entries[entry["file"]] = entry
+
+    def outcomes(self, file_paths=None):
+        #(results by file name, failed files, quarantine entries) as save_to_json and the summary expect
+        with self.lock:
+            entries = list(self.entries.values())
+        wanted = {str(f) for f in file_paths} if file_paths is not None else None
+        results = {}
+        failed_files = []
+        quarantine = []
+        for entry in entries:
+            if wanted is not None and entry["file"] not in wanted:
+                continue
+            if entry["status"] == OK and entry["result"]:
+                results[Path(entry["file"]).name] = entry["result"]
+            elif entry["status"] == QUARANTINED:
+                quarantine.append({"file": entry["file"], "reason": entry.get("reason")})
+            else:
+                failed_files.append(entry["file"])
+        return results, failed_files, quarantine
+
+    def close(self, remove=False):
+        with self.lock:
+            if self.handle is not None:
+                self.handle.close()
+                self.handle = None
+        if remove:
+            self.filename.unlink(missing_ok=True)
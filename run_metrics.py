@@ -0,0 +1,208 @@
+import os
+import time
+import logging
+import threading
+from collections import deque, defaultdict
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "resume_parser"
+RATE_WINDOW = 60.0  #seconds of completions the live rate and ETA are taken from
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class RunMetrics:
+    #live counters of a batch run. record() and record_stage() are cheap and thread safe
+    def __init__(self, total=0):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.total = total
+        self.outcomes = defaultdict(int)
+        self.stage_seconds = defaultdict(float)
+        self.stage_count = defaultdict(int)
+        self.recent = deque()
+        self.gauges = {}
+
+    def expect(self, count):
+        #sharded runs learn their share batch by batch
+        with self.lock:
+            self.total += count
+
+    def gauge(self, name, read):
+        #queue depths and the like, read() is only called when the metrics are rendered
+        self.gauges[name] = read
+
+    def record(self, outcome, seconds=None):
+        now = time.time()
+        with self.lock:
+            self.outcomes[outcome] += 1
+            self.recent.append(now)
+            if seconds is not None:
+                self.stage_seconds["file"] += seconds
+                self.stage_count["file"] += 1
+
+    def record_stage(self, stage, seconds):
+        with self.lock:
+            self.stage_seconds[stage] += seconds
+            self.stage_count[stage] += 1
+
+    def take_stages(self):
+        #stage totals since the last call, worker processes time their stages locally and hand these
+        #over with each result instead of a round trip per stage
+        with self.lock:
+            stages = {stage: (self.stage_seconds[stage], self.stage_count[stage]) for stage in self.stage_count}
+            self.stage_seconds.clear()
+            self.stage_count.clear()
+        return stages
+
+    def add_stages(self, stages):
+        with self.lock:
+            for stage, (seconds, count) in stages.items():
+                self.stage_seconds[stage] += seconds
+                self.stage_count[stage] += count
+
+    def snapshot(self):
+        now = time.time()
+        with self.lock:
+            while self.recent and self.recent[0] < now - RATE_WINDOW:
+                self.recent.popleft()
+            finished = sum(self.outcomes.values())
+            elapsed = max(now - self.started, 1e-6)
+            window = min(RATE_WINDOW, elapsed)
+            rate = len(self.recent) / window if self.recent else 0.0
+            remaining = max(self.total - finished, 0)
+            data = {
+                "elapsed": elapsed,
+                "total": self.total,
+                "finished": finished,
+                "outcomes": dict(self.outcomes),
+                "rate": rate,
+                "average_rate": finished / elapsed,
+                "eta": remaining / rate if rate else None,
+                "stages": {stage: (self.stage_seconds[stage], self.stage_count[stage]) for stage in self.stage_count}
+            }
+        gauges = {}
+        for name, read in list(self.gauges.items()):
+            try:
+                gauges[name] = read()
+            except Exception as e:
+                logger.debug(f"Gauge {name} unreadable: {str(e)}")
+        data["gauges"] = gauges
+        return data
+
+    def progress_line(self):
+        data = self.snapshot()
+        percent = data["finished"] * 100 / data["total"] if data["total"] else 0
+        eta = str(timedelta(seconds=round(data["eta"]))) if data["eta"] is not None else "-"
+        failed = sum(n for outcome, n in data["outcomes"].items() if outcome != "ok")
+        stages = ", ".join(f"{stage} {seconds / count:.2f}s" for stage, (seconds, count) in sorted(data["stages"].items()) if count)
+        queues = ", ".join(f"{name} {value}" for name, value in sorted(data["gauges"].items()))
+        line = (f"Progress {data['finished']}/{data['total']} ({percent:.0f}%), {failed} failed, "
+                f"{data['rate']:.1f} docs/s, ETA {eta}")
+        if stages:
+            line += f" | avg {stages}"
+        if queues:
+            line += f" | queues {queues}"
+        return line
+
+    def prometheus_text(self):
+        data = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_text = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+                lines.append(f"{PREFIX}_{name}{label_text} {value}")
+
+        metric("files_expected", "gauge", "Files this run is expected to finish", [({}, data["total"])])
+        metric("files_finished_total", "counter", "Files finished, by outcome",
+               [({"outcome": outcome}, n) for outcome, n in sorted(data["outcomes"].items())] or [({"outcome": "ok"}, 0)])
+        metric("docs_per_second", "gauge", f"Files finished per second over the last {RATE_WINDOW:.0f}s",
+               [({}, round(data["rate"], 4))])
+        metric("eta_seconds", "gauge", "Estimated seconds until the expected files are finished",
+               [({}, round(data["eta"], 1) if data["eta"] is not None else "NaN")])
+        metric("elapsed_seconds", "gauge", "Seconds since the run started", [({}, round(data["elapsed"], 1))])
+        metric("stage_seconds_total", "counter", "Time spent per stage",
+               [({"stage": stage}, round(seconds, 4)) for stage, (seconds, _) in sorted(data["stages"].items())])
+        metric("stage_runs_total", "counter", "Times each stage ran",
+               [({"stage": stage}, count) for stage, (_, count) in sorted(data["stages"].items())])
+        if data["gauges"]:
+            metric("queue_depth", "gauge", "Items waiting per queue",
+                   [({"queue": name}, value) for name, value in sorted(data["gauges"].items())])
+        return "\n".join(lines) + "\n"
+
+def write_textfile(metrics, filename):
+    #atomic, a node_exporter textfile collector never reads half a file
+    path = Path(filename)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(metrics.prometheus_text())
+    os.replace(tmp, path)
+
+def metrics_server(metrics, port, host="127.0.0.1"):
+    #GET /metrics on a daemon thread
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+class MetricsReporter:
+    #every interval: one progress line in the log and a fresh textfile, plus the scrape endpoint
+    def __init__(self, metrics, interval=10.0, textfile=None, port=None):
+        self.metrics = metrics
+        self.interval = interval
+        self.textfile = textfile
+        self.port = port
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+
+    def report(self):
+        if self.interval:
+            logger.info(self.metrics.progress_line())
+        if self.textfile:
+            try:
+                write_textfile(self.metrics, self.textfile)
+            except OSError as e:
+                logger.warning(f"Metrics file not written: {str(e)}")
+
+    def run(self):
+        while not self.stop_event.wait(self.interval or 5.0):
+            self.report()
+
+    def __enter__(self):
+        if self.port is not None:
+            self.server = metrics_server(self.metrics, self.port)
+        if self.interval or self.textfile:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.report()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        return False
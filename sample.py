@@ -3,14 +3,14 @@ import nltk
 from pdfminer.high_level import extract_text
 from nltk.tokenize import word_tokenize, sent_tokenize
 from docx import Document
-import spacy
+import ner_tiers
 import re
 import dateparser
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
-# Load the SpaCy model
-nlp = spacy.load("en_core_web_md")
+# Load the SpaCy model, the tier is picked with RESUME_NER_TIER (see ner_tiers.py)
+nlp = ner_tiers.load()
 
 def extract_text_from_docx(doc_path):
     try:
@@ -52,9 +52,9 @@ def extract_experience_section(text):
 
     return "\n".join(experience_text)
 
-# Re-load SpaCy smaller model (if needed)
+# SpaCy model again, ner_tiers caches it so this is the same pipeline
 nltk.download('punkt')
-nlp = spacy.load("en_core_web_md")
+nlp = ner_tiers.load()
 
 def extract_date_ranges(text):
     date_pattern = r'(?P<from>\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|' \
@@ -0,0 +1,184 @@
+import re
+import json
+import logging
+import zipfile
+import threading
+from collections import deque, defaultdict
+from pathlib import Path
+
+import numpy as np
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdftypes import resolve1
+
+logger = logging.getLogger(__name__)
+
+HISTORY_LIMIT = 2000  #newest timings kept per file type
+MIN_SAMPLES = 8  #below this a type keeps the prior
+#seconds = a + b * size_mb + c * pages, priors from a Mani run, replaced by fits once timings exist
+PRIOR = {".pdf": (0.05, 0.02, 0.25), ".docx": (0.05, 0.3, 0.05), ".doc": (0.02, 0.0, 0.0)}
+DEFAULT_PRIOR = (0.05, 0.1, 0.1)
+APP_PAGES = re.compile(rb'<Pages>(\d+)</Pages>')
+
+def page_count(file_path):
+    #pdf: /Count of the page tree root, docx: the page count Word saved in docProps/app.xml
+    ext = Path(file_path).suffix.lower()
+    try:
+        if ext == '.pdf':
+            with open(file_path, 'rb') as f:
+                doc = PDFDocument(PDFParser(f))
+                return int(resolve1(resolve1(doc.catalog['Pages'])['Count']))
+        if ext == '.docx':
+            with zipfile.ZipFile(file_path) as archive:
+                match = APP_PAGES.search(archive.read('docProps/app.xml'))
+                return int(match.group(1)) if match else 0
+    except Exception as e:
+        logger.debug(f"Page count failed {file_path}: {str(e)}")
+    return 0
+
+def file_features(file_path):
+    path = Path(file_path)
+    return path.suffix.lower(), path.stat().st_size / 1e6, page_count(path)
+
+class CostModel:
+    #per file type linear model over size and pages, refit from the recorded timings of past runs
+    def __init__(self, history=None):
+        self.history = defaultdict(list, {ext: list(rows) for ext, rows in (history or {}).items()})
+        self.coefficients = {}
+        self.fit()
+
+    def fit(self):
+        self.coefficients = {}
+        for ext, rows in self.history.items():
+            if len(rows) < MIN_SAMPLES:
+                continue
+            data = np.asarray(rows, dtype=float)
+            X = np.column_stack([np.ones(len(data)), data[:, 0], data[:, 1]])
+            coef, *_ = np.linalg.lstsq(X, data[:, 2], rcond=None)
+            self.coefficients[ext] = tuple(float(c) for c in coef)
+
+    def predict(self, ext, size_mb, pages):
+        a, b, c = self.coefficients.get(ext) or PRIOR.get(ext, DEFAULT_PRIOR)
+        return max(0.01, a + b * size_mb + c * pages)
+
+    def record(self, ext, size_mb, pages, seconds):
+        rows = self.history[ext]
+        rows.append((size_mb, pages, seconds))
+        del rows[:-HISTORY_LIMIT]
+
+    def save(self, filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(dict(self.history), f)
+        logger.info(f"Timing history for {sum(len(r) for r in self.history.values())} files saved to {filename}")
+
+    @classmethod
+    def load(cls, filename):
+        if not filename or not Path(filename).exists():
+            return cls()
+        with open(filename, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+def longest_first(costs):
+    #tasks by predicted cost, largest first (LPT)
+    return sorted(costs, key=lambda task: -costs[task])
+
+def simulate_makespan(costs, workers):
+    #what LPT on `workers` idle workers would finish in if every prediction were exact
+    loads = [0.0] * max(1, workers)
+    for task in longest_first(costs):
+        i = loads.index(min(loads))
+        loads[i] += costs[task]
+    return max(loads) if costs else 0.0
+
+class WorkStealingQueue:
+    #tasks are dealt out longest-first to the least-loaded worker's deque. an owner takes from the
+    #front of its own deque (its biggest remaining file), an idle worker steals from the back of the
+    #deque with the most predicted work left, so mispredictions even out at the end of the run
+    def __init__(self, costs, workers):
+        self.lock = threading.Lock()
+        self.costs = costs
+        self.deques = [deque() for _ in range(max(1, workers))]
+        self.loads = [0.0] * len(self.deques)
+        self.steals = 0
+        for task in longest_first(costs):
+            i = self.loads.index(min(self.loads))
+            self.deques[i].append(task)
+            self.loads[i] += costs[task]
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(d) for d in self.deques)
+
+    def take(self, worker):
+        with self.lock:
+            own = self.deques[worker % len(self.deques)]
+            if own:
+                return self._pop(worker % len(self.deques), own.popleft())
+            candidates = [i for i, d in enumerate(self.deques) if d]
+            if not candidates:
+                return None
+            victim = max(candidates, key=lambda i: self.loads[i])
+            self.steals += 1
+            return self._pop(victim, self.deques[victim].pop())
+
+    def _pop(self, i, task):
+        self.loads[i] -= self.costs.get(task, 0.0)
+        return task
+
+    def put_back(self, worker, task):
+        #retries go to the front of the worker's own deque
+        with self.lock:
+            i = worker % len(self.deques)
+            self.deques[i].appendleft(task)
+            self.loads[i] += self.costs.get(task, 0.0)
+
+class ScheduleReport:
+    #predicted vs actual, per file and for the whole run
+    def __init__(self, costs, workers):
+        self.lock = threading.Lock()
+        self.costs = costs
+        self.workers = workers
+        self.actual = {}
+        self.full = set()  #tasks whose time is a full fresh parse, the ones worth learning costs from
+        self.steals = 0
+
+    def record(self, task, seconds, full=True):
+        with self.lock:
+            self.actual[task] = seconds
+            if full:
+                self.full.add(task)
+            else:
+                self.full.discard(task)
+
+    def learnable(self):
+        with self.lock:
+            return {task: self.actual[task] for task in self.full}
+
+    def summary_lines(self, wall_seconds):
+        with self.lock:
+            actual = dict(self.actual)
+        if not actual:
+            return []
+        predicted_work = sum(self.costs.get(t, 0.0) for t in actual)
+        actual_work = sum(actual.values())
+        errors = [abs(self.costs[t] - s) / max(s, 0.01) for t, s in actual.items() if t in self.costs]
+        ideal = actual_work / max(1, self.workers)
+        return [
+            f"Schedule: {len(actual)} files on {self.workers} workers, {self.steals} steals",
+            f"Predicted work {predicted_work:.1f}s, actual work {actual_work:.1f}s, "
+            f"median per-file error {np.median(errors) * 100 if errors else 0:.0f}%",
+            f"Predicted makespan {simulate_makespan(self.costs, self.workers):.1f}s, actual {wall_seconds:.1f}s "
+            f"(perfect balance of actual work: {ideal:.1f}s)"
+        ]
+
+def plan(file_paths, model):
+    #predicted cost per file, the features are kept so actual timings can be recorded against them
+    features = {}
+    costs = {}
+    for file_path in file_paths:
+        try:
+            features[file_path] = file_features(file_path)
+        except OSError:
+            features[file_path] = (Path(file_path).suffix.lower(), 0.0, 0)
+        costs[file_path] = model.predict(*features[file_path])
+    return features, costs
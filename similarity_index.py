@@ -0,0 +1,176 @@
+import json
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "vector_ids.json"
+JOB_SEPARATOR = "#job"
+
+def document_vector(nlp, text):
+    #tokenizer only, doc.vector comes straight from the vocab vectors so no pipes are needed
+    doc = nlp.make_doc(text or "")
+    return normalize(np.asarray(doc.vector, dtype=np.float32))
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def resume_text(record):
+    #Basic_Parser keeps cleaned_content, Parser keeps structured fields
+    if record.get("cleaned_content"):
+        return record["cleaned_content"]
+    parts = list(record.get("skills") or [])
+    for job in record.get("work_experiences") or []:
+        parts.append(job_text(job))
+    parts.extend(record.get("education") or [])
+    return " ".join(parts)
+
+def job_text(job):
+    description = job.get("work_description") or ""
+    if description == "No description available":
+        description = ""
+    return f"{job.get('job_title', '')} {job.get('company', '')} {description}".strip()
+
+def collect_texts(results):
+    #one row per resume plus one per work entry, ids line up with the matrix rows. only Parser results
+    #have work_experiences, an index of Basic_Parser results holds resume rows alone
+    ids = []
+    texts = []
+    for name, record in results.items():
+        if not record:
+            continue
+        ids.append(name)
+        texts.append(resume_text(record))
+        for i, job in enumerate(record.get("work_experiences") or []):
+            ids.append(f"{name}{JOB_SEPARATOR}{i}")
+            texts.append(job_text(job))
+    return ids, texts
+
+def build_index(results, nlp, index_dir, batch_size=256):
+    ids, texts = collect_texts(results)
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    dim = nlp.vocab.vectors_length
+    if dim == 0:
+        logger.warning("spaCy model has no word vectors, similarity index will be empty")
+
+    matrix = np.lib.format.open_memmap(
+        index_dir / VECTORS_FILE, mode="w+", dtype=np.float32, shape=(len(ids), dim)
+    )
+    #tokenizer.pipe batches the work, rows are written straight into the memmap
+    for row, doc in enumerate(nlp.tokenizer.pipe(texts, batch_size=batch_size)):
+        matrix[row] = normalize(np.asarray(doc.vector, dtype=np.float32))
+    matrix.flush()
+    del matrix
+
+    with open(index_dir / IDS_FILE, "w", encoding="utf-8") as f:
+        json.dump(ids, f, ensure_ascii=False)
+
+    jobs = sum(JOB_SEPARATOR in record_id for record_id in ids)
+    logger.info(f"Vector index with {len(ids)} rows ({jobs} work entries) saved to {index_dir}")
+    return len(ids)
+
+def load_index(index_dir):
+    index_dir = Path(index_dir)
+    matrix = np.load(index_dir / VECTORS_FILE, mmap_mode="r")
+    with open(index_dir / IDS_FILE, "r", encoding="utf-8") as f:
+        ids = json.load(f)
+    return matrix, ids
+
+def row_mask(ids, kind):
+    #kind: "resume", "job" or None for everything
+    is_job = np.array([JOB_SEPARATOR in record_id for record_id in ids], dtype=bool)
+    if kind == "resume":
+        return ~is_job
+    if kind == "job":
+        return is_job
+    return np.ones(len(ids), dtype=bool)
+
+def top_k(matrix, queries, k=10, mask=None):
+    #cosine similarity is a single matrix product since every row is unit length
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    scores = queries @ np.asarray(matrix).T
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((len(queries), 0))
+        return empty.astype(int), empty
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+def query_text(nlp, matrix, ids, texts, k=10, kind="resume"):
+    #JD -> candidates, one row of matches per query text
+    queries = np.vstack([document_vector(nlp, text) for text in texts])
+    indices, scores = top_k(matrix, queries, k, row_mask(ids, kind))
+    return [
+        [(ids[i], float(s)) for i, s in zip(row_idx, row_scores) if np.isfinite(s)]
+        for row_idx, row_scores in zip(indices, scores)
+    ]
+
+def similar_to(matrix, ids, record_ids, k=10, kind="resume"):
+    #candidate -> similar candidates, the record itself is excluded
+    positions = {record_id: i for i, record_id in enumerate(ids)}
+    rows = [positions[record_id] for record_id in record_ids]
+    mask = row_mask(ids, kind)
+    indices, scores = top_k(matrix, np.asarray(matrix)[rows], k + 1, mask)
+
+    matches = []
+    for row, row_idx, row_scores in zip(rows, indices, scores):
+        matches.append([
+            (ids[i], float(s)) for i, s in zip(row_idx, row_scores)
+            if i != row and np.isfinite(s)
+        ][:k])
+    return matches
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Build or query a resume vector index')
+    parser.add_argument('index_dir', help='Directory written by build_index')
+    parser.add_argument('--build', default=None,
+                       help='Parser or Basic_Parser JSON (or a run journal) to build the index from first, '
+                            'work entry rows need Parser output')
+    parser.add_argument('--jd', help='Job description text file to match against candidates')
+    parser.add_argument('--like', help='Record id to find similar candidates for')
+    parser.add_argument('--jobs', action='store_true', help='Match work entries instead of whole resumes')
+    parser.add_argument('-k', type=int, default=10, help='Number of matches (default: 10)')
+    args = parser.parse_args()
+
+    if args.build:
+        #imported here, analyze_results pulls in pandas and ner_tiers loads a spaCy model
+        import ner_tiers
+        from analyze_results import iter_records
+        build_index(dict(iter_records(args.build)), ner_tiers.vectors_pipeline(), args.index_dir)
+        if not (args.jd or args.like):
+            return
+
+    matrix, ids = load_index(args.index_dir)
+    kind = "job" if args.jobs else "resume"
+    if args.jobs and not row_mask(ids, "job").any():
+        logger.warning(f"{args.index_dir} has no work entry rows, build it from Parser output (--build extracted_data.json)")
+
+    if args.jd:
+        import spacy
+        nlp = spacy.load("en_core_web_md")
+        with open(args.jd, "r", encoding="utf-8") as f:
+            matches = query_text(nlp, matrix, ids, [f.read()], args.k, kind)[0]
+    elif args.like:
+        matches = similar_to(matrix, ids, [args.like], args.k, kind)[0]
+    else:
+        parser.error("one of --jd or --like is required")
+
+    for record_id, score in matches:
+        print(f"{score:.4f}  {record_id}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import json
+import queue
+import atexit
+import logging
+import threading
+import multiprocessing.util
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FILE = "resume_parser.log"
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+EVENT_FIELDS = ("file", "stage", "duration", "error")
+
+lock = threading.Lock()
+listener = None
+settings = ("INFO", LOG_FILE)
+
+def event(file=None, stage=None, duration=None, error=None):
+    #extra= fields of a log call. error is an exception (only its class is kept) or a short label,
+    #values are turned into text by the listener, not by the thread that logs
+    fields = {"file": file, "stage": stage, "duration": duration, "error": error}
+    if isinstance(error, BaseException):
+        fields["error"] = type(error).__name__
+    return {key: value for key, value in fields.items() if value is not None}
+
+class JsonFormatter(logging.Formatter):
+    #one JSON object per line, the event fields are top-level keys so runs can be filtered with jq
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName
+        }
+        for field in EVENT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = round(value, 4) if field == "duration" else value
+        if record.exc_info:
+            data.setdefault("error", record.exc_info[0].__name__)
+            data["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class DeferredQueueHandler(QueueHandler):
+    #the stock QueueHandler formats the message in the logging thread so the record can be pickled,
+    #this queue never leaves the process, so msg % args and the traceback text are left to the listener
+    def prepare(self, record):
+        return record
+
+def setup_logging(level="INFO", log_file=LOG_FILE):
+    #every logger call only puts the record on an in-process queue, one listener thread writes JSON
+    #lines to log_file and plain text to the console. records below level are dropped before any
+    #formatting. worker processes call this again for a queue and listener of their own
+    global listener, settings
+    stop_logging()
+    records = queue.SimpleQueue()
+    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(records))
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    with lock:
+        listener = QueueListener(records, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+        settings = (level, log_file)
+    #worker processes end through multiprocessing's exit hook, which skips atexit. a forked child
+    #starts with an empty finalizer registry, so this is registered again on every setup
+    multiprocessing.util.Finalize(None, stop_logging, exitpriority=100)
+    return listener
+
+def stop_logging():
+    #drains the queue, safe to call twice
+    global listener
+    with lock:
+        current, listener = listener, None
+    if current is not None:
+        current.stop()
+        for handler in current.handlers:
+            handler.close()
+
+def log_settings():
+    #(level, log file) to hand to worker processes
+    return settings
+
+atexit.register(stop_logging)
@@ -0,0 +1,365 @@
+import io
+import os
+import json
+import shutil
+import random
+import logging
+import zipfile
+import argparse
+import textwrap
+from pathlib import Path
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+#seeded resumes for scale tests, no real person in them. file i is generated from random.Random(f"{seed}:{i}")
+#alone, so a shard comes out byte for byte the same whatever the worker count or the order shards run in.
+#each shard folder holds PER_DIR files and a truth.json shaped like extracted_data.json (Parser's output),
+#so a shard works as a folder for Basic_Parser and as a golden fixture source for golden.py
+GENERATOR_VERSION = 2
+PER_DIR = 1000
+PDF_SHARE = 0.5
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+#fictional names, companies and schools, addresses in the 555-01xx range reserved for fiction
+FIRST_NAMES = [
+    "Avery", "Jordan", "Riley", "Morgan", "Casey", "Taylor", "Quinn", "Rowan", "Emerson", "Harper", "Jamie",
+    "Skyler", "Parker", "Reese", "Dakota", "Finley", "Hayden", "Kendall", "Logan", "Marlowe", "Noel", "Peyton",
+    "Sawyer", "Tatum", "Blake", "Cameron", "Devon", "Elliot", "Frankie", "Gray", "Indigo", "Jules", "Kai",
+    "Lennon", "Micah", "Oakley", "Phoenix", "Remy", "Sage", "Wren",
+]
+LAST_NAMES = [
+    "Abernathy", "Blackwood", "Castellano", "Delacroix", "Eastwood", "Fairbanks", "Galloway", "Hawthorne",
+    "Ingram", "Jansen", "Kowalski", "Lindqvist", "Marchetti", "Northcott", "Okafor", "Pemberton", "Quintero",
+    "Ravensworth", "Sandoval", "Thornbury", "Underhill", "Valdivia", "Whitlock", "Yamaguchi", "Zielinski",
+    "Ashdown", "Brightwater", "Crestwood", "Dunmore", "Ellsworth", "Fenwick", "Greywood", "Holloway",
+    "Iverson", "Kingsley", "Lockhart", "Merriweather", "Nakamura", "Oyelaran", "Penhaligon",
+]
+COMPANIES = [
+    "Northwind Traders", "Contoso Ltd", "Fabrikam Inc", "Adventure Works", "Tailspin Toys",
+    "Wide World Importers", "Litware Inc", "Proseware Inc", "Woodgrove Bank", "Alpine Ski House",
+    "Blue Yonder Airlines", "Coho Winery", "Fourth Coffee", "Humongous Insurance", "Lucerne Publishing",
+    "Margie's Travel", "Northwind Health", "Relecloud", "Trey Research", "Wingtip Toys", "VanArsdel Ltd",
+    "Southridge Video", "City Power & Light", "Consolidated Messenger", "Datum Corporation",
+    "Bellows College Analytics", "Best For You Organics", "Lamna Healthcare Company", "Munson's Pickles",
+    "Nod Publishers", "Olympia Systems", "Tandem Logistics", "Veridian Dynamics", "Cobalt Ridge Labs",
+    "Silverline Solutions", "Harborview Technologies", "Pinecrest Group", "Redwood Analytics LLC",
+    "Summit Peak Services", "Ironbridge Consulting",
+]
+CITIES = [
+    ("Springfield", "IL"), ("Riverton", "WY"), ("Fairview", "TX"), ("Georgetown", "KY"), ("Salem", "OR"),
+    ("Madison", "WI"), ("Franklin", "TN"), ("Clinton", "IA"), ("Ashland", "VA"), ("Arlington", "VA"),
+    ("Dover", "DE"), ("Bristol", "CT"), ("Oxford", "MS"), ("Auburn", "AL"), ("Dayton", "OH"),
+]
+TITLES = [
+    "Data Scientist", "Senior Data Scientist", "Data Engineer", "Sr. Data Engineer", "Machine Learning Engineer",
+    "AI/ML Engineer", "Software Engineer", "Senior Software Engineer", "Cloud Engineer", "DevOps Engineer",
+    "Data Analyst", "Business Analyst", "Project Manager", "Solutions Architect", "Backend Developer",
+    "Full Stack Developer", "QA Analyst", "Product Manager", "Research Scientist", "Technical Lead",
+]
+SKILLS = [
+    "Python", "Java", "SQL", "Scala", "Go", "JavaScript", "TypeScript", "R", "Spark", "Hadoop", "Kafka",
+    "Airflow", "dbt", "Snowflake", "PostgreSQL", "MySQL", "MongoDB", "Redis", "AWS", "Azure", "GCP", "Docker",
+    "Kubernetes", "Terraform", "Jenkins", "Git", "Linux", "Pandas", "NumPy", "Scikit-learn", "TensorFlow",
+    "PyTorch", "Tableau", "Power BI", "Excel", "React", "Node", "FastAPI", "Flask", "Django",
+]
+DEGREES = ["Bachelor of Science", "Master of Science", "Bachelor of Technology", "MBA", "Ph.D.", "B.S.", "M.S."]
+FIELDS = ["Computer Science", "Data Science", "Information Systems", "Statistics", "Electrical Engineering",
+          "Mathematics", "Business Analytics"]
+SCHOOLS = ["Northwind State University", "Bellows College", "Graphic Design Institute", "Trey Research Institute",
+           "Fairview Technical College", "Riverton University", "School of Fine Art"]
+VERBS = ["Designed", "Built", "Led", "Automated", "Optimized", "Migrated", "Implemented", "Maintained",
+         "Developed", "Reduced", "Improved", "Delivered", "Owned", "Scaled", "Introduced"]
+OBJECTS = ["ETL pipelines", "a feature store", "the reporting warehouse", "real-time dashboards",
+           "forecasting models", "the CI/CD workflow", "REST services", "data quality checks", "a churn model",
+           "batch jobs", "the recommendation engine", "infrastructure as code", "A/B test analysis",
+           "customer segmentation", "cost monitoring"]
+OUTCOMES = ["cutting run time by {n}%", "for {n} internal teams", "saving {n} hours a month",
+            "with {n}% fewer incidents", "across {n} regions", "serving {n}k daily users"]
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+CURRENT = ["Present", "Current", "Now", "Ongoing", "present"]
+SEPARATORS = [" – ", " - ", " to ", " -- ", " — ", "-", "–"]
+
+#section headers as they appear in real resumes, the experience ones cover every header Parser looks for
+HEADERS = {
+    "summary": ["SUMMARY", "Professional Summary", "Summary:", "PROFILE"],
+    "experience": ["WORK EXPERIENCE", "Professional Experience", "Employment History", "Experience:",
+                   "Career History", "**Work Experience**", "[Work Experience]"],
+    "education": ["EDUCATION", "Education", "Education:", "**Education**"],
+    "skills": ["SKILLS", "Technical Skills", "Skills:", "Core Competencies"],
+    "projects": ["PROJECTS", "Key Projects", "Projects"],
+    "certifications": ["CERTIFICATIONS", "Certifications", "Licenses & Certifications"],
+}
+BULLETS = ["• ", "- ", "● ", "* ", ""]
+
+def date_text(rng, year, month, shape):
+    #the three shapes calculate_work_duration matches, with their edge cases: full names, Sept, single digit months
+    if shape == "year":
+        return str(year)
+    if shape == "numeric":
+        return f"{month}/{year}" if rng.random() < 0.3 else f"{month:02d}/{year}"
+    name = MONTHS[month - 1]
+    style = rng.random()
+    if style < 0.6:
+        return f"{'Sept' if month == 9 and rng.random() < 0.3 else name[:3]} {year}"
+    return f"{name} {year}"
+
+def make_job(rng, start, end, current):
+    #start and end are (year, month). a year-only range counts from January to January and its truth
+    #keeps the year-only label ("2016"), as written. same month start and end is a real edge case, a job
+    #of under a month
+    shape = rng.choices(["month", "year", "numeric"], weights=[0.7, 0.15, 0.15])[0]
+    if shape == "year":
+        start, end = (start[0], 1), (end[0], 1)
+    separator = rng.choice(SEPARATORS)
+    to = rng.choice(CURRENT) if current else date_text(rng, end[0], end[1], shape)
+    city, state = rng.choice(CITIES)
+    label = "{1}" if shape == "year" else "{0} {1}"
+    return {
+        "job_title": rng.choice(TITLES),
+        "company": rng.choice(COMPANIES),
+        "location": f"{city}, {state}",
+        "duration_months": None if current else (end[0] - start[0]) * 12 + end[1] - start[1],
+        "from": label.format(MONTHS[start[1] - 1][:3], start[0]),
+        "to": "Present" if current else label.format(MONTHS[end[1] - 1][:3], end[0]),
+        "is_current": current,
+        "date_shape": shape,
+        "date_text": f"{date_text(rng, start[0], start[1], shape)}{separator}{to}",
+        "bullets": [bullet(rng) for _ in range(rng.choice([1, 2, 3, 4, 5, 6, 8, 12]))],
+    }
+
+def bullet(rng):
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(2, 90))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} in {rng.choice(SKILLS)}, {outcome}."
+
+def make_jobs(rng):
+    #most recent first, walking back from 2024 with gaps and the odd overlap
+    count = rng.choices(range(9), weights=[3, 10, 16, 18, 16, 12, 10, 8, 7])[0]
+    jobs = []
+    year, month = 2024, rng.randint(1, 12)
+    for k in range(count):
+        length = rng.choice([0, 3, 8, 14, 20, 26, 36, 50])
+        current = k == 0 and rng.random() < 0.5
+        end = (year, month)
+        start_index = year * 12 + month - 1 - length
+        start = (start_index // 12, start_index % 12 + 1)
+        jobs.append(make_job(rng, start, end, current))
+        gap = rng.choice([-4, 0, 0, 1, 2, 6])
+        back = start_index - gap
+        year, month = back // 12, back % 12 + 1
+        if year < 1995:
+            break
+    return jobs
+
+def job_lines(rng, job, layout, bullet_mark):
+    where = job["location"]
+    if layout == 0:
+        head = [f"{job['job_title']}\t{job['date_text']}", f"{job['company']}, {where}"]
+    elif layout == 1:
+        head = [job["job_title"], f"{job['company']}, {where}\t{job['date_text']}"]
+    elif layout == 2:
+        head = [f"{job['company']} | {where}\t{job['date_text']}", job["job_title"]]
+    else:
+        head = [f"{job['job_title']}, {job['company']}\t{job['date_text']}", where]
+    return head + [f"{bullet_mark}{line}" for line in job["bullets"]] + [""]
+
+def make_resume(seed, index):
+    #(lines, truth record) of resume index
+    rng = random.Random(f"{seed}:{index}")
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    email = f"{first.lower()}.{last.lower()}{rng.randint(1, 999)}@example.com"
+    digits = f"555{rng.randint(100, 999)}01{rng.randint(0, 99):02d}"
+    phone = rng.choice([f"({digits[:3]}) {digits[3:6]}-{digits[6:]}", f"{digits[:3]}-{digits[3:6]}-{digits[6:]}",
+                        f"+1 {digits[:3]} {digits[3:6]} {digits[6:]}"])
+    jobs = make_jobs(rng)
+    skills = rng.sample(SKILLS, rng.randint(4, 16))
+    education = [{"degree": rng.choice(DEGREES), "field": rng.choice(FIELDS), "school": rng.choice(SCHOOLS),
+                  "year": rng.randint(1995, 2022)} for _ in range(rng.choice([1, 1, 1, 2, 2, 3]))]
+    layout = rng.randrange(4)
+    bullet_mark = rng.choice(BULLETS)
+
+    sections = ["summary", "experience", "education", "skills"] + [s for s in ("projects", "certifications") if rng.random() < 0.4]
+    rng.shuffle(sections)
+    lines = [f"{first} {last}", rng.choice([f"{email} | {phone}", f"{phone}\t{email}", f"Email: {email}\nPhone: {phone}"]), ""]
+    for section in sections:
+        lines.append(rng.choice(HEADERS[section]))
+        if section == "summary":
+            lines += [f"{rng.choice(TITLES)} with {rng.randint(1, 20)} years of experience. {bullet(rng)}", ""]
+        elif section == "experience":
+            for job in jobs:
+                lines += job_lines(rng, job, layout, bullet_mark)
+        elif section == "education":
+            lines += [f"{e['degree']} in {e['field']}, {e['school']}, {e['year']}" for e in education] + [""]
+        elif section == "skills":
+            lines += [rng.choice([", ", "; ", " | "]).join(skills), ""]
+        elif section == "projects":
+            lines += [f"{bullet_mark}{bullet(rng)}" for _ in range(rng.randint(1, 4))] + [""]
+        else:
+            lines += [f"{bullet_mark}{rng.choice(['AWS', 'Azure', 'GCP', 'Databricks'])} Certified "
+                      f"{rng.choice(['Data Engineer', 'Developer', 'Architect'])}" for _ in range(rng.randint(1, 3))] + [""]
+
+    truth = {
+        "name": f"{first} {last}",
+        "first_name": first,
+        "last_name": last,
+        "emails": [email],
+        "phone_numbers": [phone],
+        "education": [f"{e['degree']} in {e['field']}, {e['school']}" for e in education],
+        "skills": skills,
+        "work_experiences": [{key: job[key] for key in job if key != "bullets"} for job in jobs],
+        "sections": sections,
+        "layout": layout,
+    }
+    return "\n".join(lines).split("\n"), truth
+
+#writers, no third party library so the bytes depend on nothing but the seed
+
+def docx_bytes(lines):
+    paragraphs = []
+    for line in lines:
+        runs = "<w:r><w:tab/></w:r>".join(f'<w:r><w:t xml:space="preserve">{escape(part)}</w:t></w:r>' for part in line.split("\t"))
+        paragraphs.append(f"<w:p>{runs}</w:p>")
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+                + "".join(paragraphs) + "</w:body></w:document>")
+    parts = {
+        "[Content_Types].xml": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>',
+        "_rels/.rels": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>',
+        "word/document.xml": document,
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts.items():
+            archive.writestr(zipfile.ZipInfo(name, ZIP_DATE), content, zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+PAGE_LINES = 54
+WRAP = 95
+
+def pdf_text(line):
+    data = line.replace("\t", "    ").encode("cp1252", errors="replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def pdf_bytes(lines):
+    #letter pages of Helvetica 10pt, WinAnsi so bullets and dashes survive
+    wrapped = []
+    for line in lines:
+        wrapped += textwrap.wrap(line, WRAP, expand_tabs=False, replace_whitespace=False) or [""]
+    pages = [wrapped[i:i + PAGE_LINES] for i in range(0, len(wrapped), PAGE_LINES)] or [[]]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in pages:
+        stream = b"BT /F1 10 Tf 13 TL 54 738 Td " + b"".join(b"(" + pdf_text(line) + b") Tj T* " for line in page) + b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(pages)
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def write_shard(output, seed, shard, start, stop, pdf_share=PDF_SHARE):
+    #files start..stop-1 into shard_<n>, truth.json last and atomically so a finished shard is recognisable
+    folder = Path(output) / f"shard_{shard:04d}"
+    folder.mkdir(parents=True, exist_ok=True)
+    truth = {}
+    size = 0
+    for index in range(start, stop):
+        lines, record = make_resume(seed, index)
+        pdf = random.Random(f"{seed}:{index}:format").random() < pdf_share
+        name = f"resume_{index:07d}.{'pdf' if pdf else 'docx'}"
+        data = pdf_bytes(lines) if pdf else docx_bytes(lines)
+        with open(folder / name, "wb") as f:
+            f.write(data)
+        size += len(data)
+        truth[name] = record
+    #a shard rewritten for a smaller count keeps no files its truth doesn't list
+    for path in folder.glob("resume_*"):
+        if path.name not in truth:
+            path.unlink()
+    tmp = folder / "truth.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(truth, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, folder / "truth.json")
+    return shard, stop - start, size
+
+def finished(folder, expected):
+    #a shard is done when its truth.json lists expected files. the last shard of a smaller run has
+    #fewer, extending the run has to write it again
+    try:
+        with open(Path(folder) / "truth.json", encoding="utf-8") as f:
+            return len(json.load(f)) == expected
+    except (OSError, ValueError):
+        return False
+
+def generate(output, count, seed=0, per_dir=PER_DIR, pdf_share=PDF_SHARE, workers=None):
+    #shards already finished by an earlier run with the same settings are kept, shards past count are removed
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    manifest = {"generator_version": GENERATOR_VERSION, "seed": seed, "count": count, "per_dir": per_dir,
+                "pdf_share": pdf_share}
+    manifest_path = output / "manifest.json"
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if {k: previous.get(k) for k in manifest if k != "count"} != {k: manifest[k] for k in manifest if k != "count"}:
+            raise ValueError(f"{output} holds a corpus made with other settings: {previous}")
+    shards = -(-count // per_dir)
+    for folder in output.glob("shard_*"):
+        suffix = folder.name[len("shard_"):]
+        if folder.is_dir() and suffix.isdigit() and int(suffix) >= shards:
+            shutil.rmtree(folder)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    todo = [(shard, start, min(start + per_dir, count)) for shard, start in enumerate(range(0, count, per_dir))
+            if not finished(output / f"shard_{shard:04d}", min(per_dir, count - start))]
+    logger.info(f"{count} resumes in {shards} shards, {len(todo)} to write")
+    files = size = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(write_shard, output, seed, shard, start, stop, pdf_share) for shard, start, stop in todo]
+        for done, future in enumerate(futures, 1):
+            shard, written, shard_size = future.result()
+            files += written
+            size += shard_size
+            if done % 10 == 0 or done == len(futures):
+                logger.info(f"{done}/{len(futures)} shards, {files} files, {size / 1e6:.1f} MB")
+    return files, size
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Write a seeded synthetic resume corpus with ground truth')
+    parser.add_argument('output', help='Folder to write shard_<n>/ folders and manifest.json to')
+    parser.add_argument('--count', '-n', type=int, default=10000, help='Resumes to write (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='Same seed, same bytes (default: 0)')
+    parser.add_argument('--per-dir', type=int, default=PER_DIR, help=f'Resumes per shard folder (default: {PER_DIR})')
+    parser.add_argument('--pdf-share', type=float, default=PDF_SHARE,
+                       help=f'Fraction written as PDF, the rest DOCX (default: {PDF_SHARE})')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='Processes writing shards (default: CPU count)')
+    args = parser.parse_args()
+
+    files, size = generate(args.output, args.count, args.seed, args.per_dir, args.pdf_share, args.workers)
+    print(f"Wrote {files} resumes, {size / 1e6:.1f} MB, into {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import os
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+TEXT_DIR = "text"
+RESULTS_DIR = "results"
+NO_TEXT = b"\x00"  #stored for files the extractor found nothing in, so scanned PDFs aren't re-extracted either
+CHUNK_SIZE = 1 << 20
+
+def file_digest(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def extractor_id(extractor, version):
+    #changing either the function or its version gives a new key, old entries are just never read again
+    return f"{extractor.__module__}.{extractor.__name__}/{version}"
+
+class BlobStore:
+    #zlib-compressed blobs under <dir>/<2 hex>/<sha256 of the key>, writes go through a temp file
+    #and os.replace so a crash or a second process never leaves half a blob behind
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_written = 0
+
+    def path(self, key):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / name[:2] / name
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            data = None
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Unreadable cache entry {path}: {str(e)}")
+            data = None
+        with self.lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp, path)
+        with self.lock:
+            self.bytes_written += len(compressed)
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes_written": self.bytes_written}
+
+    def take_stats(self):
+        #counters since the last call, worker processes hand these to the parent's store
+        with self.lock:
+            stats = {"hits": self.hits, "misses": self.misses, "bytes_written": self.bytes_written}
+            self.hits = self.misses = self.bytes_written = 0
+        return stats
+
+    def add_stats(self, stats):
+        with self.lock:
+            self.hits += stats["hits"]
+            self.misses += stats["misses"]
+            self.bytes_written += stats["bytes_written"]
+
+class TextCache:
+    #level 1: extracted plain text keyed by source file hash + extractor version. the expensive
+    #pdfminer/docx work is only redone when the file or the extractor changes
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.store = BlobStore(self.cache_dir / TEXT_DIR)
+
+    def extract(self, file_path, extractor, version, digest=None):
+        key = f"{digest or file_digest(file_path)}:{extractor_id(extractor, version)}"
+        data = self.store.get(key)
+        if data is not None:
+            return None if data == NO_TEXT else data.decode("utf-8")
+
+        #an extractor that raises stores nothing, a file that couldn't be read is tried again next time.
+        #only None or "" from a finished extraction is cached as NO_TEXT
+        text = extractor(file_path)
+        self.store.put(key, NO_TEXT if not text else text.encode("utf-8"))
+        return text
+
+class ResultCache:
+    #level 2: parsed fields keyed by the extracted text's hash + parser version, kept apart from
+    #level 1 so a parser change reuses every extracted text and an extractor change that leaves
+    #the text identical reuses every parsed result
+    def __init__(self, cache_dir, version):
+        self.store = BlobStore(Path(cache_dir) / RESULTS_DIR)
+        self.version = version
+
+    def key(self, text):
+        return f"{text_digest(text)}:{self.version}"
+
+    def get(self, text):
+        data = self.store.get(self.key(text))
+        return json.loads(data) if data is not None else None
+
+    def put(self, text, result):
+        self.store.put(self.key(text), json.dumps(result, ensure_ascii=False).encode("utf-8"))
+
+def summary_lines(text_cache=None, result_cache=None):
+    lines = []
+    for label, cache in (("Text cache", text_cache), ("Result cache", result_cache)):
+        if cache is not None:
+            stats = cache.store.stats()
+            lines.append(f"{label}: {stats['hits']} hits, {stats['misses']} misses, "
+                         f"{stats['bytes_written'] / 1e6:.1f} MB written")
+    return lines
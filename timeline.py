@@ -0,0 +1,223 @@
+import time
+import logging
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+#experience as merged job intervals instead of a sum of duration_months, so concurrent or overlapping
+#jobs count once. every job of every candidate is one row of flat arrays (candidate, start, end) in
+#months since year 0, and the merge is one sort plus a running maximum over the whole batch:
+#    sort by (candidate, start)
+#    shift each candidate's months past the previous candidate's, so one np.maximum.accumulate
+#    gives the furthest end seen so far within each candidate
+#    a job starts a new span when it starts after that end or belongs to the next candidate
+#gaps are the distances between consecutive spans, tenure per employer is the same merge grouped by
+#(candidate, company)
+PRESENT = {"present", "current", "now", "ongoing", "till date", "to date"}
+#"Jan 2020 - Mar 2020" then "Apr 2020 - ..." is back to back on a resume but a month apart here
+GAP_TOLERANCE = 1
+FORMATS = ("%b %Y", "%B %Y", "%m/%Y", "%Y-%m", "%Y")
+
+def month_number(value, reference):
+    #months since year 0 of Parser's "Mon YYYY", a few other shapes, or reference for "Present"
+    if not isinstance(value, str):
+        return np.nan
+    text = value.strip().replace("Sept", "Sep")
+    if text.lower() in PRESENT:
+        return reference
+    for fmt in FORMATS:
+        try:
+            date = datetime.strptime(text, fmt)
+            return date.year * 12 + date.month - 1
+        except ValueError:
+            continue
+    return np.nan
+
+def month_numbers(values, reference):
+    #each distinct string parsed once, a batch repeats a few hundred month labels
+    parsed = {}
+    out = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(values):
+        number = parsed.get(value)
+        if number is None:
+            number = parsed[value] = month_number(value, reference) if isinstance(value, str) else np.nan
+        out[i] = number
+    return out
+
+def month_label(number):
+    year, month = divmod(int(number), 12)
+    return datetime(year, month + 1, 1).strftime("%b %Y")
+
+def reference_month(today=None):
+    today = today or datetime.now()
+    return today.year * 12 + today.month - 1
+
+def as_of(text):
+    #reference month of an --as-of YYYY-MM, None for this month
+    return reference_month(datetime.strptime(text, "%Y-%m")) if text else None
+
+def merge(groups, start, end):
+    #intervals [start, end) grouped by non-negative ints, returns (group, start, end) of the merged spans
+    #sorted by group then start. touching intervals merge, there is no gap between them
+    if len(groups) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return np.empty(0, dtype=np.int64), empty, empty
+    order = np.lexsort((start, groups))
+    groups, start, end = groups[order], start[order], end[order]
+    low = start.min()
+    width = end.max() - low + 1
+    shifted_start = start - low + groups * width
+    reach = np.maximum.accumulate(end - low + groups * width)
+    new = np.ones(len(groups), dtype=bool)
+    new[1:] = (groups[1:] != groups[:-1]) | (shifted_start[1:] > reach[:-1])
+    first = np.flatnonzero(new)
+    return groups[first], start[first], np.maximum.reduceat(end, first)
+
+class Timeline:
+    #per candidate arrays, all in months:
+    #    months    merged experience, plus the duration of jobs whose dates didn't parse
+    #    summed    duration_months added up, the old total_experience
+    #    overlap   months covered by more than one job
+    #    gaps      months between spans longer than GAP_TOLERANCE, longest_gap the largest of them
+    #    spans     the number of merged spans
+    #    unplaced  duration_months of jobs with no usable dates, counted but not merged
+    #tenure: one row per (candidate, company) with the merged months at that employer
+    def __init__(self, candidates, start, end, durations, count, companies=None):
+        candidates = np.asarray(candidates, dtype=np.int64)
+        durations = np.nan_to_num(np.asarray(durations, dtype=np.float64), nan=0.0)
+        self.count = count
+        placed = ~np.isnan(start) & ~np.isnan(end) & (end >= start)
+
+        span_group, span_start, span_end = merge(candidates[placed], start[placed], end[placed])
+        merged = np.bincount(span_group, weights=span_end - span_start, minlength=count)
+        self.unplaced = np.bincount(candidates[~placed], weights=durations[~placed], minlength=count)
+        self.months = merged + self.unplaced
+        self.summed = np.bincount(candidates, weights=durations, minlength=count)
+        covered = np.bincount(candidates[placed], weights=(end - start)[placed], minlength=count)
+        self.overlap = covered - merged
+        self.spans = np.bincount(span_group, minlength=count)
+
+        gap = span_start[1:] - span_end[:-1]
+        between = (span_group[1:] == span_group[:-1]) & (gap > GAP_TOLERANCE)
+        gap, gap_group = gap[between], span_group[1:][between]
+        self.gaps = np.bincount(gap_group, weights=gap, minlength=count)
+        self.longest_gap = np.zeros(count)
+        np.maximum.at(self.longest_gap, gap_group, gap)
+
+        self.first = np.full(count, np.nan)
+        self.last = np.full(count, np.nan)
+        if len(span_group):
+            np.fmin.at(self.first, span_group, span_start)
+            np.fmax.at(self.last, span_group, span_end)
+
+        self.tenure = None
+        if companies is not None:
+            self.tenure = self._tenure(candidates, start, end, np.asarray(companies, dtype=np.int64), placed)
+
+    @staticmethod
+    def _tenure(candidates, start, end, companies, placed):
+        #companies: an id per job, -1 for none. each (candidate, company) pair is a merge group
+        keep = placed & (companies >= 0)
+        width = int(companies.max()) + 1 if len(companies) else 1
+        keys, groups = np.unique(candidates[keep] * width + companies[keep], return_inverse=True)
+        span_group, span_start, span_end = merge(groups.astype(np.int64).ravel(), start[keep], end[keep])
+        months = np.bincount(span_group, weights=span_end - span_start, minlength=len(keys))
+        first = np.full(len(keys), np.inf)
+        last = np.full(len(keys), -np.inf)
+        np.minimum.at(first, span_group, span_start)
+        np.maximum.at(last, span_group, span_end)
+        return {"candidate": keys // width, "company": keys % width, "months": months, "first": first, "last": last}
+
+    @classmethod
+    def from_jobs(cls, candidates, starts, ends, durations, count, current=None, companies=None, reference=None):
+        #starts, ends: Parser's from/to text. a current job whose end didn't parse runs to reference, and so
+        #does its duration: duration_months of a current job was measured on the day it was parsed, the
+        #summed figure would otherwise count it to a different month than the merged one
+        reference = reference_month() if reference is None else reference
+        start = month_numbers(starts, reference)
+        end = month_numbers(ends, reference)
+        durations = np.asarray(durations, dtype=np.float64)
+        if current is not None:
+            current = np.asarray(current, dtype=bool)
+            end = np.where(np.isnan(end) & current, reference, end)
+            durations = np.where(current & ~np.isnan(start), end - start, durations)
+        return cls(candidates, start, end, durations, count, companies)
+
+    @classmethod
+    def from_corpus(cls, corpus, reference=None):
+        #analyze_results.Corpus, with tenure when the corpus has been canonicalized
+        jobs = corpus.jobs
+        companies = jobs["company_id"].to_numpy() if "company_id" in jobs else None
+        return cls.from_jobs(jobs["candidate"].to_numpy(), jobs["start"].to_numpy(dtype=object),
+                             jobs["end"].to_numpy(dtype=object), jobs["months"].to_numpy(), len(corpus),
+                             jobs["current"].to_numpy(), companies, reference)
+
+    def years(self):
+        return self.months / 12
+
+    def summary_lines(self, with_jobs=None):
+        with_jobs = self.spans + (self.unplaced > 0) > 0 if with_jobs is None else with_jobs
+        n = int(with_jobs.sum())
+        if not n:
+            return ["No candidates with dated jobs"]
+        overlapping = int((self.overlap[with_jobs] > 0).sum())
+        with_gaps = int((self.gaps[with_jobs] > 0).sum())
+        lines = [
+            f"{n} candidates with jobs: merged {self.months[with_jobs].mean() / 12:.2f} years on average, "
+            f"summed {self.summed[with_jobs].mean() / 12:.2f}",
+            f"  {overlapping} ({overlapping / n:.1%}) have overlapping jobs, "
+            f"{self.overlap[with_jobs].sum() / 12:.0f} years double counted by the sum",
+            f"  {with_gaps} ({with_gaps / n:.1%}) have gaps, longest {self.longest_gap.max():.0f} months, "
+            f"median gap total {np.median(self.gaps[with_jobs][self.gaps[with_jobs] > 0]) if with_gaps else 0:.0f} months",
+        ]
+        unplaced = int((self.unplaced > 0).sum())
+        if unplaced:
+            lines.append(f"  {unplaced} have jobs without usable dates, their duration_months is added unmerged")
+        return lines
+
+def experience_months(jobs, reference=None):
+    #merged months of one candidate's work_experiences, for Parser.total_experience
+    if not jobs:
+        return 0.0
+    timeline = Timeline.from_jobs(np.zeros(len(jobs), dtype=np.int64), [job.get("from") for job in jobs],
+                                  [job.get("to") for job in jobs], [job.get("duration_months") for job in jobs], 1,
+                                  [job.get("is_current") for job in jobs], reference=reference)
+    return float(timeline.months[0])
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Merged experience, gaps and employer tenure of parsed resumes')
+    parser.add_argument('input', nargs='?', default='extracted_data.json',
+                       help='Parser JSON, a run journal or JSONL file, or a work queue .db (default: extracted_data.json)')
+    parser.add_argument('--as-of', default=None, help='Month "Present" ends in, YYYY-MM (default: this month)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed recomputations (default: 3)')
+    args = parser.parse_args()
+    reference = as_of(args.as_of)
+
+    #imported here, analyze_results pulls in pandas
+    from analyze_results import Corpus
+    corpus = Corpus.load(args.input)
+    corpus.canonicalize()
+    timings = []
+    for _ in range(max(args.repeat, 1)):
+        started = time.perf_counter()
+        timeline = Timeline.from_corpus(corpus, reference)
+        timings.append(time.perf_counter() - started)
+    logger.info(f"{len(corpus)} candidates, {len(corpus.jobs)} jobs: timeline in {min(timings):.3f}s")
+    for line in timeline.summary_lines():
+        print(line)
+    if timeline.tenure is not None and len(timeline.tenure["months"]):
+        names = corpus.canonicalizer.companies.names
+        tenure = timeline.tenure
+        totals = np.bincount(tenure["company"], weights=tenure["months"], minlength=len(names))
+        people = np.bincount(tenure["company"], minlength=len(names))
+        print("Longest average tenure (employers with 5+ candidates):")
+        ranked = [i for i in np.argsort(-(totals / np.maximum(people, 1))) if people[i] >= 5][:10]
+        for i in ranked:
+            print(f"  {names[i][:40]:40s} {totals[i] / people[i] / 12:5.1f} years over {people[i]} candidates")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from run_journal import OK, FAILED, QUARANTINED
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+MERGED_BY = "merged_by"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    file TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    reason TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    #files to parse in one SQLite database on shared storage. a worker host claims a batch by
+    #leasing it for lease_seconds and keeps the lease alive with heartbeats while it works. a lease
+    #that runs out (host died, hung, lost the mount) is up for grabs again, after max_attempts
+    #expired leases the file is quarantined. finishing a file is fenced on the lease, so a host that
+    #lost its lease can't overwrite the result of the host that took over.
+    #rollback journal, not WAL: WAL needs shared memory and doesn't work across machines
+    def __init__(self, filename, worker_id=None, lease_seconds=300, max_attempts=3):
+        self.filename = Path(filename)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = None
+
+    def open(self):
+        self.conn = sqlite3.connect(self.filename, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES (?, NULL)", (MERGED_BY,))
+        return self
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    @contextmanager
+    def transaction(self):
+        #BEGIN IMMEDIATE takes the write lock up front, two hosts can't claim the same rows
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, file_paths):
+        #idempotent, every host may enqueue the same folder. new files reopen the merge
+        now = time.time()
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (file, state, updated) VALUES (?, ?, ?)",
+                [(str(f), PENDING, now) for f in file_paths]
+            )
+            added = conn.total_changes - before
+            if added:
+                conn.execute("UPDATE meta SET value = NULL WHERE key = ?", (MERGED_BY,))
+        if added:
+            logger.info(f"Queued {added} new files in {self.filename}")
+        return added
+
+    def claim(self, limit):
+        now = time.time()
+        with self.transaction() as conn:
+            #leases that ran out too often are a file that takes its host down, stop handing it out
+            conn.execute(
+                "UPDATE tasks SET state = ?, reason = ?, worker = NULL, updated = ? "
+                "WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                (QUARANTINED, f"lease expired {self.max_attempts} times", now, LEASED, now, self.max_attempts)
+            )
+            rows = conn.execute(
+                "SELECT file, state, worker FROM tasks WHERE state = ? OR (state = ? AND lease_until < ?) "
+                "ORDER BY state = ?, file LIMIT ?",
+                (PENDING, LEASED, now, LEASED, limit)
+            ).fetchall()
+            for file, state, worker in rows:
+                if state == LEASED:
+                    logger.warning(f"Reclaimed expired lease of {worker}: {file}")
+            conn.executemany(
+                "UPDATE tasks SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated = ? "
+                "WHERE file = ?",
+                [(LEASED, self.worker_id, now + self.lease_seconds, now, file) for file, _, _ in rows]
+            )
+        return [Path(file) for file, _, _ in rows]
+
+    def renew(self):
+        now = time.time()
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE state = ? AND worker = ?",
+                (now + self.lease_seconds, LEASED, self.worker_id)
+            ).rowcount
+
+    @contextmanager
+    def heartbeat(self, interval=None):
+        #renews every lease this worker holds a few times per lease period
+        interval = interval or max(1.0, self.lease_seconds / 3)
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.renew()
+                except sqlite3.Error as e:
+                    logger.warning(f"Heartbeat failed: {str(e)}")
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join()
+
+    def record(self, file_path, status, result=None, reason=None):
+        #same signature as RunJournal.record, the queue is the journal of a sharded run
+        with self.transaction() as conn:
+            changed = conn.execute(
+                "UPDATE tasks SET state = ?, result = ?, reason = ?, lease_until = NULL, updated = ? "
+                "WHERE file = ? AND state = ? AND worker = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, reason,
+                 time.time(), str(file_path), LEASED, self.worker_id)
+            ).rowcount
+        if not changed:
+            logger.warning(f"Lease lost, result dropped: {file_path}")
+        return bool(changed)
+
+    def unfinished(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE state IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()[0]
+
+    def counts(self):
+        with self.lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+    def workers(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT worker, COUNT(*) FROM tasks WHERE worker IS NOT NULL GROUP BY worker ORDER BY worker"
+            ).fetchall()
+
+    def outcomes(self):
+        #(results by file name, failed files, quarantine entries), the same shape as RunJournal.outcomes
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT file, state, result, reason FROM tasks WHERE state IN (?, ?, ?) ORDER BY file",
+                (OK, FAILED, QUARANTINED)
+            ).fetchall()
+        results = {}
+        failed_files = []
+        quarantine = []
+        for file, state, result, reason in rows:
+            if state == OK and result:
+                results[Path(file).name] = json.loads(result)
+            elif state == QUARANTINED:
+                quarantine.append({"file": file, "reason": reason})
+            else:
+                failed_files.append(file)
+        return results, failed_files, quarantine
+
+    def claim_merge(self):
+        #exactly one worker writes the merged output once the queue has drained
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE meta SET value = ? WHERE key = ? AND value IS NULL", (self.worker_id, MERGED_BY)
+            ).rowcount == 1
+
+    def reopen(self):
+        #failed and quarantined files go back to pending, for a rerun after a fix
+        with self.transaction() as conn:
+            count = conn.execute(
+                "UPDATE tasks SET state = ?, worker = NULL, lease_until = NULL, attempts = 0, reason = NULL "
+                "WHERE state IN (?, ?)", (PENDING, FAILED, QUARANTINED)
+            ).rowcount
+            conn.execute("UPDATE meta SET value = NULL WHERE key = ?", (MERGED_BY,))
+        return count
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Inspect a sharded run queue (workers: Basic_Parser.py --queue)')
+    parser.add_argument('queue', help='SQLite queue file')
+    parser.add_argument('--reopen', action='store_true', help='Put failed and quarantined files back to pending')
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue).open()
+    if args.reopen:
+        print(f"Reopened {queue.reopen()} files")
+    counts = queue.counts()
+    print(f"{sum(counts.values())} files: " + ", ".join(f"{n} {state}" for state, n in sorted(counts.items())))
+    for worker, n in queue.workers():
+        print(f"  {worker}: {n} files")
+    queue.close()
+
+if __name__ == "__main__":
+    main()
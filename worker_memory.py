@@ -0,0 +1,106 @@
+import gc
+import os
+import ctypes
+import ctypes.util
+import logging
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def load_libc():
+    #glibc keeps freed arenas mapped, malloc_trim hands them back so RSS actually drops
+    name = ctypes.util.find_library("c")
+    try:
+        libc = ctypes.CDLL(name) if name else None
+    except OSError:
+        return None
+    return libc if libc is not None and hasattr(libc, "malloc_trim") else None
+
+LIBC = load_libc()
+
+def rss_mb():
+    #current resident set of this process, None where it can't be read
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1e6
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / 1e6
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_rss_mb():
+    #high-water mark of this process since it started
+    if psutil is not None:
+        peak = getattr(psutil.Process().memory_info(), "peak_wset", None)  #windows
+        if peak:
+            return peak / 1e6
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3  #kilobytes on linux
+    return rss_mb()
+
+def release(full=False):
+    #after each document: collect the young generations where the layout trees and Doc objects of
+    #the last file sit, then return freed heap pages to the OS. a full collection costs ~40ms with
+    #a spaCy model loaded, so it only runs when a worker is over its memory budget
+    gc.collect(2 if full else 1)
+    if LIBC is not None:
+        LIBC.malloc_trim(0)
+
+def measure(limit_mb=None):
+    #(rss, peak) after releasing the last task's intermediates, a worker over its limit gets a full
+    #collection first so it is only recycled for memory it really holds on to
+    release()
+    rss = rss_mb()
+    if limit_mb and rss is not None and rss >= limit_mb:
+        release(full=True)
+        rss = rss_mb()
+    return rss, peak_rss_mb()
+
+class MemoryReport:
+    #one entry per worker process, a recycled slot shows up once per process it went through
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.workers = {}
+
+    def record(self, slot, pid, rss, peak):
+        with self.lock:
+            entry = self.workers.setdefault(pid, {"slot": slot, "tasks": 0, "rss_mb": 0.0, "peak_mb": 0.0, "retired": None})
+            entry["tasks"] += 1
+            entry["rss_mb"] = rss or 0.0
+            entry["peak_mb"] = max(entry["peak_mb"], peak or 0.0, rss or 0.0)
+
+    def retire(self, pid, reason):
+        with self.lock:
+            if pid in self.workers:
+                self.workers[pid]["retired"] = reason
+
+    def summary_lines(self):
+        with self.lock:
+            entries = [dict(entry, pid=pid) for pid, entry in self.workers.items()]
+        if not entries:
+            return []
+        slots = {}
+        for entry in entries:
+            slots.setdefault(entry["slot"], []).append(entry)
+        recycled = sum(1 for entry in entries if entry["retired"])
+        lines = [f"Worker memory: {len(entries)} processes, {recycled} recycled, "
+                 f"peak {max(entry['peak_mb'] for entry in entries):.0f} MB"]
+        for slot in sorted(slots, key=str):
+            group = slots[slot]
+            lines.append(
+                f"  worker {slot}: {sum(e['tasks'] for e in group)} files in {len(group)} processes, "
+                f"peak {max(e['peak_mb'] for e in group):.0f} MB, last RSS {group[-1]['rss_mb']:.0f} MB"
+            )
+        return lines
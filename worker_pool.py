@@ -0,0 +1,211 @@
+import time
+import logging
+import traceback
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+from worker_memory import measure
+from structured_log import event
+
+logger = logging.getLogger(__name__)
+
+CALL = "call"
+RESULT = "result"
+ERROR = "error"
+QUARANTINED = "quarantined"
+KILL_GRACE = 1.0
+
+class ServiceProxy:
+    #stands in for a parent-side object (dedup index, routing report, OCR queue) inside a worker
+    #process. every method call is a round trip over the worker's pipe, so shared state stays in
+    #one place and keeps its locking
+    def __init__(self, name, conn):
+        self._name = name
+        self._conn = conn
+
+    def __getattr__(self, method):
+        def call(*args):
+            self._conn.send((CALL, self._name, method, args))
+            ok, value = self._conn.recv()
+            if not ok:
+                raise RuntimeError(f"{self._name}.{method} failed in the parent: {value}")
+            return value
+        return call
+
+def worker_loop(conn, handler, setup, setup_args, service_names, max_rss_mb=None):
+    services = {name: ServiceProxy(name, conn) for name in service_names}
+    context = setup(*setup_args) if setup else None
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        task, attempt = message
+        try:
+            ok, value = True, handler(task, attempt, services, context)
+        except Exception:
+            ok, value = False, traceback.format_exc()
+        #the result is already plain data, everything else the task built can go before measuring
+        conn.send((RESULT, ok, value, measure(max_rss_mb)))
+        del value
+    conn.close()
+
+class FifoQueue:
+    #default schedule, tasks in the order given. scheduler.WorkStealingQueue has the same interface
+    def __init__(self, tasks):
+        self.tasks = deque(tasks)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def take(self, worker):
+        return self.tasks.popleft() if self.tasks else None
+
+    def put_back(self, worker, task):
+        self.tasks.appendleft(task)
+
+class Worker:
+    def __init__(self, ctx, handler, setup, setup_args, service_names, max_rss_mb=None):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=worker_loop,
+            args=(child_conn, handler, setup, setup_args, service_names, max_rss_mb),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.job = None  #(task, attempt) while busy
+        self.deadline = None
+        self.tasks = 0
+
+    def assign(self, task, attempt, timeout):
+        self.job = (task, attempt)
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.conn.send((task, attempt))
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(KILL_GRACE)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(KILL_GRACE)
+        if self.process.is_alive():
+            self.kill()
+
+def run_isolated(tasks, handler, workers=4, timeout=None, retries=1, setup=None, setup_args=(), services=None,
+                 schedule=None, max_tasks=None, max_rss_mb=None, memory_report=None, on_done=None):
+    #runs handler(task, attempt, services, context) in worker processes. a task that overruns its
+    #wall-clock budget or takes its worker down gets the worker killed and replaced, and is retried
+    #with attempt + 1 (handlers degrade on later attempts) until retries run out, then quarantined.
+    #schedule decides which task each worker slot gets next (FIFO by default). a worker is recycled
+    #(stopped, and replaced when work is left) after max_tasks tasks or once its RSS stays above
+    #max_rss_mb, memory_report gets every worker's RSS after each task. on_done(task, RESULT | ERROR |
+    #QUARANTINED, value or reason) runs in this process as each task finishes for good.
+    #returns ({task: value}, {task: error text}, [(task, reason)])
+    services = services or {}
+    ctx = multiprocessing.get_context()
+    tasks = list(tasks)
+    schedule = schedule if schedule is not None else FifoQueue(tasks)
+    attempts = {}
+    results = {}
+    errors = {}
+    quarantine = []
+    #slot index stays with the replacement of a killed worker, so its deque in the schedule stays its own
+    pool = [None] * min(workers, len(tasks))
+
+    def spawn():
+        return Worker(ctx, handler, setup, setup_args, list(services), max_rss_mb)
+
+    def retire(slot, reason):
+        if memory_report is not None:
+            memory_report.retire(pool[slot].process.pid, reason)
+        pool[slot] = None
+
+    def fail(slot, reason, error):
+        worker = pool[slot]
+        task, attempt = worker.job
+        worker.kill()
+        retire(slot, reason)
+        fields = event(task, "isolate", error=error)
+        if attempt < retries:
+            logger.warning("%s, retrying (attempt %d): %s", reason, attempt + 2, task, extra=fields)
+            attempts[task] = attempt + 1
+            schedule.put_back(slot, task)
+        else:
+            logger.error("%s, quarantined: %s", reason, task, extra=fields)
+            quarantine.append((task, reason))
+            if on_done is not None:
+                on_done(task, QUARANTINED, reason)
+
+    while True:
+        #a worker (or a replacement) is only started while there is work left for it
+        for slot in range(len(pool)):
+            if (pool[slot] is None or pool[slot].job is None) and len(schedule):
+                task = schedule.take(slot)
+                if task is None:
+                    continue
+                if pool[slot] is None:
+                    pool[slot] = spawn()
+                pool[slot].assign(task, attempts.get(task, 0), timeout)
+
+        busy = [w for w in pool if w is not None and w.job]
+        if not busy:
+            break
+        deadlines = [w.deadline for w in busy if w.deadline]
+        wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        ready = set(wait([w.conn for w in busy], wait_for))
+
+        for slot, worker in enumerate(pool):
+            if worker is None or worker.job is None:
+                continue
+            if worker.conn in ready:
+                try:
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(KILL_GRACE)
+                    fail(slot, f"worker exited with code {worker.process.exitcode}", "WorkerExited")
+                    continue
+                if message[0] == CALL:
+                    _, name, method, args = message
+                    try:
+                        worker.conn.send((True, getattr(services[name], method)(*args)))
+                    except Exception as e:
+                        worker.conn.send((False, repr(e)))
+                    continue
+                _, ok, value, (rss, peak) = message
+                task = worker.job[0]
+                if ok:
+                    results[task] = value
+                else:
+                    errors[task] = value
+                if on_done is not None:
+                    on_done(task, RESULT if ok else ERROR, value)
+                worker.job = None
+                worker.deadline = None
+                worker.tasks += 1
+                if memory_report is not None:
+                    memory_report.record(slot, worker.process.pid, rss, peak)
+                if max_tasks and worker.tasks >= max_tasks:
+                    recycle = f"recycled after {worker.tasks} tasks"
+                elif max_rss_mb and rss is not None and rss >= max_rss_mb:
+                    recycle = f"recycled at {rss:.0f} MB"
+                else:
+                    continue
+                logger.info(f"worker {slot} (pid {worker.process.pid}) {recycle}")
+                worker.stop()
+                retire(slot, recycle)
+            elif worker.deadline and time.monotonic() >= worker.deadline:
+                fail(slot, f"timed out after {timeout}s", "TimeoutError")
+
+    for worker in pool:
+        if worker is not None:
+            worker.stop()
+    return results, errors, quarantine